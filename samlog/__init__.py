@@ -0,0 +1 @@
+"""SAM 분석 보고서의 데이터 처리 모듈 모음."""
@@ -0,0 +1,424 @@
+"""화면(탭)에 보여 줄 분석 결과 계산.
+
+Streamlit 없이 부를 수 있는 함수들로, Dataset 과 파라미터만 받아 표/지표를 돌려준다.
+결과는 (함수 이름, 파라미터) 키로 데이터셋마다 LRU 에 보관하므로, 위젯 하나가 바뀌어
+스크립트가 다시 실행되어도 다른 탭의 집계는 다시 계산하지 않는다. 돌려준 객체는 여러
+세션이 공유하므로 제자리 수정하지 않는다.
+
+기간 선택(windowed)과 반복 질문 제외(deduplicated)는 행 일부만 담은 Dataset 을 만든다.
+큐브처럼 금방 만드는 집계는 그 행으로 다시 만들고, 단어 검색 색인·질문 벡터·반복 질문
+묶음처럼 비싼 것은 부모 데이터셋의 것을 행 위치만 바꿔 빌려 쓴다.
+"""
+import functools
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from samlog import profiling
+from samlog.cube import OrgTimeCube
+from samlog.dedup import DedupView, QuestionDedup
+from samlog.embeddings import EmbeddingsView, QuestionEmbeddings, get_encoder
+from samlog.korean import merge_frequencies
+from samlog.learning_join import join_datasets
+from samlog.org_index import OrgIndex
+from samlog.search_index import KeywordIndex, KeywordIndexView
+from samlog.time_index import TimeIndex
+from samlog.user_index import UserIndex
+
+# 앱이 파일을 적재하면서 청크마다 함께 쌓는 파생 집계 (read_dataset 의 fold)
+FOLD = {
+    'cube': OrgTimeCube,
+    'keyword_index': KeywordIndex,
+    'dedup': QuestionDedup,
+    'time_index': TimeIndex
+}
+
+# 데이터셋 하나에 보관하는 결과 수 (검색어처럼 값이 계속 바뀌는 파라미터 대비)
+MAX_MEMO_ENTRIES = 256
+
+# 데이터셋 하나에 보관하는 기간 선택 결과 수 (행 복사본이므로 적게)
+MAX_WINDOWS = 4
+
+
+class _Memo:
+    """(함수 이름, 파라미터) → 결과 LRU."""
+
+    def __init__(self, max_entries=MAX_MEMO_ENTRIES):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, build):
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                return self._entries[key]
+        value = build()
+        with self._lock:
+            self._entries[key] = value
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return value
+
+
+def memoized(function):
+    """function(dataset, *파라미터) 결과를 데이터셋의 LRU 에 보관한다. 파라미터는 해시 가능해야 한다."""
+
+    @functools.wraps(function)
+    def wrapper(dataset, *args, **kwargs):
+        memo = dataset.derived('analytics', _Memo)
+        key = (function.__name__, args, tuple(sorted(kwargs.items())))
+        return memo.get(key, lambda: _build(dataset, function.__name__,
+                                            lambda: function(
+                                                dataset, *args, **kwargs)))
+
+    return wrapper
+
+
+def _build(dataset, stage, build):
+    # 실제로 계산할 때만 (memo 적중은 빼고) 성능 기록을 남긴다
+    with profiling.span(f"analytics.{stage}", rows=len(dataset.df)):
+        return build()
+
+
+# --- 데이터셋마다 한 번 만드는 색인 ---
+
+
+def cube(dataset):
+    return dataset.derived(
+        'cube', lambda: _build(dataset, 'cube', lambda: OrgTimeCube(dataset.df)))
+
+
+def org_index(dataset):
+    return dataset.derived(
+        'org_index',
+        lambda: _build(dataset, 'org_index', lambda: OrgIndex(dataset.df)))
+
+
+def _borrowed(dataset, accessor, view, build):
+    # 부분 데이터셋이면 부모의 것을 행 위치만 바꿔 쓰고, 아니면 새로 만든다
+    if dataset.parent is not None:
+        return view(accessor(dataset.parent), dataset.positions)
+    return build()
+
+
+def keyword_index(dataset):
+    return dataset.derived(
+        'keyword_index', lambda: _build(
+            dataset, 'keyword_index', lambda: _borrowed(
+                dataset, keyword_index, KeywordIndexView, lambda:
+                KeywordIndex(dataset.df))))
+
+
+def time_index(dataset):
+    return dataset.derived(
+        'time_index',
+        lambda: _build(dataset, 'time_index', lambda: TimeIndex(dataset.df)))
+
+
+def user_index(dataset):
+    return dataset.derived(
+        'users',
+        lambda: _build(dataset, 'user_index', lambda: UserIndex(dataset.df)))
+
+
+def dedup(dataset):
+    return dataset.derived(
+        'dedup', lambda: _build(
+            dataset, 'dedup', lambda: _borrowed(dataset, dedup, DedupView,
+                                                lambda: QuestionDedup(dataset.df))))
+
+
+def deduplicated(dataset):
+    """반복 질문 묶음마다 처음 나온 행만 남긴 Dataset (질문이 없는 행은 모두 남긴다)."""
+    return dataset.derived(
+        'deduplicated', lambda: _build(
+            dataset, 'deduplicated', lambda: dataset.subset(
+                f"{dataset.key}:dedup",
+                np.flatnonzero(dedup(dataset).keep_mask()))))
+
+
+def date_bounds(dataset):
+    """첫/마지막 등록 시각 (날짜가 없으면 None)."""
+    index = time_index(dataset)
+    return (index.first, index.last) if len(index) else None
+
+
+def windowed(dataset, start=None, end=None):
+    """등록 시각이 [start, end) 인 행만 담은 Dataset. 날짜가 없는 행은 넣지 않는다.
+
+    날짜 있는 행이 모두 들어가는 기간은 시작·끝과 관계없이 같은 뷰이고, 날짜 없는 행도
+    없으면 dataset 그대로다. 행 위치는 정렬 색인에서 이진 탐색으로 찾고, 최근 고른
+    MAX_WINDOWS 개 기간은 보관한다.
+    """
+    index = time_index(dataset)
+    if index.count(start, end) == len(index):
+        if len(index) == len(dataset.df):
+            return dataset
+        start = end = None
+    windows = dataset.derived('windows', lambda: _Memo(MAX_WINDOWS))
+    return windows.get((start, end), lambda: _build(
+        dataset, 'window', lambda: dataset.subset(
+            f"{dataset.key}@{start}~{end}", index.positions(start, end))))
+
+
+def question_embeddings(dataset):
+    """질문 벡터와 ANN 색인 (인코더가 바뀌면 따로 만든다, 벡터는 디스크에 캐시)."""
+    encoder = get_encoder()
+    return dataset.derived(
+        ('embeddings', encoder.name), lambda: _build(
+            dataset, 'embeddings', lambda: _borrowed(
+                dataset, question_embeddings, EmbeddingsView, lambda:
+                QuestionEmbeddings.build(dataset.df, dataset.key, encoder))))
+
+
+# --- 탭별 집계 ---
+
+
+@memoized
+def overview(dataset):
+    """조사기간 (시작일, 종료일 문자열), 참여자 수, 질문 수, 행 수."""
+    data_cube = cube(dataset)
+    totals = data_cube.totals()
+    if data_cube.first_date is not None:
+        start_date = data_cube.first_date.strftime("%Y-%m-%d")
+        end_date = data_cube.last_date.strftime("%Y-%m-%d")
+    else:
+        start_date = end_date = "날짜 정보 없음"
+    return {
+        'start_date': start_date,
+        'end_date': end_date,
+        'users': totals['users'],
+        'questions': totals['questions'],
+        'rows': totals['rows']
+    }
+
+
+@memoized
+def org_stats(dataset, level, group_1=None, group_2=None, group_3=None):
+    """선택한 조직 안에서 level 단계 조직별 질문 수/사용자 수 (질문 수 내림차순, 1부터 번호)."""
+    stats = cube(dataset).rollup([level],
+                                 group_1=group_1,
+                                 group_2=group_2,
+                                 group_3=group_3)
+    stats = stats.rename(columns={
+        level: '조직명',
+        'rows': '질문 수',
+        'users': '사용자 수'
+    })[['조직명', '질문 수', '사용자 수']]
+    stats = stats.sort_values(by='질문 수',
+                              ascending=False).reset_index(drop=True)
+    stats.index = stats.index + 1
+    return stats
+
+
+@memoized
+def question_trend(dataset, freq='M'):
+    """freq('D'/'W'/'M') 단위 질문 수 (빈 구간은 0건, 인덱스는 구간 시작일 문자열)."""
+    counts = time_index(dataset).counts(freq)
+    chart_data = counts.to_frame('질문 수')
+    chart_data.index = counts.index.strftime('%Y-%m' if freq ==
+                                             'M' else '%Y-%m-%d')
+    chart_data.index.name = {'D': '일', 'W': '주', 'M': '월'}[freq]
+    return chart_data
+
+
+def previous_window(start, end):
+    """[start, end) 바로 앞의 같은 길이 기간."""
+    return start - (end - start), start
+
+
+def title_changes(current, previous, n=20):
+    """두 기간 데이터셋의 질문 유형별 건수와 증감 (이번 기간 건수 상위 n개)."""
+    now = current.df['chat_title'].value_counts()
+    before = previous.df['chat_title'].value_counts()
+    table = pd.DataFrame({
+        '이번 기간': now,
+        '이전 기간': before
+    }).fillna(0).astype(np.int64)
+    table = table[table['이번 기간'] > 0].nlargest(n, '이번 기간', keep='first')
+    table['증감'] = table['이번 기간'] - table['이전 기간']
+    table['증감률(%)'] = (table['증감'] / table['이전 기간'].where(
+        table['이전 기간'] > 0) * 100).round(1)
+    table.index.name = '질문 주제'
+    return table.reset_index().set_axis(range(1, len(table) + 1))
+
+
+@memoized
+def top_titles(dataset, n=20):
+    """질문 유형(chat_title)별 건수 상위 n개."""
+    title_counts = dataset.df['chat_title'].value_counts()
+    table = title_counts[title_counts > 0].head(n).reset_index()
+    table.columns = ['질문 주제', '건수']
+    table.index += 1
+    return table
+
+
+@memoized
+def answer_stats(dataset):
+    """응답/미응답 건수와 비율(%)."""
+    answer_counts = cube(dataset).rollup(['answer_yn']).set_index(
+        'answer_yn')['rows']
+    answered = int(answer_counts.get('Y', 0))
+    unanswered = int(answer_counts.get('N', 0))
+    total = answered + unanswered
+    return {
+        'answered': answered,
+        'unanswered': unanswered,
+        'answered_pct': round(answered / total * 100, 1) if total > 0 else 0,
+        'unanswered_pct': round(unanswered / total *
+                                100, 1) if total > 0 else 0
+    }
+
+
+@memoized
+def answer_split(dataset):
+    """질문이 있는 (응답된 행, 미응답 행)."""
+    df = dataset.df
+    questions = df['question'].notna()
+    return (df[(df['answer_yn'] == 'Y') & questions],
+            df[(df['answer_yn'] == 'N') & questions])
+
+
+@memoized
+def org_paths(dataset):
+    """'센터/실/팀' 표시 이름 → 조직 선택 튜플."""
+    return {
+        "/".join(map(str, path)): path
+        for path in org_index(dataset).paths()
+    }
+
+
+@memoized
+def keyword_positions(dataset, keyword, exact=False):
+    """검색어가 나오는 행 위치."""
+    return keyword_index(dataset).search(keyword, exact=exact)
+
+
+@memoized
+def keyword_top_orgs(dataset, keyword, exact=False, n=10):
+    """검색어를 언급한 센터(group_1) 상위 n개와 건수."""
+    positions = keyword_positions(dataset, keyword, exact)
+    codes = dataset.df['group_1'].iloc[positions]
+    top_orgs = codes.value_counts()
+    return top_orgs[top_orgs > 0].head(n)
+
+
+@memoized
+def keyword_examples(dataset, keyword, exact=False, n=10):
+    """검색어가 나오는 대화 예시 n건."""
+    positions = keyword_positions(dataset, keyword, exact)[:n]
+    columns = [
+        col for col in ('question', 'answer', 'group_1', 'group_2')
+        if col in dataset.df.columns
+    ]
+    return dataset.df.iloc[positions][columns]
+
+
+def org_keywords(dataset, positions, learning=None):
+    """조직 행들의 표제어 빈도 (질문 + 구성원 수강 강좌명).
+
+    질문은 데이터셋의 단어 검색 색인, 강좌명은 수강 이력 데이터셋의 색인에서 센다.
+    """
+    counts = keyword_index(dataset).frequencies(positions,
+                                                columns=('question', ))
+    if learning is not None:
+        join = join_datasets(dataset, learning)
+        title_index = learning.derived(
+            'title_index', lambda: KeywordIndex(learning.df,
+                                                columns=('title', )))
+        counts = merge_frequencies(
+            counts,
+            title_index.frequencies(join.positions(
+                join.user_codes(positions))))
+    return counts
+
+
+@memoized
+def duplicate_stats(dataset):
+    """질문 행 수, 서로 다른 문장 수, 묶음 수, 완전/유사 중복으로 빠지는 행 수."""
+    return dedup(dataset).stats()
+
+
+@memoized
+def duplicate_groups(dataset, n=20):
+    """가장 많이 반복된 질문 묶음 n개 (묶음 번호 인덱스, 행 수 내림차순)."""
+    data_dedup = dedup(dataset)
+    labels = data_dedup.labels()
+    present = np.flatnonzero(labels >= 0)
+    frame = pd.DataFrame({
+        'label': labels[present],
+        'text': data_dedup.exact_labels()[present],
+        'position': present
+    })
+    if 'user_id' in dataset.df.columns:
+        frame['user'] = dataset.df['user_id'].to_numpy()[present]
+    aggregations = {
+        '반복 수': ('position', 'size'),
+        '표현 수': ('text', 'nunique'),
+        'first': ('position', 'min')
+    }
+    if 'user' in frame.columns:
+        aggregations['사용자 수'] = ('user', 'nunique')
+    groups = frame.groupby('label').agg(**aggregations)
+    groups = groups[groups['반복 수'] > 1].nlargest(n, '반복 수', keep='first')
+    groups.insert(0, '대표 질문',
+                  dataset.df['question'].to_numpy()[groups.pop('first')])
+    groups.index.name = '묶음 번호'
+    return groups
+
+
+@memoized
+def similar_questions(dataset, text, k=20):
+    """text 와 의미가 가까운 질문 k건 (같은 문장은 한 번만, 유사도 내림차순)."""
+    # 같은 문장이 여러 번 나올 수 있으므로 넉넉히 찾은 뒤 중복을 뺀다
+    positions, scores = question_embeddings(dataset).similar(text, k * 5)
+    columns = [
+        col for col in ('question', 'answer_yn', 'chat_title', 'group_1')
+        if col in dataset.df.columns
+    ]
+    table = dataset.df.iloc[positions][columns].reset_index(drop=True)
+    table.insert(0, '유사도', np.clip(scores, -1, 1).round(3))
+    table = table.drop_duplicates('question').head(k).reset_index(drop=True)
+    table.index += 1
+    return table
+
+
+@memoized
+def question_clusters(dataset, n_clusters=10, unanswered_only=False):
+    """질문을 의미가 가까운 n_clusters 개 주제로 묶은 표 (질문 수 내림차순).
+
+    주제마다 질문 수, 미응답 비율(%), 중심에 가장 가까운 대표 질문, 주요 단어를 보여 준다.
+    """
+    df = dataset.df
+    has_question = df['question'].notna().to_numpy()
+    if unanswered_only and 'answer_yn' in df.columns:
+        has_question &= (df['answer_yn'] == 'N').to_numpy()
+    positions = np.flatnonzero(has_question)
+    labels, scores, _ = question_embeddings(dataset).clusters(
+        positions, n_clusters)
+    unanswered = ((df['answer_yn'].to_numpy()[positions] == 'N')
+                  if 'answer_yn' in df.columns else None)
+    index = keyword_index(dataset)
+    rows = []
+    for label in np.unique(labels[labels >= 0]):
+        members = np.flatnonzero(labels == label)
+        representative = positions[members[scores[members].argmax()]]
+        words = index.frequencies(positions[members],
+                                  columns=('question', ),
+                                  top=5)
+        rows.append({
+            '질문 수': len(members),
+            '미응답 비율(%)': round(unanswered[members].mean() *
+                               100, 1) if unanswered is not None else None,
+            '대표 질문': df['question'].iloc[representative],
+            '주요 단어': ", ".join(words.index)
+        })
+    table = pd.DataFrame(rows,
+                         columns=['질문 수', '미응답 비율(%)', '대표 질문', '주요 단어'])
+    table = table.sort_values('질문 수', ascending=False).reset_index(drop=True)
+    table.index += 1
+    table.index.name = '주제'
+    return table
@@ -0,0 +1,288 @@
+"""합성 데이터 규모별 분석 경로 벤치마크.
+
+행 수마다 합성 질문/답변·수강 이력 파일을 만들어(한 번 만든 파일은 재사용) 앱과 같은
+방식으로 적재한 뒤, 탭별 분석 경로의 실행 시간을 잰다.
+
+- 첫 실행: 적재 직후 처음 부를 때 (색인·조인 생성 포함, 사용자가 처음 탭을 열 때)
+- 반복 실행: 색인은 둔 채 결과 memo 만 비우고 다시 부를 때의 중앙값 (위젯 값이 바뀔 때)
+
+결과는 기록 파일(JSON Lines)에 커밋과 함께 쌓고, 같은 조건의 직전 기록보다
+느려진 경로(적재 시간, 반복 실행 중앙값)를 표시한다. 느려진 경로가 있으면 종료 코드 1.
+
+사용 예:
+    python -m samlog.bench
+    python -m samlog.bench --rows 100000 1000000 --format csv --repeat 5
+    python -m samlog.bench --rows 10000000 --no-cloud   # 수 GB 메모리 필요
+"""
+import argparse
+import datetime
+import json
+import os
+import subprocess
+import sys
+import time
+
+from samlog import analytics
+from samlog.cloud import WordCloudRenderer
+from samlog.learning_join import join_datasets
+from samlog.loader import memory_report, read_dataset
+from samlog.synthetic import learning_frame, qa_frame, write_frame
+
+BENCH_DIR = os.path.join(".sam_cache", "bench")
+HISTORY_PATH = os.path.join(BENCH_DIR, "history.jsonl")
+DEFAULT_SIZES = (10_000, 100_000, 1_000_000)
+FORMATS = ("arrow", "parquet", "csv")
+
+# 직전 기록보다 이 비율 이상, 그리고 이 시간 이상 느려지면 회귀로 본다
+REGRESSION_RATIO = 1.25
+MIN_REGRESSION_SECONDS = 0.005
+
+
+def prepare(rows, fmt="arrow", seed=0, data_dir=BENCH_DIR):
+    """(질문/답변 파일, 수강 이력 파일) 경로. 없으면 합성해서 저장한다."""
+    os.makedirs(data_dir, exist_ok=True)
+    path = os.path.join(data_dir, f"sam-{rows}-{seed}.{fmt}")
+    learning_path = os.path.join(data_dir, f"learning-{rows}-{seed}.arrow")
+    if not (os.path.exists(path) and os.path.exists(learning_path)):
+        qa = qa_frame(rows, seed=seed)
+        write_frame(qa, path)
+        write_frame(learning_frame(qa, seed=seed), learning_path)
+    return path, learning_path
+
+
+def _timed(function):
+    started = time.perf_counter()
+    function()
+    return time.perf_counter() - started
+
+
+def _median(values):
+    values = sorted(values)
+    middle = len(values) // 2
+    return values[middle] if len(values) % 2 else (values[middle - 1] +
+                                                   values[middle]) / 2
+
+
+def analysis_paths(dataset, learning, keyword, renderer=None):
+    """{경로 이름: 인자 없는 함수}. 앱의 각 탭이 부르는 것과 같은 호출이다."""
+    df = dataset.df
+    center = df['group_1'].iloc[0]
+    user_id = df['user_id'].value_counts().index[0]
+    renders = [0]
+
+    def org_filter():
+        analytics.org_stats(dataset, 'group_2', center)
+        analytics.org_index(dataset).view(df, center)
+
+    def keyword_search():
+        analytics.keyword_positions(dataset, keyword, False)
+        analytics.keyword_top_orgs(dataset, keyword, False)
+
+    def user_view():
+        users = analytics.user_index(dataset)
+        users.rows(df, user_id)
+        users.profile(user_id)
+
+    def learning_join():
+        join = join_datasets(dataset, learning)
+        join.course_table(
+            join.positions(
+                join.user_codes(
+                    analytics.keyword_positions(dataset, keyword, False))))
+
+    def date_window():
+        # 가운데 절반 기간을 골라 개요와 주별 추이를 본다 (기간 선택이 바뀔 때)
+        first, last = analytics.date_bounds(dataset)
+        window = analytics.windowed(dataset, first + (last - first) / 4,
+                                    last - (last - first) / 4)
+        analytics.overview(window)
+        analytics.question_trend(window, 'W')
+
+    def word_cloud():
+        # 매번 새 키로 그려 이미지 캐시를 건너뛴다
+        renders[0] += 1
+        positions = analytics.org_index(dataset).node(center).positions
+        renderer.render(
+            (dataset.key, center, renders[0]),
+            lambda: analytics.org_keywords(dataset, positions, learning))
+
+    paths = {
+        'org_filter': org_filter,
+        'monthly_trend': lambda: analytics.question_trend(dataset, 'M'),
+        'top_titles': lambda: analytics.top_titles(dataset, 20),
+        'keyword_search': keyword_search,
+        'user_view': user_view,
+        'learning_join': learning_join,
+        'similar_questions':
+        lambda: analytics.similar_questions(dataset, keyword + " 예약"),
+        'question_clusters': lambda: analytics.question_clusters(dataset, 10),
+        'date_window': date_window,
+    }
+    if renderer is not None:
+        paths['word_cloud'] = word_cloud
+    return paths
+
+
+def run(path, learning_path, keyword="회의실", repeat=3, renderer=None):
+    """경로별 {'cold': 초, 'warm': 초} 와 적재된 데이터셋의 컬럼별 메모리(바이트)."""
+    timings = {}
+    loaded = {}
+
+    def load():
+        loaded['dataset'] = read_dataset(path, os.path.basename(path),
+                                         f"bench:{path}", analytics.FOLD)
+        loaded['learning'] = read_dataset(learning_path,
+                                          os.path.basename(learning_path),
+                                          f"bench:{learning_path}")
+
+    timings['load'] = {'cold': _timed(load)}
+    dataset = loaded['dataset']
+    paths = analysis_paths(dataset, loaded['learning'], keyword, renderer)
+    for name, function in paths.items():
+        timings[name] = {'cold': _timed(function)}
+    for name, function in paths.items():
+        samples = []
+        for _ in range(repeat):
+            dataset.discard('analytics')
+            dataset.discard('windows')
+            samples.append(_timed(function))
+        timings[name]['warm'] = _median(samples)
+    return timings, memory_report(dataset.df)['바이트']
+
+
+def _git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"],
+                              capture_output=True,
+                              text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def load_history(history_path=HISTORY_PATH):
+    if not os.path.exists(history_path):
+        return []
+    with open(history_path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def previous_record(history, rows, fmt, seed):
+    """같은 조건(행 수, 형식, 시드)의 가장 최근 기록."""
+    for record in reversed(history):
+        if (record['rows'], record['format'], record['seed']) == (rows, fmt,
+                                                                  seed):
+            return record
+    return None
+
+
+def regressions(timings, previous):
+    """직전 기록보다 느려진 [(경로, 구분, 이전 초, 현재 초)].
+
+    첫 실행은 한 번만 재서 흔들림이 크므로, 적재를 빼고는 반복 실행 중앙값으로 판정한다.
+    """
+    if previous is None:
+        return []
+    slower = []
+    for name, phases in timings.items():
+        for phase, seconds in phases.items():
+            if phase == 'cold' and 'warm' in phases:
+                continue
+            before = previous['seconds'].get(name, {}).get(phase)
+            if (before is not None and seconds > before * REGRESSION_RATIO
+                    and seconds - before > MIN_REGRESSION_SECONDS):
+                slower.append((name, phase, before, seconds))
+    return slower
+
+
+def _change(seconds, before):
+    if before is None or seconds is None or before <= 0:
+        return ""
+    return f"{(seconds / before - 1) * 100:+.0f}%"
+
+
+def report(rows, fmt, memory_mb, timings, previous, slower):
+    print(f"\n📏 {rows:,}행 ({fmt}, 메모리 {memory_mb:,.1f}MB)")
+    print(f"  {'경로':<20}{'첫 실행':>10}{'반복 실행':>12}{'이전 대비':>18}")
+    flagged = {(name, phase) for name, phase, _, _ in slower}
+    for name, phases in timings.items():
+        before = (previous or {}).get('seconds', {}).get(name, {})
+        warm = phases.get('warm')
+        changes = " / ".join(
+            change for change in (_change(phases['cold'], before.get('cold')),
+                                  _change(warm, before.get('warm'))) if change)
+        mark = " ⚠️" if any((name, phase) in flagged for phase in phases) else ""
+        warm_text = f"{warm:.4f}s" if warm is not None else "-"
+        print(f"  {name:<20}{phases['cold']:>9.4f}s{warm_text:>12}"
+              f"{changes:>18}{mark}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="합성 데이터로 분석 경로별 실행 시간을 재고 이전 기록과 비교합니다.")
+    parser.add_argument("--rows",
+                        type=int,
+                        nargs="+",
+                        default=list(DEFAULT_SIZES),
+                        help="질문/답변 행 수 (여러 개 지정 가능, 기본: 1만 10만 100만)")
+    parser.add_argument("--format",
+                        choices=FORMATS,
+                        default="arrow",
+                        help="적재할 파일 형식 (기본: arrow)")
+    parser.add_argument("--repeat", type=int, default=3, help="반복 실행 횟수 (기본: 3)")
+    parser.add_argument("--seed", type=int, default=0, help="합성 데이터 시드 (기본: 0)")
+    parser.add_argument("--keyword", default="회의실", help="검색 경로에 쓸 단어")
+    parser.add_argument("--no-cloud",
+                        action="store_true",
+                        help="워드클라우드 경로를 건너뜀")
+    parser.add_argument("--data-dir",
+                        default=BENCH_DIR,
+                        help=f"합성 데이터 폴더 (기본: {BENCH_DIR})")
+    parser.add_argument("--history",
+                        default=HISTORY_PATH,
+                        help=f"기록 파일 (기본: {HISTORY_PATH})")
+    parser.add_argument("--no-save", action="store_true", help="결과를 기록하지 않음")
+    args = parser.parse_args(argv)
+
+    renderer = None if args.no_cloud else WordCloudRenderer()
+    history = load_history(args.history)
+    commit = _git_commit()
+    found = False
+    for rows in args.rows:
+        path, learning_path = prepare(rows, args.format, args.seed,
+                                      args.data_dir)
+        timings, column_bytes = run(path, learning_path, args.keyword,
+                                    args.repeat, renderer)
+        memory_mb = column_bytes.sum() / 1024**2
+        previous = previous_record(history, rows, args.format, args.seed)
+        slower = regressions(timings, previous)
+        report(rows, args.format, memory_mb, timings, previous, slower)
+        found = found or bool(slower)
+
+        record = {
+            'time': datetime.datetime.now().isoformat(timespec='seconds'),
+            'commit': commit,
+            'rows': rows,
+            'format': args.format,
+            'seed': args.seed,
+            'memory_mb': round(memory_mb, 1),
+            'column_bytes': {
+                col: int(size)
+                for col, size in column_bytes.items()
+            },
+            'seconds': timings
+        }
+        history.append(record)
+        if not args.no_save:
+            os.makedirs(os.path.dirname(args.history) or ".", exist_ok=True)
+            with open(args.history, "a", encoding="utf-8") as f:
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+    if found:
+        print(f"\n⚠️ 직전 기록보다 {REGRESSION_RATIO:.2f}배 이상 느려진 경로가 있습니다.")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,58 @@
+"""워드클라우드 이미지 생성과 캐시.
+
+글꼴을 읽은 WordCloud 객체는 한 번만 만들어 재사용하고, 표제어 빈도표로 바로 그린
+PNG 바이트를 (데이터셋, 조직, 수강 이력) 키로 보관한다. 이미 그린 조직으로 돌아오면
+빈도 계산과 그리기를 모두 건너뛴다.
+"""
+import threading
+from collections import OrderedDict
+from io import BytesIO
+
+from wordcloud import WordCloud
+
+from samlog import profiling
+
+FONT_PATH = "NanumGothic-Regular.ttf"
+MAX_WORDS = 150
+MAX_CACHED_IMAGES = 64
+
+
+class WordCloudRenderer:
+
+    def __init__(self,
+                 font_path=FONT_PATH,
+                 width=800,
+                 height=400,
+                 max_images=MAX_CACHED_IMAGES):
+        self.max_images = max_images
+        self._cloud = WordCloud(font_path=font_path,
+                                width=width,
+                                height=height,
+                                background_color='white',
+                                max_words=MAX_WORDS)
+        self._images = OrderedDict()
+        self._lock = threading.Lock()
+
+    def render(self, key, frequencies):
+        """key 의 워드클라우드 PNG. 처음이면 frequencies() 빈도표(Series)로 그린다.
+
+        빈도표가 비어 있으면 None.
+        """
+        with self._lock:
+            if key in self._images:
+                self._images.move_to_end(key)
+                return self._images[key]
+            with profiling.span('wordcloud') as record:
+                with profiling.step('frequencies'):
+                    counts = frequencies()
+                record['words'] = len(counts)
+                if counts.empty:
+                    return None
+                image = self._cloud.generate_from_frequencies(
+                    counts.head(MAX_WORDS).to_dict()).to_image()
+                buffer = BytesIO()
+                image.save(buffer, format="PNG")
+            self._images[key] = buffer.getvalue()
+            while len(self._images) > self.max_images:
+                self._images.popitem(last=False)
+            return self._images[key]
@@ -0,0 +1,70 @@
+"""SAM 원본 export(CSV/xlsx)를 Arrow/Parquet 스냅샷으로 변환하는 명령행 도구.
+
+사용 예:
+    python -m samlog.convert sam_2024_05.xlsx
+    python -m samlog.convert sam_2024_05.xlsx -o sam_2024_05.parquet
+"""
+import argparse
+import os
+import sys
+import time
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from samlog.loader import (ARROW_SUFFIXES, CATEGORY_COLUMNS, normalize_frame,
+                           read_frame, write_arrow)
+
+
+def to_snapshot_table(df, categorical=CATEGORY_COLUMNS):
+    """정규화된 DataFrame 을 사전 인코딩된 Arrow 테이블로 바꾼다."""
+    df = df.copy()
+    for col in categorical:
+        if col in df.columns:
+            df[col] = df[col].astype('category')
+    return pa.Table.from_pandas(df, preserve_index=False)
+
+
+def write_snapshot(table, path):
+    """확장자에 따라 Arrow IPC(비압축, 메모리 매핑용) 또는 Parquet 로 저장한다."""
+    if path.rsplit(".", 1)[-1].lower() in ARROW_SUFFIXES:
+        write_arrow(table, path)
+    else:
+        pq.write_table(table, path)
+
+
+def convert(src, dst, categorical=CATEGORY_COLUMNS):
+    df = normalize_frame(read_frame(src, os.path.basename(src)))
+    table = to_snapshot_table(df, categorical)
+    write_snapshot(table, dst)
+    return df, table
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="SAM 질문/답변·수강 이력 export 를 Arrow/Parquet 스냅샷으로 변환합니다.")
+    parser.add_argument("src", help="원본 파일 (.csv / .xlsx)")
+    parser.add_argument("-o",
+                        "--output",
+                        help="출력 파일 (.arrow / .feather / .parquet, 기본: <src>.arrow)")
+    parser.add_argument("--category",
+                        action="append",
+                        default=[],
+                        metavar="COL",
+                        help="추가로 사전 인코딩할 컬럼 (여러 번 지정 가능)")
+    args = parser.parse_args(argv)
+
+    dst = args.output or os.path.splitext(args.src)[0] + ".arrow"
+    started = time.perf_counter()
+    df, table = convert(args.src, dst, CATEGORY_COLUMNS + args.category)
+    elapsed = time.perf_counter() - started
+
+    raw_mb = df.memory_usage(deep=True).sum() / 1024**2
+    print(f"✅ {args.src} → {dst} ({len(df):,}행, {elapsed:.1f}초)")
+    print(f"   메모리: {raw_mb:,.1f}MB → {table.nbytes / 1024**2:,.1f}MB, "
+          f"파일 크기: {os.path.getsize(dst) / 1024**2:,.1f}MB")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,12 @@
+"""CSR(포인터 + 값 배열) 형태 인덱스에서 쓰는 배열 도우미."""
+import numpy as np
+
+
+def concat_ranges(starts, lengths):
+    """[start, start+length) 구간들을 이어 붙인 정수 배열."""
+    total = int(lengths.sum())
+    if total == 0:
+        return np.empty(0, dtype=np.int64)
+    offsets = np.repeat(starts - np.concatenate(([0], np.cumsum(lengths)[:-1])),
+                        lengths)
+    return offsets + np.arange(total)
@@ -0,0 +1,158 @@
+"""조직 × 월 × 응답 여부 사전 집계 큐브.
+
+(group_1, group_2, group_3, month, answer_yn) 셀마다 행 수와 질문 수를 더할 수 있는
+카운터로, 이용자는 정렬된 이용자 코드 배열(정확한 집합)로 저장한다. 조직별 현황과
+개요 지표는 원본 행을 다시 훑지 않고 셀을 합쳐서(roll-up) 구한다.
+"""
+import numpy as np
+import pandas as pd
+
+DIMENSIONS = ('group_1', 'group_2', 'group_3', 'month', 'answer_yn')
+
+
+class OrgTimeCube:
+
+    def __init__(self, df):
+        frame = pd.DataFrame(index=df.index)
+        for dim in DIMENSIONS:
+            if dim == 'month':
+                frame[dim] = df['regymdt'].dt.to_period(
+                    'M') if 'regymdt' in df.columns else pd.NaT
+            else:
+                frame[dim] = df[dim] if dim in df.columns else None
+
+        if 'user_id' in df.columns:
+            user_codes, self.user_ids = pd.factorize(df['user_id'])
+        else:
+            user_codes, self.user_ids = np.full(len(df), -1), pd.Index([])
+
+        grouped = frame.groupby(list(DIMENSIONS),
+                                dropna=False,
+                                observed=True,
+                                sort=False)
+        cell_of_row = grouped.ngroup().to_numpy()
+        n_cells = int(cell_of_row.max()) + 1 if len(cell_of_row) else 0
+        _, first_rows = np.unique(cell_of_row, return_index=True)
+
+        self.cells = frame.iloc[first_rows].reset_index(drop=True)
+        self.cells['rows'] = np.bincount(cell_of_row, minlength=n_cells)
+        if 'question' in df.columns:
+            self.cells['questions'] = np.bincount(
+                cell_of_row,
+                weights=df['question'].notna().to_numpy(),
+                minlength=n_cells).astype(np.int64)
+        else:
+            self.cells['questions'] = 0
+
+        valid = user_codes >= 0
+        self._set_users(cell_of_row[valid], user_codes[valid], n_cells)
+
+        self._memo = {}
+        dates = df['regymdt'].dropna() if 'regymdt' in df.columns else []
+        self.first_date = dates.min() if len(dates) else None
+        self.last_date = dates.max() if len(dates) else None
+
+    def _set_users(self, cell_ids, user_codes, n_cells):
+        """셀별 이용자 집합 (CSR: user_ptr[c]:user_ptr[c+1] 구간이 셀 c 의 이용자 코드)."""
+        n_users = max(len(self.user_ids), 1)
+        pairs = np.unique(cell_ids.astype(np.int64) * n_users + user_codes)
+        self.user_codes = (pairs % n_users).astype(np.int32)
+        self.user_ptr = np.concatenate([[0],
+                                        np.cumsum(
+                                            np.bincount(pairs // n_users,
+                                                        minlength=n_cells))])
+
+    def extend(self, delta):
+        """delta 행을 더한 새 큐브. delta 만 집계해 기존 셀과 합치므로 원본 행은 다시 훑지 않는다."""
+        other = OrgTimeCube(delta)
+        merged = object.__new__(OrgTimeCube)
+
+        # 이용자 번호: 기존 번호는 그대로 두고 처음 보는 이용자만 뒤에 붙인다
+        remap = self.user_ids.get_indexer(other.user_ids)
+        new = remap < 0
+        merged.user_ids = self.user_ids.append(other.user_ids[new])
+        remap[new] = len(self.user_ids) + np.arange(new.sum())
+
+        cells = pd.concat([self.cells, other.cells], ignore_index=True)
+        cell_of = cells.groupby(list(DIMENSIONS),
+                                dropna=False,
+                                observed=True,
+                                sort=False).ngroup().to_numpy()
+        n_cells = int(cell_of.max()) + 1 if len(cell_of) else 0
+        _, first_rows = np.unique(cell_of, return_index=True)
+        merged.cells = cells.iloc[first_rows][list(DIMENSIONS)].reset_index(
+            drop=True)
+        for col in ('rows', 'questions'):
+            merged.cells[col] = np.bincount(
+                cell_of, weights=cells[col].to_numpy(),
+                minlength=n_cells).astype(np.int64)
+
+        # 두 큐브의 (셀, 이용자) 쌍을 합친 뒤 중복 제거
+        merged._set_users(
+            np.concatenate([
+                np.repeat(cell_of[:len(self.cells)], np.diff(self.user_ptr)),
+                np.repeat(cell_of[len(self.cells):], np.diff(other.user_ptr))
+            ]),
+            np.concatenate([self.user_codes, remap[other.user_codes]]),
+            n_cells)
+
+        merged._memo = {}
+        dates = [d for d in (self.first_date, self.last_date, other.first_date,
+                             other.last_date) if d is not None]
+        merged.first_date = min(dates) if dates else None
+        merged.last_date = max(dates) if dates else None
+        return merged
+
+    def _select(self, filters):
+        mask = np.ones(len(self.cells), dtype=bool)
+        for dim, value in filters.items():
+            if value is not None:
+                mask &= (self.cells[dim] == value).to_numpy()
+        return self.cells[mask]
+
+    def _count_users(self, cell_ids):
+        if len(cell_ids) == 0:
+            return 0
+        codes = np.concatenate([
+            self.user_codes[self.user_ptr[c]:self.user_ptr[c + 1]]
+            for c in cell_ids
+        ])
+        return len(np.unique(codes))
+
+    def totals(self, **filters):
+        """필터에 해당하는 전체 행 수, 질문 수, 고유 이용자 수."""
+        if not any(value is not None for value in filters.values()):
+            cells = self.cells
+            users = len(self.user_ids)
+        else:
+            cells = self._select(filters)
+            users = self._count_users(cells.index)
+        return {
+            'rows': int(cells['rows'].sum()),
+            'questions': int(cells['questions'].sum()),
+            'users': users,
+        }
+
+    def rollup(self, by, **filters):
+        """by 차원별로 셀을 합친 표 (by..., rows, questions, users).
+
+        filters 는 차원=값 조건이며 None 인 조건은 무시한다. by 차원 값이 비어 있는
+        셀은 제외한다.
+        """
+        by = list(by)
+        memo_key = (tuple(by), tuple(sorted(filters.items())))
+        if memo_key in self._memo:
+            return self._memo[memo_key].copy()
+        cells = self._select(filters)
+        records = []
+        for key, positions in cells.groupby(by, observed=True,
+                                            sort=False).indices.items():
+            group = cells.iloc[positions]
+            key = key if isinstance(key, tuple) else (key, )
+            records.append(key + (int(group['rows'].sum()),
+                                  int(group['questions'].sum()),
+                                  self._count_users(group.index)))
+        result = pd.DataFrame(records,
+                              columns=by + ['rows', 'questions', 'users'])
+        self._memo[memo_key] = result
+        return result.copy()
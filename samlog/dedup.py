@@ -0,0 +1,265 @@
+"""반복 질문 묶기 (완전 중복 + MinHash/LSH 유사 중복).
+
+같은 사람이 같은 질문을 다시 올리거나 자주 묻는 질문을 복사해 붙인 행이 많아, 질문
+수·순위·GPT 프롬프트 표본이 부풀려진다. 질문을 정규화(소문자, 기호·공백 정리)한 문장의
+해시로 완전 중복을 먼저 묶고, 처음 보는 문장만 글자 3-gram MinHash 서명을 만들어 LSH
+버킷이 겹치는 문장끼리 유사 중복으로 묶는다.
+
+- 서명은 NUM_PERM 개, LSH 는 BANDS 개 밴드 (밴드당 NUM_PERM / BANDS 행) 이다. 버킷이
+  겹친 후보는 서명 하위 8비트(b-bit MinHash)로 추정한 글자 3-gram 자카드 유사도가
+  THRESHOLD 이상일 때만 묶어, 흔한 어미("방법이 궁금합니다")만 같은 문장끼리 이어지지 않게 한다.
+- 청크 단위로 extend 할 수 있어 적재하면서 함께 쌓는다 (analytics.FOLD). 보관하는 것은
+  문장 해시와 밴드 키(정렬 배열), 문장별 8비트 서명과 묶음(union-find) 뿐이라 원문은 들고
+  있지 않는다 (서로 다른 문장 하나에 약 150바이트).
+- 묶음 번호는 묶음에서 처음 나온 문장의 번호이고, 질문이 없는 행은 -1 이다.
+"""
+import numpy as np
+import pandas as pd
+
+NUM_PERM = 64
+BANDS = 16
+THRESHOLD = 0.8
+SHINGLE = 3
+CHUNK_TEXTS = 20_000
+
+_rng = np.random.default_rng(20240521)
+# multiply-shift 해시 계수 (홀수) 와 밴드별 솔트
+_PERM_A = _rng.integers(1, 2**63, NUM_PERM, dtype=np.uint64) | np.uint64(1)
+_PERM_B = _rng.integers(0, 2**63, NUM_PERM, dtype=np.uint64)
+_BAND_SALT = _rng.integers(0, 2**63, BANDS, dtype=np.uint64)
+
+
+def normalize_questions(texts):
+    """비교용 문장: 소문자, 글자·숫자 외 기호를 공백으로, 연속 공백을 하나로."""
+    return texts.astype(object).str.lower().str.replace(
+        r'[\W_]+', ' ', regex=True).str.strip()
+
+
+def text_hashes(normalized):
+    """정규화 문장의 해시 (uint64)."""
+    return pd.util.hash_pandas_object(normalized, index=False).to_numpy()
+
+
+def _lookup(sorted_keys, values, keys):
+    """정렬된 sorted_keys 에서 keys 를 찾아 대응하는 values (없으면 -1)."""
+    if len(sorted_keys) == 0:
+        return np.full(len(keys), -1, dtype=np.int64)
+    positions = np.minimum(np.searchsorted(sorted_keys, keys),
+                           len(sorted_keys) - 1)
+    return np.where(sorted_keys[positions] == keys, values[positions], -1)
+
+
+def _insert(sorted_keys, values, keys, new_values):
+    # 정렬을 유지하며 끼워 넣는다 (전체를 다시 정렬하지 않음)
+    order = np.argsort(keys, kind='stable')
+    keys, new_values = keys[order], new_values[order]
+    at = np.searchsorted(sorted_keys, keys)
+    return np.insert(sorted_keys, at, keys), np.insert(values, at, new_values)
+
+
+def minhash(texts):
+    """문장마다 글자 3-gram MinHash 서명 ((문장 수, NUM_PERM) uint32).
+
+    3-gram 이 하나도 없는 짧은 문장은 서명이 모두 0xFFFFFFFF 이다.
+    """
+    signatures = np.full((len(texts), NUM_PERM), 0xFFFFFFFF, dtype=np.uint32)
+    for start in range(0, len(texts), CHUNK_TEXTS):
+        part = texts[start:start + CHUNK_TEXTS]
+        # 문장들을 '\0' 으로 이어 붙인 코드 포인트 배열에서 3-gram 을 한 번에 만든다
+        codes = np.frombuffer("\0".join(part).encode("utf-32-le"),
+                              dtype=np.uint32).astype(np.uint64)
+        if len(codes) < SHINGLE:
+            continue
+        grams = (codes[:-2] << np.uint64(42)) | (codes[1:-1] << np.uint64(21)) | codes[2:]
+        valid = (codes[:-2] != 0) & (codes[1:-1] != 0) & (codes[2:] != 0)
+        lengths = np.array([len(text) + 1 for text in part])
+        docs = np.repeat(np.arange(len(part)), lengths)[:len(grams)][valid]
+        grams = grams[valid]
+        if not len(grams):
+            continue
+        firsts = np.flatnonzero(np.r_[True, np.diff(docs) != 0])
+        rows = start + docs[firsts]
+        for perm in range(NUM_PERM):
+            hashed = ((grams * _PERM_A[perm] + _PERM_B[perm]) >>
+                      np.uint64(32)).astype(np.uint32)
+            signatures[rows, perm] = np.minimum.reduceat(hashed, firsts)
+    return signatures
+
+
+def band_keys(signatures):
+    """서명을 BANDS 개 밴드로 나눈 밴드 키 ((문장 수, BANDS) uint32, 밴드마다 다른 솔트).
+
+    키가 우연히 겹쳐도 후보 확인에서 걸러지므로 32비트로 충분하다.
+    """
+    rows = NUM_PERM // BANDS
+    keys = np.empty((len(signatures), BANDS), dtype=np.uint32)
+    for band in range(BANDS):
+        key = np.full(len(signatures), _BAND_SALT[band], dtype=np.uint64)
+        for col in range(band * rows, (band + 1) * rows):
+            key = (key * np.uint64(0x100000001B3)) ^ signatures[:, col]
+        keys[:, band] = key >> np.uint64(32)
+    return keys
+
+
+def estimated_jaccard(sketches_a, sketches_b):
+    """8비트 서명 두 묶음의 행별 자카드 유사도 추정값 (우연히 같을 확률 1/256 보정)."""
+    agree = (sketches_a == sketches_b).mean(axis=1)
+    return (agree - 1 / 256) / (1 - 1 / 256)
+
+
+class _DuplicateGroups:
+    """exact_labels() / labels() 로 행별 묶음을 알려 주는 객체의 공통 집계."""
+
+    def keep_mask(self):
+        """묶음마다 처음 나온 행과 질문이 없는 행만 True."""
+        labels = self.labels()
+        present = np.flatnonzero(labels >= 0)
+        _, firsts = np.unique(labels[present], return_index=True)
+        keep = labels < 0
+        keep[present[firsts]] = True
+        return keep
+
+    def stats(self):
+        """질문 행 수, 서로 다른 문장 수, 묶음 수, 완전/유사 중복으로 빠지는 행 수."""
+        labels = self.labels()
+        present = labels >= 0
+        questions = int(present.sum())
+        texts = len(np.unique(self.exact_labels()[present]))
+        groups = len(np.unique(labels[present]))
+        return {
+            'questions': questions,
+            'texts': texts,
+            'groups': groups,
+            'exact_duplicates': questions - texts,
+            'near_duplicates': texts - groups
+        }
+
+
+class QuestionDedup(_DuplicateGroups):
+    """행별 반복 질문 묶음. 문장 번호는 처음 나온 순서, 묶음 번호는 묶음의 가장 작은 문장 번호."""
+
+    def __init__(self, df, column='question'):
+        self.column = column
+        self.n_rows = 0
+        self.row_texts = np.empty(0, dtype=np.int32)
+        self._text_keys = np.empty(0, dtype=np.uint64)
+        self._text_ids = np.empty(0, dtype=np.int32)
+        self._band_keys = np.empty(0, dtype=np.uint32)
+        self._band_ids = np.empty(0, dtype=np.int32)
+        self._sketches = np.empty((0, NUM_PERM), dtype=np.uint8)
+        self._parent = np.empty(0, dtype=np.int32)
+        self._add(df)
+
+    @property
+    def n_texts(self):
+        return len(self._parent)
+
+    def extend(self, delta):
+        """delta 행을 더한 새 객체 (기존 객체는 그대로 둔다)."""
+        dedup = object.__new__(QuestionDedup)
+        dedup.__dict__.update(self.__dict__)
+        dedup._parent = self._parent.copy()
+        dedup._add(delta)
+        return dedup
+
+    def _add(self, df):
+        texts = df[self.column] if self.column in df.columns else pd.Series(
+            [None] * len(df), dtype=object)
+        present = texts.notna().to_numpy()
+        normalized = normalize_questions(texts[present])
+        hashes = text_hashes(normalized)
+
+        # 완전 중복: 청크 안에서 먼저 묶고, 처음 보는 문장만 새 번호를 준다
+        codes, unique_hashes = pd.factorize(hashes)
+        ids = _lookup(self._text_keys, self._text_ids, unique_hashes)
+        new = np.flatnonzero(ids < 0)
+        ids[new] = self.n_texts + np.arange(len(new))
+        row_texts = np.full(len(df), -1, dtype=np.int32)
+        row_texts[present] = ids[codes]
+        self.row_texts = np.concatenate([self.row_texts, row_texts])
+        self.n_rows += len(df)
+        if not len(new):
+            return
+
+        self._text_keys, self._text_ids = _insert(self._text_keys,
+                                                  self._text_ids,
+                                                  unique_hashes[new],
+                                                  ids[new].astype(np.int32))
+        first_rows = pd.Series(np.arange(len(codes))).groupby(
+            codes, sort=True).first().to_numpy()
+        new_texts = list(normalized.iloc[first_rows[new]])
+        new_ids = ids[new].astype(np.int32)
+        self._parent = np.concatenate([self._parent, new_ids])
+
+        # 유사 중복: 밴드 키가 기존 문장이나 같은 청크의 다른 문장과 겹친 후보 중
+        # 추정 유사도가 THRESHOLD 이상인 것만 묶는다
+        signatures = minhash(new_texts)
+        self._sketches = np.concatenate(
+            [self._sketches, signatures.astype(np.uint8)])
+        has_grams = signatures[:, 0] != 0xFFFFFFFF
+        keys = band_keys(signatures[has_grams]).ravel()
+        key_ids = np.repeat(new_ids[has_grams], BANDS)
+        known = _lookup(self._band_keys, self._band_ids, keys)
+        edges = [(key_ids[known >= 0], known[known >= 0])]
+        order = np.argsort(keys, kind='stable')
+        sorted_keys, sorted_ids = keys[order], key_ids[order]
+        firsts = np.r_[True, sorted_keys[1:] != sorted_keys[:-1]]
+        group_first = sorted_ids[firsts][np.cumsum(firsts) - 1]
+        edges.append((sorted_ids[~firsts], group_first[~firsts]))
+        u = np.concatenate([u for u, _ in edges])
+        v = np.concatenate([v for _, v in edges])
+        similar = estimated_jaccard(self._sketches[u],
+                                    self._sketches[v]) >= THRESHOLD
+        self._union(u[similar], v[similar])
+
+        # 처음 보는 밴드 키만 색인에 더한다
+        unseen = (known < 0) & firsts[np.argsort(order)]
+        self._band_keys, self._band_ids = _insert(self._band_keys,
+                                                  self._band_ids, keys[unseen],
+                                                  key_ids[unseen])
+
+    def _compress(self):
+        parent = self._parent
+        while True:
+            grand = parent[parent]
+            if np.array_equal(grand, parent):
+                return
+            parent[:] = grand
+
+    def _union(self, u, v):
+        # 각 간선의 두 루트 중 큰 쪽을 작은 쪽에 붙이는 것을 모든 간선이 합쳐질 때까지 반복
+        while len(u):
+            self._compress()
+            ru, rv = self._parent[u], self._parent[v]
+            differ = ru != rv
+            if not differ.any():
+                break
+            u, v = u[differ], v[differ]
+            np.minimum.at(self._parent, np.maximum(ru, rv)[differ],
+                          np.minimum(ru, rv)[differ])
+        self._compress()
+
+    def exact_labels(self):
+        """행별 정규화 문장 번호 (완전 중복끼리 같은 값, 질문이 없으면 -1)."""
+        return self.row_texts
+
+    def labels(self):
+        """행별 묶음 번호 (완전·유사 중복끼리 같은 값, 질문이 없으면 -1)."""
+        if not self.n_texts:
+            return self.row_texts.copy()
+        return np.where(self.row_texts >= 0,
+                        self._parent[np.maximum(self.row_texts, 0)], -1)
+
+
+class DedupView(_DuplicateGroups):
+    """부모 묶음에서 일부 행(positions)만 보는 객체. 처음 나온 행은 부분 집합 안에서 다시 정한다."""
+
+    def __init__(self, dedup, positions):
+        self.dedup = dedup
+        self.positions = positions
+
+    def exact_labels(self):
+        return self.dedup.exact_labels()[self.positions]
+
+    def labels(self):
+        return self.dedup.labels()[self.positions]
@@ -0,0 +1,383 @@
+"""질문 문장 벡터와 근사 최근접 이웃(ANN) 색인.
+
+글자 그대로의 단어 검색과 chat_title 집계로는 말만 바꾼 같은 질문을 묶지 못하므로,
+질문마다 문장 벡터를 만들어 의미가 가까운 질문을 찾고 주제별로 묶는다.
+
+- 인코더는 encode(texts) → (행 수, dim) float32 (L2 정규화) 만 있으면 바꿔 끼울 수 있다.
+  기본값 HashingEncoder 는 외부 모델 없이 조사를 뗀 낱말의 글자 n-gram 을 고정 난수
+  벡터로 해시해 더한다 (회의실/회의실을/대회의실 이 가까워진다). sentence-transformers
+  가 설치되어 있으면 SAM_ENCODER=st:<모델 이름> 으로 로컬 모델을 쓸 수 있다.
+- 벡터는 배치 단위로 계산해 float16 .npy 로 저장하고 메모리 매핑으로 읽는다. 같은
+  데이터셋(키)·인코더면 다음 실행부터 다시 계산하지 않는다.
+- ANN 은 IVF 방식이다: 구면 k-means 중심점으로 벡터를 목록에 나눠 두고, 검색할 때는
+  질의와 가까운 중심점 몇 개의 목록만 정확히 비교한다.
+"""
+import hashlib
+import os
+import threading
+import zlib
+
+import numpy as np
+import pandas as pd
+
+from samlog.csr import concat_ranges
+from samlog.korean import TermMatrix
+
+EMBED_DIR = os.path.join(".sam_cache", "embeddings")
+# 디스크에 남기는 벡터 파일 수 (최근에 만들거나 쓴 것부터)
+MAX_CACHED_VECTORS = 8
+DIM = 128
+HASH_BUCKETS = 1 << 16
+BATCH_ROWS = 50_000
+
+# IVF 색인: 목록 수 상한, k-means 학습 표본 수, 검색 시 살펴보는 목록 수
+MAX_LISTS = 4096
+TRAIN_SAMPLE = 50_000
+N_PROBE = 16
+
+
+def _normalize(vectors):
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return np.divide(vectors, norms, out=np.zeros_like(vectors), where=norms > 0)
+
+
+class HashingEncoder:
+    """조사를 뗀 낱말의 글자 1~3-gram 해시 벡터 합으로 만드는 문장 벡터 (모델 불필요)."""
+
+    def __init__(self, dim=DIM, buckets=HASH_BUCKETS, seed=0):
+        self.dim = dim
+        # 표제어 규칙이 바뀌면 벡터도 바뀌므로 이름(디스크 캐시 키)에 판을 붙인다
+        self.name = f"hashing-{dim}-v2"
+        self._buckets = buckets
+        # n-gram 해시 칸마다 고정 난수 벡터 (seed 가 같으면 프로세스가 달라도 같은 값)
+        self._table = np.random.default_rng(seed).standard_normal(
+            (buckets, dim), dtype=np.float32)
+        self._grams = {}
+        self._lock = threading.Lock()
+
+    def _gram_buckets(self, lemma):
+        with self._lock:
+            buckets = self._grams.get(lemma)
+        if buckets is None:
+            padded = f"<{lemma}>"
+            grams = [padded] + [
+                padded[i:i + n] for n in (2, 3)
+                for i in range(len(padded) - n + 1)
+            ]
+            buckets = np.array(
+                [zlib.crc32(gram.encode()) % self._buckets for gram in grams])
+            with self._lock:
+                self._grams[lemma] = buckets
+        return buckets
+
+    def _lemma_vectors(self, lemmas):
+        buckets = [self._gram_buckets(lemma) for lemma in lemmas]
+        lengths = np.array([len(b) for b in buckets])
+        if not len(lemmas):
+            return np.zeros((0, self.dim), dtype=np.float32)
+        flat = np.concatenate(buckets)
+        starts = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+        return _normalize(np.add.reduceat(self._table[flat], starts, axis=0))
+
+    def encode(self, texts, chunk_entries=100_000):
+        texts = pd.Series(list(texts), dtype=object)
+        matrix = TermMatrix(texts)
+        entry_lemmas, lemmas = matrix.lemma_entries()
+        keep = entry_lemmas >= 0
+        docs = matrix.docs[keep]
+        entry_lemmas = entry_lemmas[keep]
+        weights = 1 + np.log(matrix.counts[keep].astype(np.float32))
+        lemma_vectors = self._lemma_vectors(lemmas)
+
+        # 항목을 행 순으로 정렬해 행마다 (가중치 × 표제어 벡터) 를 더한다
+        order = np.argsort(docs, kind='stable')
+        out = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for start in range(0, len(order), chunk_entries):
+            part = order[start:start + chunk_entries]
+            part_docs = docs[part]
+            firsts = np.flatnonzero(np.r_[True, np.diff(part_docs) != 0])
+            sums = np.add.reduceat(
+                lemma_vectors[entry_lemmas[part]] * weights[part, None],
+                firsts,
+                axis=0)
+            out[part_docs[firsts]] += sums
+        return _normalize(out)
+
+
+class SentenceTransformerEncoder:
+    """로컬 sentence-transformers 모델 (선택 의존성)."""
+
+    def __init__(self, model_name):
+        from sentence_transformers import SentenceTransformer
+
+        self._model = SentenceTransformer(model_name)
+        self.dim = self._model.get_sentence_embedding_dimension()
+        self.name = "st-" + model_name.replace("/", "_")
+
+    def encode(self, texts):
+        return self._model.encode(list(pd.Series(list(texts)).fillna('')),
+                                  batch_size=64,
+                                  normalize_embeddings=True,
+                                  convert_to_numpy=True).astype(np.float32)
+
+
+_encoders = {}
+_encoders_lock = threading.Lock()
+
+
+def get_encoder(spec=None):
+    """인코더 (프로세스 전체 공유). spec 기본값은 SAM_ENCODER 환경 변수, 없으면 'hashing'."""
+    spec = spec or os.environ.get("SAM_ENCODER", "hashing")
+    with _encoders_lock:
+        if spec not in _encoders:
+            if spec.startswith("st:"):
+                _encoders[spec] = SentenceTransformerEncoder(spec[3:])
+            elif spec == "hashing":
+                _encoders[spec] = HashingEncoder()
+            else:
+                raise ValueError(f"알 수 없는 인코더: {spec}")
+        return _encoders[spec]
+
+
+def assign(vectors, centroids, positions=None, batch_rows=BATCH_ROWS):
+    """각 벡터(positions 를 주면 그 행들)와 가장 가까운 중심점 번호와 코사인 유사도.
+
+    영벡터는 -1. 메모리 매핑된 벡터도 배치만큼만 읽는다.
+    """
+    n = len(vectors) if positions is None else len(positions)
+    labels = np.empty(n, dtype=np.int32)
+    scores = np.empty(n, dtype=np.float32)
+    for start in range(0, n, batch_rows):
+        rows = slice(start, start + batch_rows) if positions is None else (
+            positions[start:start + batch_rows])
+        block = np.asarray(vectors[rows], dtype=np.float32)
+        sims = block @ centroids.T
+        best = sims.argmax(axis=1)
+        labels[start:start + len(block)] = np.where(
+            np.abs(block).sum(axis=1) > 0, best, -1)
+        scores[start:start + len(block)] = sims[np.arange(len(block)), best]
+    return labels, scores
+
+
+def kmeans(vectors, k, iterations=10, seed=0):
+    """구면 k-means 중심점 (L2 정규화된 (k, dim) float32). vectors 는 영벡터가 없는 표본."""
+    rng = np.random.default_rng(seed)
+    vectors = np.asarray(vectors, dtype=np.float32)
+    k = max(1, min(k, len(vectors)))
+    centroids = vectors[rng.choice(len(vectors), k, replace=False)]
+    for _ in range(iterations):
+        labels = (vectors @ centroids.T).argmax(axis=1)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, labels, vectors)
+        empty = np.bincount(labels, minlength=k) == 0
+        # 빈 중심점은 임의의 표본으로 다시 시작
+        sums[empty] = vectors[rng.choice(len(vectors), int(empty.sum()))]
+        centroids = _normalize(sums)
+    return centroids
+
+
+def _sample(vectors, positions, size, seed):
+    """positions 중 영벡터가 아닌 최대 size 개 표본 (float32)."""
+    rng = np.random.default_rng(seed)
+    if len(positions) > size:
+        positions = np.sort(rng.choice(positions, size, replace=False))
+    sample = np.asarray(vectors[positions], dtype=np.float32)
+    return sample[np.abs(sample).sum(axis=1) > 0]
+
+
+class IVFIndex:
+    """역파일(IVF) 근사 최근접 이웃 색인. 목록 l 의 행 위치는 order[ptr[l]:ptr[l+1]]."""
+
+    def __init__(self, vectors, n_lists=None, seed=0):
+        self.vectors = vectors
+        n_lists = n_lists or int(np.clip(np.sqrt(len(vectors)), 1, MAX_LISTS))
+        sample = _sample(vectors, np.arange(len(vectors)), TRAIN_SAMPLE, seed)
+        self.centroids = kmeans(sample, n_lists, seed=seed) if len(
+            sample) else np.zeros((1, vectors.shape[1]), dtype=np.float32)
+        self.labels, _ = assign(vectors, self.centroids)
+        self._build_lists()
+
+    def _build_lists(self):
+        valid = np.flatnonzero(self.labels >= 0)
+        self.order = valid[np.argsort(self.labels[valid],
+                                      kind='stable')].astype(np.int32)
+        self.ptr = np.concatenate(([0],
+                                   np.cumsum(
+                                       np.bincount(self.labels[valid],
+                                                   minlength=len(
+                                                       self.centroids)))))
+
+    def extend(self, vectors):
+        """vectors 행을 뒤에 붙인 새 색인. 중심점은 그대로 두고 새 행만 목록에 넣는다."""
+        index = object.__new__(IVFIndex)
+        index.vectors = vectors
+        index.centroids = self.centroids
+        labels, _ = assign(vectors,
+                           self.centroids,
+                           positions=np.arange(len(self.labels), len(vectors)))
+        index.labels = np.concatenate([self.labels, labels])
+        index._build_lists()
+        return index
+
+    def search(self, query, k=10, n_probe=N_PROBE, allowed=None):
+        """query 벡터와 가까운 행 위치와 유사도 (유사도 내림차순).
+
+        allowed(오름차순 행 위치)를 주면 그 행들 안에서만 찾는다. allowed 가 적으면 목록을
+        그만큼 더 살펴보고, 살펴볼 후보보다도 적으면 allowed 전체를 정확히 비교한다.
+        """
+        query = np.asarray(query, dtype=np.float32)
+        n_lists = len(self.centroids)
+        n_probe = min(n_probe, n_lists)
+        if allowed is not None and len(allowed) < len(self.labels):
+            if len(allowed) <= len(self.order) * n_probe / n_lists:
+                return self._rank(allowed, query, k)
+            n_probe = min(
+                n_lists,
+                int(np.ceil(n_probe * len(self.labels) / max(len(allowed),
+                                                              1))))
+        lists = np.argpartition(-(self.centroids @ query), n_probe - 1)[:n_probe]
+        starts = self.ptr[lists]
+        candidates = np.sort(self.order[concat_ranges(
+            starts, self.ptr[lists + 1] - starts)])
+        if allowed is not None:
+            at = np.minimum(np.searchsorted(allowed, candidates),
+                            len(allowed) - 1)
+            candidates = candidates[allowed[at] == candidates]
+        return self._rank(candidates, query, k)
+
+    def _rank(self, candidates, query, k):
+        if not len(candidates):
+            return candidates, np.empty(0, dtype=np.float32)
+        scores = np.asarray(self.vectors[candidates], dtype=np.float32) @ query
+        top = np.argsort(-scores, kind='stable')[:k]
+        return candidates[top], scores[top]
+
+
+def _cache_path(key, encoder, cache_dir):
+    digest = hashlib.sha1(str(key).encode()).hexdigest()[:20]
+    return os.path.join(cache_dir, f"{digest}-{encoder.name}.npy")
+
+
+def prune_cache(cache_dir, keep=None):
+    """cache_dir 의 벡터 파일을 최근 수정 순으로 keep 개(기본 MAX_CACHED_VECTORS)만 남긴다."""
+    if keep is None:
+        keep = MAX_CACHED_VECTORS
+    paths = [
+        os.path.join(cache_dir, name) for name in os.listdir(cache_dir)
+        if name.endswith(".npy")
+    ]
+    paths.sort(key=os.path.getmtime, reverse=True)
+    for path in paths[keep:]:
+        # 매핑 중인 파일을 지워도 연 쪽은 계속 읽을 수 있다
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+def encode_texts(texts, encoder, path=None, batch_rows=BATCH_ROWS):
+    """texts 를 배치로 인코딩한 float16 벡터. path 를 주면 .npy 로 저장하고 메모리 매핑한다."""
+    if path is None:
+        return np.concatenate([
+            encoder.encode(texts.iloc[start:start + batch_rows]).astype(
+                np.float16) for start in range(0, len(texts), batch_rows)
+        ]) if len(texts) else np.zeros((0, encoder.dim), dtype=np.float16)
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    out = np.lib.format.open_memmap(path + ".tmp",
+                                    mode="w+",
+                                    dtype=np.float16,
+                                    shape=(len(texts), encoder.dim))
+    for start in range(0, len(texts), batch_rows):
+        out[start:start + batch_rows] = encoder.encode(
+            texts.iloc[start:start + batch_rows])
+    out.flush()
+    del out
+    os.replace(path + ".tmp", path)
+    return np.load(path, mmap_mode="r")
+
+
+class QuestionEmbeddings:
+    """데이터셋 질문 벡터와 그 IVF 색인."""
+
+    def __init__(self, vectors, encoder, column='question'):
+        self.vectors = vectors
+        self.encoder = encoder
+        self.column = column
+        self.index = IVFIndex(vectors)
+
+    @classmethod
+    def build(cls,
+              df,
+              key,
+              encoder,
+              column='question',
+              cache_dir=EMBED_DIR):
+        """df[column] 벡터를 만든다 (같은 키·인코더로 저장된 벡터가 있으면 재사용)."""
+        texts = df[column] if column in df.columns else pd.Series(
+            [None] * len(df), dtype=object)
+        path = _cache_path(key, encoder, cache_dir)
+        vectors = None
+        if os.path.exists(path):
+            vectors = np.load(path, mmap_mode="r")
+            if vectors.shape != (len(df), encoder.dim):
+                vectors = None
+            else:
+                # 다시 쓴 파일은 최근 것으로 표시해 정리 대상에서 뒤로 미룬다
+                os.utime(path)
+        if vectors is None:
+            vectors = encode_texts(texts, encoder, path)
+            prune_cache(cache_dir)
+        return cls(vectors, encoder, column)
+
+    def extend(self, delta):
+        """delta 행의 벡터를 더한 새 객체 (증분 저장소용, 메모리에만 보관)."""
+        texts = delta[self.column] if self.column in delta.columns else pd.Series(
+            [None] * len(delta), dtype=object)
+        vectors = np.concatenate(
+            [np.asarray(self.vectors),
+             encode_texts(texts, self.encoder)])
+        embeddings = object.__new__(QuestionEmbeddings)
+        embeddings.vectors = vectors
+        embeddings.encoder = self.encoder
+        embeddings.column = self.column
+        embeddings.index = self.index.extend(vectors)
+        return embeddings
+
+    def similar(self, text, k=10, n_probe=N_PROBE, allowed=None):
+        """text 와 의미가 가까운 행 위치와 유사도. allowed 를 주면 그 행들 안에서만 찾는다."""
+        query = self.encoder.encode([text])[0]
+        if not np.abs(query).sum():
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+        return self.index.search(query, k, n_probe, allowed)
+
+    def clusters(self, positions, n_clusters, seed=0):
+        """positions 행을 n_clusters 개 주제로 묶는다.
+
+        (행별 주제 번호 (영벡터는 -1), 행별 중심점 유사도, 중심점) 을 돌려준다.
+        """
+        sample = _sample(self.vectors, positions, TRAIN_SAMPLE, seed)
+        if not len(sample):
+            return (np.full(len(positions), -1, dtype=np.int32),
+                    np.zeros(len(positions), dtype=np.float32),
+                    np.zeros((0, self.vectors.shape[1]), dtype=np.float32))
+        centroids = kmeans(sample, n_clusters, seed=seed)
+        labels, scores = assign(self.vectors, centroids, positions)
+        return labels, scores, centroids
+
+
+class EmbeddingsView:
+    """부모 질문 벡터에서 일부 행(positions, 오름차순)만 보는 객체. 행 위치는 부분 집합 기준이다."""
+
+    def __init__(self, embeddings, positions):
+        self.embeddings = embeddings
+        self.positions = positions
+
+    def similar(self, text, k=10, n_probe=N_PROBE, allowed=None):
+        found, scores = self.embeddings.similar(
+            text, k, n_probe,
+            self.positions if allowed is None else self.positions[allowed])
+        return np.searchsorted(self.positions, found), scores
+
+    def clusters(self, positions, n_clusters, seed=0):
+        return self.embeddings.clusters(self.positions[positions], n_clusters,
+                                        seed)
@@ -0,0 +1,104 @@
+"""GPT 응답 디스크 캐시 (SQLite).
+
+(모델, 온도, 메시지) 해시를 키로 응답 본문을 저장해, 같은 리포트를 다시 요청하면
+API 를 호출하지 않고 바로 돌려준다. 앱을 다시 시작해도 유지되며, 오래된 항목은
+TTL 과 개수/용량 한도에 따라 최근에 덜 쓰인 것부터 지운다.
+"""
+import os
+import sqlite3
+import threading
+import time
+
+CACHE_PATH = os.path.join(".sam_cache", "gpt_responses.sqlite3")
+CACHE_TTL = 30 * 24 * 3600
+MAX_ENTRIES = 5000
+MAX_BYTES = 200 * 1024**2
+
+
+class ResponseCache:
+
+    def __init__(self,
+                 path=CACHE_PATH,
+                 ttl=CACHE_TTL,
+                 max_entries=MAX_ENTRIES,
+                 max_bytes=MAX_BYTES):
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path,
+                                     check_same_thread=False,
+                                     isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                model TEXT,
+                content TEXT,
+                size INTEGER,
+                created REAL,
+                accessed REAL
+            )""")
+
+    def get(self, key):
+        """저장된 응답. 없거나 만료되었으면 None."""
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT content, created FROM responses WHERE key = ?",
+                (key, )).fetchone()
+            if row is None or (self.ttl and now - row[1] > self.ttl):
+                if row is not None:
+                    self._conn.execute("DELETE FROM responses WHERE key = ?",
+                                       (key, ))
+                self.misses += 1
+                return None
+            self._conn.execute("UPDATE responses SET accessed = ? WHERE key = ?",
+                               (now, key))
+            self.hits += 1
+            return row[0]
+
+    def put(self, key, model, content):
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?)",
+                (key, model, content, len(content.encode()), now, now))
+            self._evict(now)
+
+    def _evict(self, now):
+        if self.ttl:
+            self._conn.execute("DELETE FROM responses WHERE created < ?",
+                               (now - self.ttl, ))
+        entries, size = self._conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses").fetchone()
+        while entries > self.max_entries or size > self.max_bytes:
+            # 최근 사용 시각이 가장 오래된 10% 를 한 번에 지운다
+            batch = max(1, entries // 10)
+            self._conn.execute(
+                "DELETE FROM responses WHERE key IN ("
+                "SELECT key FROM responses ORDER BY accessed LIMIT ?)",
+                (batch, ))
+            entries, size = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses"
+            ).fetchone()
+
+    def stats(self):
+        with self._lock:
+            entries, size = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses"
+            ).fetchone()
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'entries': entries,
+            'bytes': size
+        }
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM responses")
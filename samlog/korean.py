@@ -0,0 +1,222 @@
+"""한국어 토큰화와 단어-문서 빈도 행렬.
+
+문장을 공백·문장부호 기준 토큰으로 나눠 열(question/answer/title)마다 희소 단어-문서
+행렬(TermMatrix)을 만든다. 행렬은 토큰 원형 그대로의 어휘를 가지므로 단어 검색에
+그대로 쓰고, 빈도 집계(워드클라우드, GPT 프롬프트 키워드)는 조사를 떼어 같은 낱말로
+모은 표제어 기준으로 한다 (회의실을/회의실은 → 회의실). 조사 제거는 행 단위가 아니라
+어휘 단위로 한 번만 한다.
+
+- 두 글자 이상 조사(에서, 으로, 에게 …)는 남는 말이 두 글자 이상이면 뗀다.
+- 명사 끝 글자로는 거의 쓰이지 않는 한 글자 조사(을, 를, 은, 는, 에)는 그냥 뗀다.
+- 나머지 한 글자 조사(이, 가, 의, 도 …)는 뗀 말이 데이터에 따로 나오는 경우에만 뗀다
+  (연차휴가 → 연차휴 처럼 낱말 끝 글자를 조사로 오인하지 않도록).
+- 조사보다 먼저 묻는 말 어미(하나요, 인가요 …)를 뗀다 (확인하나요 → 확인).
+
+불용어와 한 글자 토큰은 빈도 집계에서 뺀다. 불용어는 원래 토큰과 표제어 양쪽에서 거르므로
+조사·어미를 떼어 모양이 바뀐 불용어(하나요 → 하나)도 빠진다.
+"""
+import numpy as np
+import pandas as pd
+
+from samlog.csr import concat_ranges
+
+TOKEN_SPLIT = r'[^\w]+'
+
+_DOC_BITS = 32
+_DOC_MASK = (1 << _DOC_BITS) - 1
+
+LONG_PARTICLES = ('에서는', '으로는', '에게서', '이라고', '에서', '에게', '께서', '으로',
+                  '까지', '부터', '보다', '처럼', '마다', '이나', '이랑', '라고', '하고', '에는',
+                  '로는', '과의', '와의', '에도', '만큼')
+CLEAR_PARTICLES = ('은', '는', '을', '를', '에')
+AMBIGUOUS_PARTICLES = ('이', '가', '의', '와', '과', '도', '만', '로', '나', '랑', '요')
+# 묻는 말 어미 (뗀 말이 두 글자 이상일 때만)
+QUESTION_ENDINGS = ('하나요', '한가요', '할까요', '되나요', '인가요', '인지요', '나요', '까요')
+
+STOPWORDS = frozenset({
+    '어떻게', '어디서', '어디에', '어떤', '무엇', '무슨', '언제', '누가', '왜', '혹시', '그리고', '그런데',
+    '하지만', '또는', '및', '등', '것', '수', '좀', '더', '때', '저', '제가', '저는', '이번', '해당',
+    '있나요', '있는', '있습니다', '없나요', '없는', '하나요', '하는', '하면', '해야', '합니다',
+    '했는데', '되나요', '되는', '됩니다', '인가요', '인지', '건가요', '하려면', '싶습니다', '궁금합니다',
+    '알려주세요', '부탁드립니다', '감사합니다', '문의', '문의드립니다', '질문', '관련', '가능한가요',
+    '가능한지', '방법이', '답변입니다'
+})
+
+
+def _lemma_map(vocab):
+    """어휘(토큰 목록) → 조사를 뗀 표제어 목록."""
+    vocab = pd.Series(vocab, dtype=object)
+    ended = pd.Series(False, index=vocab.index)
+    for ending in QUESTION_ENDINGS:
+        hit = ~ended & vocab.str.endswith(ending) & (vocab.str.len() >=
+                                                     len(ending) + 2)
+        vocab[hit] = vocab[hit].str.slice(0, -len(ending))
+        ended |= hit
+    lengths = vocab.str.len()
+    lemmas = vocab.copy()
+    stripped = pd.Series(False, index=vocab.index)
+    for particle in LONG_PARTICLES:
+        hit = ~stripped & vocab.str.endswith(particle) & (lengths >=
+                                                           len(particle) + 2)
+        lemmas[hit] = vocab[hit].str.slice(0, -len(particle))
+        stripped |= hit
+
+    stems = vocab.str.slice(0, -1)
+    last = vocab.str.slice(-1)
+    hit = ~stripped & last.isin(CLEAR_PARTICLES) & (lengths >= 3)
+    lemmas[hit] = stems[hit]
+    stripped |= hit
+    # 애매한 조사: 뗀 말이 단독 토큰이나 다른 토큰의 표제어로 나오는 경우만
+    hit = (~stripped & last.isin(AMBIGUOUS_PARTICLES) & (lengths >= 3) &
+           stems.isin(set(lemmas)))
+    lemmas[hit] = stems[hit]
+    return lemmas.to_numpy()
+
+
+class TermMatrix:
+    """텍스트 열 하나의 희소 단어-문서 행렬.
+
+    토큰 t 의 문서(행 위치)는 docs[term_ptr[t]:term_ptr[t+1]] (행 순), 그 행에서 나온
+    횟수는 같은 구간의 counts 이다.
+    """
+
+    def __init__(self, texts, chunk_rows=100_000):
+        self.n_rows = len(texts)
+        vocabs, keys, counts = [], [], []
+        vocab_offset = 0
+        for start in range(0, len(texts), chunk_rows):
+            chunk = texts.iloc[start:start + chunk_rows]
+            tokens = chunk.fillna('').astype(str).str.split(TOKEN_SPLIT,
+                                                            regex=True)
+            tokens.index = np.arange(start, start + len(chunk))
+            tokens = tokens.explode()
+            tokens = tokens[tokens.str.len() > 0]
+
+            codes, uniques = pd.factorize(tokens.to_numpy())
+            pairs, pair_counts = np.unique(
+                ((codes.astype(np.int64) + vocab_offset) << _DOC_BITS)
+                | tokens.index.to_numpy(dtype=np.int64),
+                return_counts=True)
+            vocabs.append(np.asarray(uniques, dtype=object))
+            keys.append(pairs)
+            counts.append(pair_counts)
+            vocab_offset += len(uniques)
+
+        # 청크별 어휘를 하나로 합치고 (토큰, 행) 쌍을 토큰 순으로 정렬
+        if vocabs:
+            global_codes, vocab = pd.factorize(np.concatenate(vocabs))
+            keys = np.concatenate(keys)
+            keys = (global_codes[keys >> _DOC_BITS].astype(np.int64) <<
+                    _DOC_BITS) | (keys & _DOC_MASK)
+            order = np.argsort(keys, kind='stable')
+            keys = keys[order]
+            counts = np.concatenate(counts)[order]
+        else:
+            vocab = []
+            keys = counts = np.empty(0, dtype=np.int64)
+        self.vocab = pd.Index(vocab, dtype=object)
+        self.docs = (keys & _DOC_MASK).astype(np.int32)
+        self.counts = counts.astype(np.int32)
+        self.term_ptr = np.concatenate([[0],
+                                        np.cumsum(
+                                            np.bincount(keys >> _DOC_BITS,
+                                                        minlength=len(
+                                                            self.vocab)))])
+        self._lemmas = None
+
+    def extend(self, texts):
+        """texts 행을 기존 행 뒤에 붙인 새 행렬. 새 행만 토큰화해 각 토큰 구간 뒤에 잇는다."""
+        other = TermMatrix(texts)
+        merged = object.__new__(TermMatrix)
+        merged.n_rows = self.n_rows + other.n_rows
+        merged._lemmas = None
+
+        # 어휘: 기존 토큰 번호는 유지하고 새 토큰만 뒤에 붙인다
+        remap = self.vocab.get_indexer(other.vocab)
+        new = remap < 0
+        merged.vocab = self.vocab.append(other.vocab[new])
+        remap[new] = len(self.vocab) + np.arange(new.sum())
+
+        old_counts = np.zeros(len(merged.vocab), dtype=np.int64)
+        old_counts[:len(self.vocab)] = np.diff(self.term_ptr)
+        new_counts = np.zeros(len(merged.vocab), dtype=np.int64)
+        new_counts[remap] = np.diff(other.term_ptr)
+        merged.term_ptr = np.concatenate([[0],
+                                          np.cumsum(old_counts + new_counts)])
+
+        # 토큰별 구간에 기존 항목, 그 뒤에 새 항목 (행 번호가 더 크므로 정렬 유지)
+        old_terms = np.repeat(np.arange(len(self.vocab)), np.diff(self.term_ptr))
+        old_slots = (merged.term_ptr[old_terms] + np.arange(len(self.docs)) -
+                     self.term_ptr[old_terms])
+        new_terms = np.repeat(np.arange(len(other.vocab)),
+                              np.diff(other.term_ptr))
+        new_slots = (merged.term_ptr[remap[new_terms]] +
+                     old_counts[remap[new_terms]] + np.arange(len(other.docs)) -
+                     other.term_ptr[new_terms])
+        merged.docs = np.empty(merged.term_ptr[-1], dtype=np.int32)
+        merged.docs[old_slots] = self.docs
+        merged.docs[new_slots] = other.docs + self.n_rows
+        merged.counts = np.empty(merged.term_ptr[-1], dtype=np.int32)
+        merged.counts[old_slots] = self.counts
+        merged.counts[new_slots] = other.counts
+        return merged
+
+    def term_ids(self, term, exact=False):
+        """term 과 일치하는 토큰 번호. exact 가 아니면 term 을 포함하는 모든 토큰."""
+        if exact:
+            term_id = self.vocab.get_indexer([term])
+            return term_id[term_id >= 0]
+        return np.flatnonzero(self.vocab.str.contains(term, regex=False))
+
+    def documents(self, term_ids):
+        """토큰들이 나오는 행 위치 (중복 포함)."""
+        starts = self.term_ptr[term_ids]
+        return self.docs[concat_ranges(starts,
+                                       self.term_ptr[term_ids + 1] - starts)]
+
+    def _lemma_index(self):
+        # 항목(토큰, 행)별 표제어 번호와 표제어 목록. 처음 빈도를 구할 때 한 번 만든다.
+        if self._lemmas is None:
+            tokens = self.vocab.str.lower()
+            lemma_codes, lemmas = pd.factorize(_lemma_map(tokens))
+            lemmas = pd.Index(lemmas, dtype=object)
+            dropped = lemmas.isin(STOPWORDS) | (lemmas.str.len() < 2)
+            lemma_codes = np.where(
+                dropped[lemma_codes] | tokens.isin(STOPWORDS), -1,
+                lemma_codes)
+            entry_lemmas = np.repeat(lemma_codes,
+                                     np.diff(self.term_ptr)).astype(np.int32)
+            self._lemmas = (entry_lemmas, lemmas)
+        return self._lemmas
+
+    def lemma_entries(self):
+        """항목(토큰, 행)별 표제어 번호 (불용어·한 글자는 -1) 와 표제어 목록."""
+        return self._lemma_index()
+
+    def frequencies(self, positions=None):
+        """positions 행(없으면 전체)에서 나온 표제어 빈도 (내림차순 Series)."""
+        entry_lemmas, lemmas = self._lemma_index()
+        keep = entry_lemmas >= 0
+        if positions is not None:
+            selected = np.zeros(self.n_rows, dtype=bool)
+            selected[positions] = True
+            keep &= selected[self.docs]
+        counts = np.bincount(entry_lemmas[keep],
+                             weights=self.counts[keep],
+                             minlength=len(lemmas)).astype(np.int64)
+        order = np.flatnonzero(counts)
+        order = order[np.argsort(-counts[order], kind='stable')]
+        return pd.Series(counts[order], index=lemmas[order])
+
+
+def merge_frequencies(*frequencies, top=None):
+    """여러 표제어 빈도를 더해 내림차순으로 (top 개까지)."""
+    frequencies = [counts for counts in frequencies if counts is not None]
+    if not frequencies:
+        return pd.Series(dtype=np.int64)
+    merged = frequencies[0]
+    for counts in frequencies[1:]:
+        merged = merged.add(counts, fill_value=0)
+    merged = merged.astype(np.int64).sort_values(ascending=False,
+                                                 kind='stable')
+    return merged if top is None else merged.head(top)
@@ -0,0 +1,121 @@
+"""질문 데이터와 수강 이력의 사전 계산된 조인.
+
+두 파일의 user_id 는 적재 단계에서 같은 문자열 형태로 정리되므로, 수강 이력의 각 행을
+질문 데이터 이용자 번호(UserIndex.codes 와 같은 번호)로 한 번만 바꿔 둔다. 이후
+조직·키워드로 고른 이용자들의 수강 행은 이용자별 구간을 이어 붙여 꺼내고, 강좌별/조직별
+집계는 정수 코드 위의 bincount 로 계산한다.
+
+이용자의 소속 조직은 질문을 가장 많이 남긴 group_1 로 본다 (겸직·이동으로 여러 조직에
+나타나는 이용자도 하나의 조직에만 집계).
+"""
+import numpy as np
+import pandas as pd
+
+from samlog.csr import concat_ranges
+from samlog.user_index import UserIndex
+
+
+def _argmax_per_group(groups, counts):
+    """groups 별로 counts 가 가장 큰 항목의 위치 (groups 는 정렬되어 있지 않아도 된다)."""
+    ranked = np.lexsort((-counts, groups))
+    return ranked[np.r_[True, np.diff(groups[ranked]) != 0]]
+
+
+class LearningJoin:
+
+    def __init__(self, df, users, learning):
+        self.users = users
+        self.learning = learning
+        n_users = len(users)
+
+        # 수강 행 → 질문 데이터 이용자 번호 (질문 데이터에 없는 이용자는 -1)
+        if 'user_id' in learning.columns:
+            row_users = users.user_ids.get_indexer(learning['user_id'])
+        else:
+            row_users = np.full(len(learning), -1)
+        self.row_users = row_users.astype(np.int32)
+        valid = self.row_users >= 0
+        self.order = np.flatnonzero(valid)[np.argsort(self.row_users[valid],
+                                                      kind='stable')]
+        self.ptr = np.concatenate(
+            ([0], np.cumsum(np.bincount(self.row_users[valid],
+                                        minlength=n_users))))
+
+        # 이용자 → 대표 조직(group_1) 번호
+        self.user_org = np.full(n_users, -1, dtype=np.int32)
+        self.orgs = pd.Index([])
+        if 'group_1' in df.columns:
+            org_codes, self.orgs = pd.factorize(df['group_1'], sort=True)
+            has = (users.codes >= 0) & (org_codes >= 0)
+            if has.any():
+                pairs = users.codes[has].astype(np.int64) * len(
+                    self.orgs) + org_codes[has]
+                pairs, counts = np.unique(pairs, return_counts=True)
+                pair_users = pairs // len(self.orgs)
+                first = _argmax_per_group(pair_users, counts)
+                self.user_org[pair_users[first]] = pairs[first] % len(
+                    self.orgs)
+
+        # 강좌명 코드
+        if 'title' in learning.columns:
+            self.title_codes, self.titles = pd.factorize(learning['title'])
+        else:
+            self.title_codes, self.titles = np.full(len(learning),
+                                                    -1), pd.Index([])
+
+    def user_codes(self, positions):
+        """질문 데이터 행 위치들에 등장하는 이용자 번호 (중복 제거)."""
+        codes = np.unique(self.users.codes[positions])
+        return codes[codes >= 0]
+
+    def positions(self, user_codes):
+        """이용자들의 수강 이력 행 위치 (원래 행 순서)."""
+        starts = self.ptr[user_codes]
+        rows = self.order[concat_ranges(starts,
+                                        self.ptr[user_codes + 1] - starts)]
+        return np.sort(rows)
+
+    def rows(self, user_codes):
+        return self.learning.iloc[self.positions(user_codes)]
+
+    def summary(self, positions):
+        """(강좌 수, 수강 횟수, 수강 인원)."""
+        titles = self.title_codes[positions]
+        n_courses = len(np.unique(titles[titles >= 0]))
+        n_users = len(np.unique(self.row_users[positions]))
+        return n_courses, len(positions), n_users
+
+    def course_table(self, positions):
+        """강좌별 총 수강 횟수와 최다 수강 조직(횟수) 표 (수강 횟수 내림차순)."""
+        titles = self.title_codes[positions]
+        course_counts = np.bincount(titles[titles >= 0],
+                                    minlength=len(self.titles))
+        present = np.flatnonzero(course_counts)
+        present = present[np.argsort(-course_counts[present], kind='stable')]
+        table = pd.DataFrame({
+            '강좌명': self.titles.take(present),
+            '총 수강 횟수': course_counts[present]
+        })
+
+        top_org = pd.Series(np.nan, index=present, dtype=object)
+        orgs = self.user_org[self.row_users[positions]]
+        has = (titles >= 0) & (orgs >= 0)
+        if has.any():
+            pairs, counts = np.unique(titles[has].astype(np.int64) *
+                                      len(self.orgs) + orgs[has],
+                                      return_counts=True)
+            pair_titles = pairs // len(self.orgs)
+            first = _argmax_per_group(pair_titles, counts)
+            labels = (self.orgs.take(pairs[first] % len(self.orgs)).astype(str) +
+                      " (" + counts[first].astype(str) + "회)")
+            top_org[pair_titles[first]] = labels.to_numpy()
+        table['최다 수강 조직(횟수)'] = top_org.reindex(present).to_numpy()
+        return table
+
+
+def join_datasets(dataset, learning):
+    """질문 Dataset 과 수강 이력 Dataset 의 조인. 조합마다 한 번만 만들어 질문 데이터셋에 보관한다."""
+    users = dataset.derived('users', lambda: UserIndex(dataset.df))
+    return dataset.derived(
+        ('learning_join', learning.key),
+        lambda: LearningJoin(dataset.df, users, learning.df))
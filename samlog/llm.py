@@ -0,0 +1,243 @@
+"""OpenAI 채팅 호출 실행기.
+
+서로 독립적인 프롬프트를 스레드 풀에서 동시에 보내고, 동시 호출 수를 제한한다.
+속도 제한(429)·일시 오류는 지수 백오프로 재시도하며, 같은 요청이 이미 진행 중이면
+새로 보내지 않고 진행 중인 결과를 함께 기다린다. 응답 캐시(ResponseCache)를 주면
+같은 요청은 API 를 호출하지 않고 저장된 응답을 돌려준다.
+
+stream() 은 토큰이 도착하는 대로 StreamHandle.text 에 이어 붙이므로, 화면 쪽에서
+주기적으로 읽어 점진적으로 표시하고 필요하면 중간에 cancel() 할 수 있다.
+"""
+import hashlib
+import json
+import random
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+
+import openai
+
+from samlog import profiling
+
+MAX_WORKERS = 4
+MAX_RETRIES = 4
+REQUEST_TIMEOUT = 120
+RETRY_STATUS = {408, 409, 429, 500, 502, 503, 504}
+
+
+def request_key(model, messages, temperature):
+    """(모델, 온도, 메시지) 조합을 식별하는 해시."""
+    payload = json.dumps(
+        {
+            'model': model,
+            'temperature': temperature,
+            'messages': messages
+        },
+        ensure_ascii=False,
+        sort_keys=True)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def _is_retryable(exc):
+    if isinstance(exc, (openai.APIConnectionError, TimeoutError)):
+        return True
+    return getattr(exc, 'status_code', None) in RETRY_STATUS
+
+
+def _retry_after(exc):
+    response = getattr(exc, 'response', None)
+    try:
+        return float(response.headers.get('retry-after'))
+    except (AttributeError, TypeError, ValueError):
+        return None
+
+
+def _record_usage(record, usage):
+    # 응답의 토큰 사용량을 성능 기록에 옮긴다
+    if usage is None:
+        return
+    for field in ('prompt_tokens', 'completion_tokens', 'total_tokens'):
+        value = getattr(usage, field, None)
+        if isinstance(value, int):
+            record[field] = value
+
+
+class StreamHandle:
+    """백그라운드에서 받는 스트리밍 응답. 첫 토큰까지의 시간과 전체 시간을 기록한다."""
+
+    def __init__(self):
+        self.text = ""
+        self.error = None
+        self.cancelled = False
+        self.started = time.perf_counter()
+        self.first_token_at = None
+        self.finished_at = None
+        self._done = threading.Event()
+        self._cancel = threading.Event()
+
+    @property
+    def done(self):
+        return self._done.is_set()
+
+    @property
+    def ttft(self):
+        """첫 토큰까지 걸린 시간(초)."""
+        if self.first_token_at is None:
+            return None
+        return self.first_token_at - self.started
+
+    @property
+    def latency(self):
+        """전체 응답 시간(초)."""
+        if self.finished_at is None:
+            return None
+        return self.finished_at - self.started
+
+    def cancel(self):
+        self._cancel.set()
+
+    def wait(self, timeout=None):
+        return self._done.wait(timeout)
+
+    def _append(self, delta):
+        if self.first_token_at is None:
+            self.first_token_at = time.perf_counter()
+        self.text += delta
+
+    def _finish(self, error=None):
+        self.error = error
+        self.finished_at = time.perf_counter()
+        self._done.set()
+
+
+class LLMExecutor:
+
+    def __init__(self,
+                 client,
+                 cache=None,
+                 max_workers=MAX_WORKERS,
+                 max_retries=MAX_RETRIES,
+                 timeout=REQUEST_TIMEOUT,
+                 backoff=1.0,
+                 max_backoff=30.0):
+        self.client = client
+        self.cache = cache
+        self.max_retries = max_retries
+        self.timeout = timeout
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self._pool = ThreadPoolExecutor(max_workers,
+                                        thread_name_prefix='llm')
+        self._inflight = {}
+        self._lock = threading.Lock()
+
+    def submit(self, model, messages, temperature=0.0):
+        """요청을 보내고 Future 를 돌려준다. 결과는 응답 본문 문자열이다."""
+        key = request_key(model, messages, temperature)
+        cached = self.cache.get(key) if self.cache is not None else None
+        if cached is not None:
+            future = Future()
+            future.set_result(cached)
+            return future
+        with self._lock:
+            future = self._inflight.get(key)
+            if future is not None:
+                return future
+            future = self._pool.submit(self._call, key, model, messages,
+                                       temperature)
+            self._inflight[key] = future
+        # 이미 끝난 Future 면 콜백이 이 스레드에서 바로 불리므로 잠금 밖에서 붙인다
+        future.add_done_callback(lambda _, key=key: self._forget(key))
+        return future
+
+    def _forget(self, key):
+        with self._lock:
+            self._inflight.pop(key, None)
+
+    def _call(self, key, model, messages, temperature):
+        with profiling.span('llm', model=model, stream=False) as record:
+            for attempt in range(self.max_retries + 1):
+                record['attempts'] = attempt + 1
+                try:
+                    response = self.client.chat.completions.create(
+                        model=model,
+                        messages=messages,
+                        temperature=temperature,
+                        timeout=self.timeout)
+                    _record_usage(record, getattr(response, 'usage', None))
+                    content = response.choices[0].message.content
+                    if self.cache is not None and content is not None:
+                        self.cache.put(key, model, content)
+                    return content
+                except Exception as e:
+                    if attempt == self.max_retries or not _is_retryable(e):
+                        raise
+                    time.sleep(self._delay(e, attempt))
+
+    def _delay(self, exc, attempt):
+        delay = _retry_after(exc) or min(self.max_backoff,
+                                         self.backoff * 2**attempt)
+        return delay * random.uniform(0.8, 1.2)
+
+    def stream(self, model, messages, temperature=0.0):
+        """스트리밍 요청을 보내고 StreamHandle 을 바로 돌려준다."""
+        handle = StreamHandle()
+        key = request_key(model, messages, temperature)
+        cached = self.cache.get(key) if self.cache is not None else None
+        if cached is not None:
+            handle._append(cached)
+            handle._finish()
+        else:
+            self._pool.submit(self._stream, handle, key, model, messages,
+                              temperature)
+        return handle
+
+    def _open_stream(self, handle, model, messages, temperature):
+        """스트림을 연다. 재시도는 첫 토큰 전까지만 하며, 기다리다 취소되면 None."""
+        for attempt in range(self.max_retries + 1):
+            try:
+                return self.client.chat.completions.create(
+                    model=model,
+                    messages=messages,
+                    temperature=temperature,
+                    stream=True,
+                    stream_options={'include_usage': True},
+                    timeout=self.timeout)
+            except Exception as e:
+                if attempt == self.max_retries or not _is_retryable(e):
+                    raise
+                if handle._cancel.wait(self._delay(e, attempt)):
+                    return None
+
+    def _stream(self, handle, key, model, messages, temperature):
+        with profiling.span('llm', model=model, stream=True) as record:
+            self._receive(handle, key, model, messages, temperature, record)
+            record['ttft'] = handle.ttft
+            record['cancelled'] = handle.cancelled
+            if handle.error is not None:
+                record['error'] = f"{type(handle.error).__name__}: {handle.error}"
+
+    def _receive(self, handle, key, model, messages, temperature, record):
+        response = None
+        try:
+            response = self._open_stream(handle, model, messages, temperature)
+            for chunk in response or ():
+                # 마지막 청크에만 토큰 사용량이 온다 (choices 는 비어 있음)
+                _record_usage(record, getattr(chunk, 'usage', None))
+                if handle._cancel.is_set():
+                    break
+                delta = chunk.choices[0].delta.content if chunk.choices else None
+                if delta:
+                    handle._append(delta)
+
+            if handle._cancel.is_set():
+                # 생성 중단: 연결을 닫아 남은 토큰 생성을 멈추고 캐시에는 남기지 않는다
+                handle.cancelled = True
+                close = getattr(response, 'close', None)
+                if close is not None:
+                    close()
+            elif self.cache is not None:
+                self.cache.put(key, model, handle.text)
+            handle._finish()
+        except Exception as e:
+            handle._finish(e)
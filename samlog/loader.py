@@ -0,0 +1,556 @@
+"""업로드 파일 적재 및 공유 데이터셋 저장소.
+
+업로드된 파일의 바이트를 해시로 식별해 한 번만 파싱하고, 결과는 프로세스 단위
+레지스트리에 보관해 같은 파일을 연 모든 세션이 같은 Dataset(파생 색인 포함)을 쓴다.
+st.cache_data 는 호출할 때마다 DataFrame 을 복제해서 돌려주므로, 같은 객체를 그대로
+돌려주는 저장소를 직접 둔다. 세션은 DatasetHolder 로 보고 있는 데이터셋을 잡아 두고,
+잡은 세션이 없는 데이터셋만 한도를 넘을 때 오래된 것부터 버린다.
+
+처음 파싱한 데이터셋은 Arrow IPC 스냅샷(.sam_cache/datasets/<키>.arrow)으로 남기고
+DataFrame 을 그 파일의 메모리 매핑으로 바꿔 든다. 문자열 버퍼가 힙이 아닌 페이지
+캐시에 있으므로 여러 프로세스가 같은 페이지를 나눠 쓰고, 버렸다가 다시 열거나 서버를
+재시작해도 파싱 없이 매핑만 한다.
+
+큰 export 도 파일 전체를 한 번에 파싱하지 않고 작은 배치로 읽어, 배치마다 타입 정리와
+사전 인코딩을 마친 뒤 메모리 예산 단위 청크로 모은다. 청크는 읽는 대로 큐브·역색인 같은
+파생 집계에 더해지므로, 원본 형태의 전체 DataFrame 이 메모리에 올라오는 일이 없다.
+앱에서 적재할 때는 청크를 스냅샷 폴더에 내려 매핑하므로 질문/답변 문자열도 힙에 쌓이지 않는다.
+
+적재된 DataFrame 은 작은 표현으로 둔다: 조직·질문 유형·응답 여부·이용자 ID/이름은
+categorical(정수 코드 + 사전), 질문/답변 같은 나머지 문자열은 파이썬 객체 대신 Arrow
+문자열, 정수는 가장 작은 정수형. 컬럼별 메모리는 memory_report() 로 확인한다.
+"""
+import hashlib
+import itertools
+import os
+import shutil
+import threading
+import weakref
+from collections import OrderedDict
+from io import BytesIO
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from pandas.api.types import union_categoricals
+
+from samlog import profiling
+
+# 사전 인코딩(categorical)으로 적재·저장하는 컬럼 (값 종류가 행 수보다 훨씬 적음)
+CATEGORY_COLUMNS = [
+    'group_1', 'group_2', 'group_3', 'answer_yn', 'chat_title', 'user_id',
+    'user_name'
+]
+
+# 나머지 문자열 컬럼의 dtype (연속 버퍼에 UTF-8 로 저장, 행마다 파이썬 객체를 만들지 않음)
+STRING_DTYPE = pd.StringDtype("pyarrow")
+_ARROW_STRINGS = {pa.string(): STRING_DTYPE, pa.large_string(): STRING_DTYPE}
+
+# 업로드를 허용하는 확장자
+SUPPORTED_TYPES = ["csv", "xlsx", "parquet", "arrow", "feather"]
+ARROW_SUFFIXES = ("arrow", "feather")
+
+# 공유 저장소 한도 (보관 데이터셋 수 / 전체 메모리). 세션이 잡고 있는 데이터셋은 넘어도 남긴다
+MAX_CACHED_DATASETS = 8
+MAX_CACHE_BYTES = 2 * 1024**3
+
+# 파싱한 데이터셋의 Arrow 스냅샷 (최근 것부터 MAX_SNAPSHOTS 개만 남김)
+SNAPSHOT_DIR = os.path.join(".sam_cache", "datasets")
+MAX_SNAPSHOTS = 16
+
+# 청크 적재: 파일에서 한 번에 읽는 행 수 / 파생 집계에 한 번에 더하는 청크의 메모리 예산
+BATCH_ROWS = 20_000
+MEMORY_BUDGET = 64 * 1024**2
+
+
+def fingerprint(data, name=""):
+    """파일 내용(+확장자)으로 데이터셋 키를 만든다."""
+    digest = hashlib.sha1()
+    digest.update(name.rsplit(".", 1)[-1].lower().encode())
+    digest.update(data)
+    return digest.hexdigest()
+
+
+def arrow_to_frame(table):
+    """Arrow 테이블(배치)을 DataFrame 으로. 문자열은 Arrow 문자열 그대로, 사전은 categorical."""
+    return table.to_pandas(types_mapper=_ARROW_STRINGS.get)
+
+
+def read_frame(source, name):
+    """확장자에 맞춰 원본 파일을 DataFrame 으로 읽는다. source 는 경로 또는 바이트."""
+    suffix = name.rsplit(".", 1)[-1].lower()
+    if suffix in ARROW_SUFFIXES:
+        return arrow_to_frame(read_arrow(source))
+    if isinstance(source, (bytes, bytearray)):
+        source = BytesIO(source)
+    if suffix == "csv":
+        return pd.read_csv(source)
+    if suffix == "parquet":
+        return pd.read_parquet(source)
+    return pd.read_excel(source)
+
+
+def iter_batches(source, name, batch_rows=BATCH_ROWS):
+    """원본 파일을 batch_rows 행씩 DataFrame 으로 읽는다. source 는 경로 또는 바이트(버퍼)."""
+    suffix = name.rsplit(".", 1)[-1].lower()
+    if suffix in ARROW_SUFFIXES:
+        for batch in read_arrow(source).to_batches(batch_rows):
+            yield arrow_to_frame(batch)
+        return
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        # BytesIO 와 달리 업로드 버퍼를 복사하지 않고 읽는다
+        source = pa.BufferReader(pa.py_buffer(source))
+    if suffix == "csv":
+        yield from pd.read_csv(source, chunksize=batch_rows)
+    elif suffix == "parquet":
+        for batch in pq.ParquetFile(source).iter_batches(batch_size=batch_rows):
+            yield arrow_to_frame(batch)
+    else:
+        yield from _iter_excel(source, batch_rows)
+
+
+def _iter_excel(source, batch_rows):
+    # pd.read_excel 은 시트 전체를 한 번에 읽으므로 openpyxl 읽기 전용 모드로 행을 흘려 읽는다
+    import openpyxl
+
+    workbook = openpyxl.load_workbook(source, read_only=True, data_only=True)
+    try:
+        rows = workbook.worksheets[0].iter_rows(values_only=True)
+        header = next(rows, None)
+        if header is None:
+            return
+        batch = []
+        for row in rows:
+            if any(value is not None for value in row):
+                batch.append(row)
+            if len(batch) == batch_rows:
+                yield pd.DataFrame(batch, columns=header)
+                batch = []
+        if batch:
+            yield pd.DataFrame(batch, columns=header)
+    finally:
+        workbook.close()
+
+
+def read_arrow(source):
+    """Arrow IPC 스냅샷을 읽는다. 경로면 메모리 매핑하고, 바이트면 복사 없이 감싼다."""
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        buffer = pa.py_buffer(source)
+    else:
+        buffer = pa.memory_map(str(source))
+    return pa.ipc.open_file(buffer).read_all()
+
+
+def write_arrow(table, path):
+    """Arrow 테이블을 비압축 IPC 파일로 저장한다 (메모리 매핑용)."""
+    with pa.OSFile(str(path), "wb") as sink:
+        with pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+
+
+def normalize_user_ids(series):
+    """user_id 를 문자열로 통일한다 (1001, 1001.0, ' 1001' → '1001')."""
+    if pd.api.types.is_float_dtype(series) and (series.dropna() % 1 == 0).all():
+        series = series.astype("Int64")
+    return series.astype(str).str.strip().where(series.notna())
+
+
+def normalize_frame(df):
+    """한 번만 수행하면 되는 타입 정리 (날짜 파싱, id/응답 여부 정규화)."""
+    if 'regymdt' in df.columns:
+        with profiling.step('parse_dates'):
+            df['regymdt'] = pd.to_datetime(df['regymdt'], errors='coerce')
+    if 'user_id' in df.columns:
+        df['user_id'] = normalize_user_ids(df['user_id'])
+    if 'answer_yn' in df.columns and pd.api.types.is_string_dtype(
+            df['answer_yn']):
+        df['answer_yn'] = df['answer_yn'].str.strip().str.upper()
+    return df
+
+
+def compact_frame(df, categorical=CATEGORY_COLUMNS):
+    """타입 정리 후 반복 값이 많은 컬럼은 categorical, 정수는 작은 정수형, 나머지 문자열은 Arrow 문자열로."""
+    df = normalize_frame(df)
+    for col in categorical:
+        if col in df.columns:
+            df[col] = df[col].astype('category')
+    for col in df.select_dtypes(include='integer').columns:
+        df[col] = pd.to_numeric(df[col], downcast='integer')
+    for col in df.select_dtypes(include='object').columns:
+        if pd.api.types.infer_dtype(df[col], skipna=True) in ('string',
+                                                             'empty'):
+            df[col] = df[col].astype(STRING_DTYPE)
+    return df
+
+
+def memory_report(df):
+    """컬럼별 dtype, 메모리(바이트), 행당 바이트, 전체 대비 비율(%) (큰 순)."""
+    usage = df.memory_usage(deep=True, index=False)
+    total = max(int(usage.sum()), 1)
+    report = pd.DataFrame({
+        'dtype': df.dtypes.astype(str),
+        '바이트': usage,
+        '행당 바이트': (usage / max(len(df), 1)).round(1),
+        '비율(%)': (usage / total * 100).round(1)
+    })
+    report.index.name = '컬럼'
+    return report.sort_values('바이트', ascending=False)
+
+
+def concat_frames(frames):
+    """DataFrame 들을 행 방향으로 잇는다. 첫 프레임의 categorical 컬럼은 범주를 합쳐 유지한다."""
+    if len(frames) == 1:
+        return frames[0].reset_index(drop=True)
+    df = pd.concat(frames, ignore_index=True)
+    for col in frames[0].columns:
+        if not all(col in frame.columns for frame in frames):
+            continue
+        if isinstance(frames[0][col].dtype, pd.CategoricalDtype):
+            df[col] = union_categoricals(
+                [frame[col].astype('category') for frame in frames],
+                ignore_order=True)
+        elif frames[0][col].dtype == STRING_DTYPE and df[col].dtype == object:
+            # 값이 모두 빈 배치가 섞이면 object 로 합쳐지므로 Arrow 문자열로 되돌린다
+            df[col] = df[col].astype(STRING_DTYPE)
+    return df
+
+
+def iter_chunks(source,
+                name,
+                memory_budget=MEMORY_BUDGET,
+                batch_rows=BATCH_ROWS):
+    """정리된 배치를 memory_budget 크기 청크로 모아 돌려준다."""
+    parts, size = [], 0
+    batches = iter_batches(source, name, batch_rows)
+    while True:
+        with profiling.step('read'):
+            batch = next(batches, None)
+        if batch is None:
+            break
+        with profiling.step('normalize'):
+            batch = compact_frame(batch)
+        parts.append(batch)
+        size += int(batch.memory_usage(deep=True).sum())
+        if size >= memory_budget:
+            yield concat_frames(parts)
+            parts, size = [], 0
+    if parts:
+        yield concat_frames(parts)
+
+
+class Dataset:
+    """파싱이 끝난 데이터셋과 그로부터 파생된 인덱스/집계를 함께 보관한다.
+
+    df 는 여러 세션이 공유하므로 제자리 수정하지 않는다. subset() 으로 만든 데이터셋은
+    parent 와 positions(부모 행 위치) 를 가지므로, 만들기 비싼 색인은 부모 것을 빌려 쓸 수 있다.
+    """
+
+    def __init__(self, key, name, df, derived=None):
+        self.key = key
+        self.name = name
+        self.df = df
+        self.nbytes = int(df.memory_usage(deep=True).sum())
+        self.parent = None
+        self.positions = None
+        self._derived = dict(derived or {})
+        self._lock = threading.RLock()
+
+    def derived(self, name, build):
+        """name 으로 식별되는 파생 데이터를 처음 요청될 때 한 번만 만든다."""
+        with self._lock:
+            if name not in self._derived:
+                self._derived[name] = build()
+            return self._derived[name]
+
+    def discard(self, name):
+        """파생 데이터를 버린다. 다음에 요청되면 다시 만든다."""
+        with self._lock:
+            self._derived.pop(name, None)
+
+    def subset(self, key, positions):
+        """positions 행(오름차순 행 위치)만 담은 새 Dataset."""
+        dataset = Dataset(key, self.name,
+                          self.df.iloc[positions].reset_index(drop=True))
+        dataset.parent = self
+        dataset.positions = positions
+        return dataset
+
+    def extended(self, key, delta):
+        """delta 행을 뒤에 붙인 새 Dataset.
+
+        extend(delta) 를 지원하는 파생 데이터(큐브, 역색인 등)는 delta 만 반영해 넘겨 주고,
+        나머지는 새 Dataset 에서 처음 요청될 때 다시 만든다.
+        """
+        dataset = Dataset(key, self.name, concat_frames([self.df, delta]))
+        with self._lock:
+            for name, value in self._derived.items():
+                if hasattr(value, 'extend'):
+                    dataset._derived[name] = value.extend(delta)
+        return dataset
+
+
+class DatasetRegistry:
+    """데이터셋 키(파일 내용 해시) → Dataset. 프로세스의 모든 세션이 공유한다.
+
+    세션은 acquire(holder, slot, dataset) 로 데이터셋을 잡고, 개수·메모리 한도를 넘으면
+    잡은 세션이 없는 것부터 오래된 순으로 버린다. snapshot_dir 가 있으면 처음 파싱한
+    데이터셋을 Arrow 스냅샷으로 남기고 메모리 매핑한 DataFrame 으로 바꿔 든다.
+    """
+
+    def __init__(self,
+                 max_entries=MAX_CACHED_DATASETS,
+                 max_bytes=MAX_CACHE_BYTES,
+                 snapshot_dir=SNAPSHOT_DIR):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.snapshot_dir = snapshot_dir
+        self._entries = OrderedDict()
+        self._refs = {}
+        self._held = {}
+        self._loading = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            dataset = self._entries.get(key)
+            if dataset is not None:
+                self._entries.move_to_end(key)
+            return dataset
+
+    def put(self, dataset):
+        with self._lock:
+            self._entries[dataset.key] = dataset
+            self._entries.move_to_end(dataset.key)
+            self._evict()
+
+    def open(self, key, name, parse):
+        """key 데이터셋을 돌려준다. 없으면 스냅샷을 매핑하거나 parse() 로 만든다.
+
+        같은 키를 여러 세션이 동시에 열어도 파싱은 한 번만 한다.
+        """
+        dataset = self.get(key)
+        if dataset is not None:
+            return dataset
+        with self._lock:
+            loading = self._loading.setdefault(key, threading.Lock())
+        try:
+            with loading:
+                dataset = self.get(key)
+                if dataset is None:
+                    dataset = self._open_snapshot(key, name)
+                if dataset is None:
+                    dataset = self._persist(parse())
+                self.put(dataset)
+        finally:
+            with self._lock:
+                self._loading.pop(key, None)
+        return dataset
+
+    def snapshot_path(self, key):
+        return os.path.join(self.snapshot_dir, key + ".arrow")
+
+    def _open_snapshot(self, key, name):
+        if not self.snapshot_dir or not os.path.exists(self.snapshot_path(key)):
+            return None
+        with profiling.span('load', name=name, snapshot=True) as record:
+            df = arrow_to_frame(read_arrow(self.snapshot_path(key)))
+            record['rows'] = len(df)
+            dataset = Dataset(key, name, df)
+            record['bytes'] = dataset.nbytes
+            return dataset
+
+    def _persist(self, dataset):
+        # 스냅샷을 쓰지 못하면(읽기 전용 디스크 등) 파싱한 DataFrame 을 그대로 쓴다
+        if not self.snapshot_dir:
+            return dataset
+        path = self.snapshot_path(dataset.key)
+        try:
+            with profiling.span('snapshot', name=dataset.name) as record:
+                os.makedirs(self.snapshot_dir, exist_ok=True)
+                write_arrow(
+                    pa.Table.from_pandas(dataset.df, preserve_index=False),
+                    path + ".tmp")
+                os.replace(path + ".tmp", path)
+                dataset.df = arrow_to_frame(read_arrow(path))
+                # 매핑한 프레임은 파싱한 것과 크기가 달라 정리(_evict) 기준을 다시 잰다
+                dataset.nbytes = int(dataset.df.memory_usage(deep=True).sum())
+                record['rows'] = len(dataset.df)
+                record['bytes'] = dataset.nbytes
+                record['file_bytes'] = os.path.getsize(path)
+        except (OSError, pa.ArrowException):
+            return dataset
+        self._prune_snapshots()
+        return dataset
+
+    def _prune_snapshots(self):
+        paths = [
+            os.path.join(self.snapshot_dir, name)
+            for name in os.listdir(self.snapshot_dir) if name.endswith(".arrow")
+        ]
+        paths.sort(key=os.path.getmtime, reverse=True)
+        for path in paths[MAX_SNAPSHOTS:]:
+            # 매핑 중인 파일을 지워도 연 쪽은 계속 읽을 수 있다
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def acquire(self, holder, slot, dataset):
+        """holder 세션의 slot 자리에 dataset 을 잡는다 (None 이면 놓기만 한다)."""
+        with self._lock:
+            previous = self._held.pop((holder, slot), None)
+            if previous is not None:
+                self._unref(previous)
+            if dataset is not None:
+                # 부분 데이터셋(기간·중복 제외)은 원본을 잡는다
+                while dataset.parent is not None:
+                    dataset = dataset.parent
+                self._entries.setdefault(dataset.key, dataset)
+                self._refs[dataset.key] = self._refs.get(dataset.key, 0) + 1
+                self._held[(holder, slot)] = dataset.key
+            self._evict()
+
+    def release(self, holder):
+        """holder 세션이 잡은 데이터셋을 모두 놓는다."""
+        with self._lock:
+            for held in [held for held in self._held if held[0] == holder]:
+                self._unref(self._held.pop(held))
+            self._evict()
+
+    def _unref(self, key):
+        self._refs[key] -= 1
+        if not self._refs[key]:
+            del self._refs[key]
+
+    def refcount(self, key):
+        with self._lock:
+            return self._refs.get(key, 0)
+
+    def total_bytes(self):
+        return sum(d.nbytes for d in self._entries.values())
+
+    def stats(self):
+        """보관 데이터셋 수, 메모리(바이트), 세션이 잡고 있는 데이터셋 수, 세션 수."""
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'bytes': self.total_bytes(),
+                'held': len(self._refs),
+                'sessions': len({holder for holder, _ in self._held})
+            }
+
+    def _evict(self):
+        # 세션이 잡은 데이터셋과 방금 넣은 데이터셋(맨 뒤)은 한도를 넘더라도 남겨 둔다
+        for key in list(self._entries)[:-1]:
+            if (len(self._entries) <= self.max_entries
+                    and self.total_bytes() <= self.max_bytes):
+                break
+            if key not in self._refs:
+                del self._entries[key]
+
+
+class DatasetHolder:
+    """세션 하나가 보고 있는 데이터셋들. 세션 상태와 함께 사라지면 잡은 것을 모두 놓는다."""
+
+    _ids = itertools.count()
+
+    def __init__(self, registry=None):
+        self.registry = registry or _registry
+        self.id = next(DatasetHolder._ids)
+        weakref.finalize(self, self.registry.release, self.id)
+
+    def hold(self, slot, dataset):
+        self.registry.acquire(self.id, slot, dataset)
+
+
+_registry = DatasetRegistry()
+
+
+def _chunk_table(chunk):
+    """청크를 Arrow 테이블로. 값이 모두 빈 컬럼은 null 타입으로 두어 다른 청크의 타입을 따르게 한다."""
+    table = pa.Table.from_pandas(chunk, preserve_index=False)
+    for i, field in enumerate(table.schema):
+        if len(table) and table.column(i).null_count == len(table):
+            table = table.set_column(i, field.name, pa.nulls(len(table)))
+    return table
+
+
+def _spill(table, path):
+    """청크 테이블을 Arrow 파일로 내리고 메모리 매핑한 테이블로 바꾼다 (쓰지 못하면 그대로 둔다)."""
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        write_arrow(table, path)
+        return read_arrow(path)
+    except (OSError, pa.ArrowException):
+        return table
+
+
+def read_dataset(source,
+                 name,
+                 key,
+                 fold=None,
+                 memory_budget=MEMORY_BUDGET,
+                 batch_rows=BATCH_ROWS,
+                 spill_dir=None):
+    """원본 파일을 청크 단위로 읽어 Dataset 을 만든다.
+
+    fold 는 {파생 데이터 이름: 생성 함수} 로, 첫 청크로 만든 뒤 다음 청크부터는
+    extend(chunk) 로 더해 Dataset 의 파생 데이터로 넣어 둔다. 적재 시간은 'load' span 에
+    읽기/정리(날짜 파싱 포함)/파생 집계/병합 단계별로 기록된다.
+
+    청크는 Arrow 테이블로 바꿔 모으고 마지막에 한 번만 DataFrame 으로 바꾼다. spill_dir 가
+    있으면 청크 테이블을 그 아래 <key>.parts/ 에 써서 메모리 매핑으로 바꿔 들므로, 힙에는
+    처리 중인 청크(memory_budget) 하나와 행당 몇 바이트인 숫자·날짜·사전 코드 컬럼만 남고
+    질문/답변 문자열은 파일 크기와 상관없이 페이지 캐시에 머문다. spill_dir 가 없으면
+    문자열까지 힙에 모은다 (최대 메모리는 전체 프레임 + 청크 하나).
+    """
+    parts_dir = os.path.join(spill_dir, key + ".parts") if spill_dir else None
+    with profiling.span('load', name=name) as record:
+        tables, derived = [], {}
+        for chunk in iter_chunks(source, name, memory_budget, batch_rows):
+            with profiling.step('fold'):
+                for derived_name, build in (fold or {}).items():
+                    if derived_name in derived:
+                        derived[derived_name] = derived[derived_name].extend(
+                            chunk)
+                    else:
+                        derived[derived_name] = build(chunk)
+            table = _chunk_table(chunk)
+            del chunk
+            if parts_dir:
+                with profiling.step('spill'):
+                    table = _spill(
+                        table, os.path.join(parts_dir, f"{len(tables)}.arrow"))
+            tables.append(table)
+        with profiling.step('concat'):
+            # 청크마다 작은 정수형이 다를 수 있으므로 넓은 쪽으로 맞춘다
+            df = arrow_to_frame(
+                pa.concat_tables(tables, promote_options="permissive")
+            ) if tables else pd.DataFrame()
+            del tables
+        if parts_dir:
+            # 매핑 중인 파일은 지워도 계속 읽을 수 있다 (스냅샷을 쓰면 그쪽으로 바뀐다)
+            shutil.rmtree(parts_dir, ignore_errors=True)
+        record['rows'] = len(df)
+        dataset = Dataset(key, name, df, derived)
+        record['bytes'] = dataset.nbytes
+        return dataset
+
+
+def load_dataset(uploaded_file, registry=None, fold=None):
+    """업로드 파일을 Dataset 으로 읽는다. 같은 내용이면 다른 세션이 연 객체를 그대로 돌려준다.
+
+    업로드 버퍼는 복사하지 않고(getbuffer) 해시·파싱하며, 청크는 저장소의 스냅샷 폴더로
+    내려 둔다. 스냅샷에서 연 데이터셋은 fold 파생 데이터를 처음 요청될 때 만든다.
+    """
+    if registry is None:
+        registry = _registry
+    data = uploaded_file.getbuffer()
+    key = fingerprint(data, uploaded_file.name)
+    return registry.open(
+        key, uploaded_file.name,
+        lambda: read_dataset(data,
+                             uploaded_file.name,
+                             key,
+                             fold,
+                             spill_dir=registry.snapshot_dir))
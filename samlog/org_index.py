@@ -0,0 +1,112 @@
+"""조직(group_1 → group_2 → group_3) 계층 인덱스.
+
+데이터셋마다 한 번 만들어 두고, 조직 선택 상자의 옵션 목록과 선택된 조직의 행 위치를
+사전 조회로 꺼내 쓴다. 조직 선택은 (group_1, group_2, group_3) 튜플로 표현하며,
+'전체'로 둔 단계는 None 으로 비워 둔다.
+"""
+from itertools import combinations
+
+import numpy as np
+
+LEVELS = ('group_1', 'group_2', 'group_3')
+
+
+class OrgNode:
+    """조직 하나(또는 조직 조합)의 행 위치와 질문 수/이용자 수."""
+
+    __slots__ = ('positions', 'n_questions', 'n_users')
+
+    def __init__(self, positions, n_users):
+        self.positions = positions
+        self.n_questions = len(positions)
+        self.n_users = n_users
+
+
+def _as_tuples(index):
+    if index.nlevels == 1:
+        return [(key, ) for key in index]
+    return list(index)
+
+
+class OrgIndex:
+
+    def __init__(self, df):
+        self.n_rows = len(df)
+        self._nodes = {}
+        has_users = 'user_id' in df.columns
+
+        self._nodes[(None, None, None)] = OrgNode(
+            np.arange(len(df), dtype=np.int32),
+            df['user_id'].nunique() if has_users else 0)
+
+        # 상위 단계를 '전체'로 두고 하위 단계만 고르는 경우도 있으므로
+        # 세 컬럼의 모든 조합에 대해 노드를 만든다.
+        for depth in range(1, len(LEVELS) + 1):
+            for levels in combinations(range(len(LEVELS)), depth):
+                grouped = df.groupby([LEVELS[i] for i in levels],
+                                     observed=True,
+                                     sort=False)
+                users = {}
+                if has_users:
+                    counts = grouped['user_id'].nunique()
+                    users = dict(
+                        zip(_as_tuples(counts.index), counts.to_numpy()))
+                for key, positions in grouped.indices.items():
+                    key = key if isinstance(key, tuple) else (key, )
+                    node = OrgNode(positions.astype(np.int32),
+                                   int(users.get(key, 0)))
+                    self._nodes[self._selection(levels, key)] = node
+
+        # 각 단계의 선택 상자 옵션: 앞 단계 선택(자기보다 하위 단계 제외)별 정렬 목록
+        options = {}
+        for selection in self._nodes:
+            filled = [i for i, value in enumerate(selection) if value is not None]
+            if not filled:
+                continue
+            level = filled[-1]
+            parent = selection[:level] + (None, ) * (len(LEVELS) - level)
+            options.setdefault((parent, level), []).append(selection[level])
+        self._options = {key: sorted(values) for key, values in options.items()}
+
+    @staticmethod
+    def _selection(levels, key):
+        selection = [None] * len(LEVELS)
+        for level, value in zip(levels, key):
+            selection[level] = value
+        return tuple(selection)
+
+    def node(self, group_1=None, group_2=None, group_3=None):
+        """선택된 조직의 노드. 해당 조직이 없으면 빈 노드를 돌려준다."""
+        node = self._nodes.get((group_1, group_2, group_3))
+        if node is None:
+            node = OrgNode(np.empty(0, dtype=np.int32), 0)
+        return node
+
+    def options(self, level, group_1=None, group_2=None):
+        """level(0~2) 단계 선택 상자의 옵션. 앞 단계에서 선택된 조직 안으로 한정한다."""
+        parent = (group_1, group_2, None)[:level] + (None, ) * (len(LEVELS) -
+                                                                level)
+        return self._options.get((parent, level), [])
+
+    def paths(self):
+        """세 단계가 모두 있는 조직 경로 (group_1, group_2, group_3) 목록 (정렬)."""
+        return sorted(selection for selection in self._nodes
+                      if None not in selection)
+
+    def tree(self):
+        """위 단계부터 채운 조직 선택 목록. (센터), (센터, 실), (센터, 실, 팀) 이 부모 → 자식 순으로 온다."""
+        selections = [
+            selection for selection in self._nodes
+            if selection[0] is not None and list(selection) == sorted(
+                selection, key=lambda value: value is None)
+        ]
+        return sorted(selections,
+                      key=lambda selection: tuple(
+                          '' if value is None else str(value)
+                          for value in selection))
+
+    def view(self, df, group_1=None, group_2=None, group_3=None):
+        """선택된 조직의 행만 담은 DataFrame. 아무것도 선택하지 않았으면 df 그대로."""
+        if group_1 is None and group_2 is None and group_3 is None:
+            return df
+        return df.iloc[self.node(group_1, group_2, group_3).positions]
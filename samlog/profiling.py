@@ -0,0 +1,172 @@
+"""처리 단계별 성능 기록.
+
+파일 적재, 날짜 파싱, 탭별 집계, 워드클라우드, GPT 호출 같은 단계를 span 으로 감싸
+걸린 시간, 처리한 행 수, 메모리(RSS) 변화, GPT 토큰 수를 기록한다. 기록은 프로세스
+전체에서 최근 것만 보관해 사이드바 성능 패널에 보여 주고, 'samlog.perf' 로거로 한
+줄짜리 JSON 을 남기므로 로그 수집기에 그대로 보낼 수 있다.
+
+    with profiling.span('load', name=file_name) as record:
+        ...
+        record['rows'] = len(df)
+
+span 안에서 부른 함수는 profiling.step('parse_dates') 로 세부 단계 시간을 바깥 span 에
+더할 수 있다 (parse_dates_s 필드). 바깥 span 이 없으면 아무 것도 하지 않는다.
+"""
+import datetime
+import functools
+import json
+import logging
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+import pandas as pd
+
+logger = logging.getLogger("samlog.perf")
+
+MAX_RECORDS = 1000
+
+_local = threading.local()
+
+
+def _rss():
+    """현재 프로세스 RSS(바이트). 알 수 없는 환경이면 None."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+def _stack():
+    if not hasattr(_local, 'stack'):
+        _local.stack = []
+    return _local.stack
+
+
+class Profiler:
+    """최근 span 기록 보관소."""
+
+    def __init__(self, max_records=MAX_RECORDS):
+        self._records = deque(maxlen=max_records)
+        self._lock = threading.Lock()
+
+    def record(self, record):
+        with self._lock:
+            self._records.append(record)
+        if logger.isEnabledFor(logging.INFO):
+            logger.info(json.dumps(record, ensure_ascii=False, default=str))
+
+    def records(self):
+        with self._lock:
+            return list(self._records)
+
+    def clear(self):
+        with self._lock:
+            self._records.clear()
+
+    def frame(self):
+        """기록 전체 (최근 것이 아래)."""
+        return pd.DataFrame(self.records())
+
+    def summary(self):
+        """단계별 호출 수, 총/평균/최대 시간(초), 처리 행 수, 메모리 변화(MB), 토큰 수."""
+        df = self.frame()
+        if df.empty:
+            return df
+        aggregations = {
+            '호출 수': ('seconds', 'size'),
+            '총 시간(초)': ('seconds', 'sum'),
+            '평균(초)': ('seconds', 'mean'),
+            '최대(초)': ('seconds', 'max'),
+        }
+        optional = {
+            '처리 행 수': ('rows', 'sum'),
+            '메모리 변화(MB)': ('memory_delta_mb', 'sum'),
+            '입력 토큰': ('prompt_tokens', 'sum'),
+            '출력 토큰': ('completion_tokens', 'sum'),
+        }
+        aggregations.update({
+            label: spec
+            for label, spec in optional.items() if spec[0] in df.columns
+        })
+        return df.groupby('stage').agg(**aggregations).sort_values(
+            '총 시간(초)', ascending=False).round(4)
+
+    def to_jsonl(self):
+        """기록 전체를 JSON Lines 문자열로 (모니터링 시스템 적재용)."""
+        return "".join(
+            json.dumps(record, ensure_ascii=False, default=str) + "\n"
+            for record in self.records())
+
+
+profiler = Profiler()
+
+
+def log_to_file(path):
+    """'samlog.perf' 로그를 path 에 JSON Lines 로 남기는 핸들러를 붙인다."""
+    handler = logging.FileHandler(path, encoding="utf-8")
+    handler.setFormatter(logging.Formatter("%(message)s"))
+    logger.addHandler(handler)
+    logger.setLevel(logging.INFO)
+    return handler
+
+
+@contextmanager
+def span(stage, **fields):
+    """stage 단계의 시간·메모리 변화를 기록한다. 돌려준 dict 에 필드를 더할 수 있다."""
+    record = {
+        'time': datetime.datetime.now().isoformat(timespec='milliseconds'),
+        'stage': stage,
+        'thread': threading.current_thread().name,
+        **fields
+    }
+    stack = _stack()
+    stack.append(record)
+    rss = _rss()
+    started = time.perf_counter()
+    try:
+        yield record
+    except BaseException as e:
+        record['error'] = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        record['seconds'] = round(time.perf_counter() - started, 6)
+        if rss is not None:
+            record['memory_delta_mb'] = round((_rss() - rss) / 1024**2, 2)
+        stack.pop()
+        profiler.record(record)
+
+
+@contextmanager
+def step(name):
+    """진행 중인 span 에 세부 단계 name 의 시간(name_s 필드)을 더한다."""
+    stack = _stack()
+    if not stack:
+        yield
+        return
+    record = stack[-1]
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        field = name + '_s'
+        record[field] = round(
+            record.get(field, 0.0) + time.perf_counter() - started, 6)
+
+
+def timed(stage):
+    """함수 호출 전체를 stage span 으로 기록하는 데코레이터."""
+
+    def decorator(function):
+
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            with span(stage):
+                return function(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,148 @@
+"""GPT 분석 프롬프트 구성.
+
+각 함수는 LLMExecutor.submit(**request) 에 그대로 넘길 수 있는 요청 dict
+(model, messages, temperature)를 만든다.
+"""
+import pandas as pd
+
+from samlog.korean import TermMatrix
+from samlog.sampler import stratified_sample
+
+ANSWER_MODEL = "gpt-3.5-turbo"
+REPORT_MODEL = "gpt-4-turbo-preview"
+
+# 프롬프트에 넣는 표본의 토큰 예산
+ANSWER_TOKEN_BUDGET = 2500
+USER_QUESTION_BUDGET = 800
+USER_LEARNING_BUDGET = 400
+
+# 조직 리포트에 넣는 주요 키워드 수
+KEYWORD_COUNT = 30
+
+USER_SYSTEM_PROMPT = "당신은 임직원의 활동 데이터를 기반으로 개인의 학습 성향과 역량 수준을 분석하는 전문 HRD 컨설턴트입니다. 반드시 제시된 형식에 맞춰 각 항목을 명확하게 구분하여 답변해야 합니다."
+
+
+def answer_analysis_request(rows,
+                            is_answered=True,
+                            token_budget=ANSWER_TOKEN_BUDGET):
+    """응답/미응답 질문 유형 분석 요청. rows 는 해당 질문 행들."""
+    # chat_title·조직·월별로 고르게, 토큰 예산 안에서 대표 질문을 뽑아 비용과 시간 관리
+    samples = stratified_sample(rows, token_budget=token_budget)
+    messages = [{
+        "role":
+        "system",
+        "content":
+        ("아래는 교육 시스템에서 " +
+         ("응답된 질문 목록입니다." if is_answered else "미응답 질문 목록입니다.") +
+         " 이 질문들을 유형별로 분류하고, " +
+         ("응답된 질문의 핵심 특징을" if is_answered else "미응답된 핵심 사유를") +
+         " 요약 분석해주세요. 반드시 명확한 카테고리로 나누어 설명해야 합니다.")
+    }, {
+        "role": "user",
+        "content": "\n".join(samples)
+    }]
+    return {'model': ANSWER_MODEL, 'messages': messages, 'temperature': 0.3}
+
+
+def _answer_class(is_answered):
+    return "응답된 질문" if is_answered else "미응답 질문"
+
+
+def chunk_summary_request(questions, is_answered, chunk_no, n_chunks,
+                          n_rows):
+    """전체 질문을 나눈 묶음 하나의 유형 요약 요청 (map 단계)."""
+    messages = [{
+        "role":
+        "system",
+        "content":
+        (f"아래는 교육 시스템의 {_answer_class(is_answered)} 전체를 {n_chunks}개 묶음으로 나눈 것 중 "
+         f"{chunk_no}번째 묶음입니다 (원본 {n_rows}건, '(×n)'은 같은 질문이 n번 반복됨을 뜻합니다). "
+         "질문들을 유형별로 분류하고, 유형마다 대략적인 건수와 대표 예시 1~2개, " +
+         ("응답된 질문의 핵심 특징을" if is_answered else "미응답된 핵심 사유를") +
+         " 간결하게 요약해주세요. 이후 다른 묶음의 요약과 합쳐지므로 유형명은 일반적인 표현을 쓰세요.")
+    }, {
+        "role": "user",
+        "content": "\n".join(questions)
+    }]
+    return {'model': ANSWER_MODEL, 'messages': messages, 'temperature': 0.3}
+
+
+def merge_summary_request(summaries, is_answered, final=False):
+    """묶음 요약들을 합치는 요청 (reduce 단계). final 이면 최종 보고서를 만든다."""
+    if final:
+        instruction = ("위 부분 요약들을 종합하여 전체 질문을 유형별로 분류하고, " +
+                       ("응답된 질문의 핵심 특징을" if is_answered else "미응답된 핵심 사유를") +
+                       " 요약 분석해주세요. 반드시 명확한 카테고리로 나누어 설명해야 하며, "
+                       "유형별 대략적인 건수도 함께 제시해주세요.")
+    else:
+        instruction = ("위 부분 요약들을 하나의 요약으로 합쳐주세요. 비슷한 유형은 하나로 묶고 건수는 더하며, "
+                       "유형마다 대표 예시 1~2개를 남겨주세요.")
+    messages = [{
+        "role":
+        "system",
+        "content":
+        f"아래는 교육 시스템의 {_answer_class(is_answered)} 전체를 나누어 분석한 부분 요약들입니다. "
+        + instruction
+    }, {
+        "role":
+        "user",
+        "content":
+        "\n\n".join(f"[부분 요약 {i}]\n{summary}"
+                     for i, summary in enumerate(summaries, start=1))
+    }]
+    return {'model': ANSWER_MODEL, 'messages': messages, 'temperature': 0.3}
+
+
+def user_report_request(user_qa, user_learning):
+    """이용자 학습 성향 분석 요청과 화면에 표시할 데이터 범위 안내 문구."""
+    questions_list = stratified_sample(user_qa,
+                                       strata=('chat_title', 'month'),
+                                       token_budget=USER_QUESTION_BUDGET)
+    base_data_info = "이 분석은 사용자의 [질문/응답 기록]을 기반으로 합니다."
+    learning_titles_text = ""
+    if not user_learning.empty and 'title' in user_learning.columns:
+        learning_titles = stratified_sample(user_learning,
+                                            text_col='title',
+                                            strata=(),
+                                            token_budget=USER_LEARNING_BUDGET)
+        if learning_titles:
+            learning_titles_text, base_data_info = f'\n### 2. 주요 학습 이력 (대표 과정):\n- {"- ".join(learning_titles)}', "이 분석은 사용자의 [질문/응답 기록]과 [학습 이력]을 종합하여 제공됩니다."
+    prompt = f"""다음은 한 직원의 시스템 내 활동 기록입니다.\n\n### 1. 주요 질문 내역 (대표 질문):\n- {"- ".join(questions_list) if questions_list else "질문 기록 없음"}\n{learning_titles_text}\n\n### [분석 요청]\n위의 기록을 바탕으로, 이 직원의 **학습 성향과 주요 관심사**를 분석해주세요.\n분석 결과는 반드시 아래 4가지 항목으로 명확하게 나누고, 각 항목의 제목을 반드시 붙여서 설명해주세요.\n\n1.  **주요 관심 분야**: 어떤 주제에 대해 궁금해하고 학습하는 경향이 있는가? (구체적인 키워드나 영역 제시)\n2.  **학습 태도**: 질문과 학습 기록을 볼 때, 자기주도적으로 문제를 해결하려 하는가, 아니면 주어진 지식을 수동적으로 습득하는가? 적극성, 탐구심 등을 평가.\n3.  **지식 격차(Knowledge Gap) 추정**: (학습 이력이 있다면) 질문 내용과 학습 내용을 비교하여 추가 학습이 필요한 부분을 추정. (학습 이력이 없다면) 질문 내용만으로 파악되는 지식 탐구 영역이나 부족한 점을 기술.\n4.  **종합 요약 및 추천**: 위 1~3번 내용을 바탕으로 이 직원의 학습 성향을 1~2 문장으로 요약하고, 경력 개발에 도움이 될 만한 학습 활동이나 과정을 추천."""
+    messages = [{
+        "role": "system",
+        "content": USER_SYSTEM_PROMPT
+    }, {
+        "role": "user",
+        "content": prompt
+    }]
+    request = {'model': REPORT_MODEL, 'messages': messages, 'temperature': 0.5}
+    return request, base_data_info
+
+
+def org_report_request(org_name, df_org, org_learning_df=None, keywords=None):
+    """조직 HRD 분석 리포트 요청. org_learning_df 는 조직 구성원의 수강 이력.
+
+    keywords 는 표제어 빈도(Series)로, 데이터셋 색인에서 미리 센 값을 넘기면 그대로 쓴다.
+    """
+    if keywords is None:
+        texts = df_org['question']
+        if org_learning_df is not None and not org_learning_df.empty and 'title' in org_learning_df.columns:
+            texts = pd.concat([texts, org_learning_df['title']],
+                              ignore_index=True)
+        keywords = TermMatrix(texts.reset_index(drop=True)).frequencies()
+    keyword_text = ", ".join(keywords.head(KEYWORD_COUNT).index.astype(str))
+    if 'chat_title' in df_org:
+        title_counts = df_org['chat_title'].value_counts()
+        top_questions_text = "\n- ".join(
+            title_counts[title_counts > 0].head(5).index.astype(str).tolist())
+    else:
+        top_questions_text = "질문 주제 데이터 없음"
+    learning_summary_text = " (학습 이력 데이터 없음)"
+    if org_learning_df is not None and not org_learning_df.empty:
+        top_courses = org_learning_df['title'].value_counts().head(
+            5).index.tolist()
+        learning_summary_text = f"### 3. 주요 학습 과정 Top 5:\n- " + "\n- ".join(
+            top_courses)
+    prompt = f"""당신은 데이터 기반의 HRD 전략 컨설턴트입니다. 다음 데이터를 바탕으로 조직의 특성을 심층 분석하고 보고서를 작성해주세요.\n\n### 분석 대상 조직: {org_name}\n\n### 1. 주요 질문/학습 키워드: {keyword_text}\n### 2. 주요 질문 주제: {top_questions_text}\n{learning_summary_text}\n---\n### [분석 요청]\n위 데이터를 HRD 관점에서 종합 분석하여, 반드시 아래 4가지 항목의 제목을 포함하여 보고서를 작성해주세요.\n\n1. **조직의 주요 관심사 및 현황**: 구성원들이 현재 가장 관심을 갖는 업무 분야나 주제는 무엇입니까?\n2. **업무/역량 관련 주요 이슈**: 자주 묻는 질문들을 통해 파악할 수 있는 이 조직의 업무상 어려움(pain point)이나 역량적 공백은 무엇입니까?\n3. **지식 격차 및 필요 역량**: 구성원들이 보유한 지식(학습 이력)과 궁금해하는 지식(질문) 사이의 차이는 무엇이며, 어떤 역량을 추가 개발해야 합니까?\n4. **HRD 관점의 종합 제언**: 이 조직의 성과 향상과 역량 개발을 위해 어떤 교육 프로그램 설계나 학습 문화 조성이 효과적일지 구체적인 액션 아이템 1~2가지를 제안해주세요."""
+    messages = [{"role": "user", "content": prompt}]
+    return {'model': REPORT_MODEL, 'messages': messages, 'temperature': 0.4}
@@ -0,0 +1,175 @@
+"""조직별 HRD 리포트 일괄 생성 명령행 도구.
+
+앱의 조직 검색 탭과 같은 집계·프롬프트로 모든 조직(센터 / 실 / 팀)의 리포트를 만들어
+출력 폴더에 리포트(.md)와 워드클라우드(.png)로 저장한다. 이미 저장된 조직은
+건너뛰므로, 중간에 실패하거나 멈췄으면 같은 명령을 다시 실행해 이어서 만들면 된다.
+GPT 호출은 응답 캐시를 거치므로 끝난 요청은 다시 과금되지 않는다.
+
+사용 예:
+    OPENAI_API_KEY=... python -m samlog.reports sam_2024_q2.arrow -l learning.csv
+    python -m samlog.reports sam_2024_q2.arrow -o reports/2024q2 --level 3 --workers 8
+    python -m samlog.reports sam_2024_q2.arrow --dedup   # 반복 질문은 한 번만 반영
+"""
+import argparse
+import os
+import re
+import sys
+import time
+from concurrent.futures import as_completed
+
+from openai import OpenAI
+
+from samlog import analytics
+from samlog.cloud import WordCloudRenderer
+from samlog.gpt_cache import ResponseCache
+from samlog.learning_join import join_datasets
+from samlog.llm import MAX_WORKERS, LLMExecutor
+from samlog.loader import read_dataset
+from samlog.prompts import org_report_request
+
+LEVEL_NAMES = {1: "센터", 2: "실", 3: "팀"}
+
+
+def org_name(selection):
+    """조직 선택 튜플의 표시 이름 (예: A센터/경영지원실/인사팀)."""
+    return "/".join(str(value) for value in selection if value is not None)
+
+
+def _file_stem(name):
+    return re.sub(r'[\\/:*?"<>|\s]+', '_', name).strip('_')
+
+
+def _write_atomic(path, data):
+    mode = "wb" if isinstance(data, bytes) else "w"
+    encoding = None if isinstance(data, bytes) else "utf-8"
+    with open(path + ".tmp", mode, encoding=encoding) as f:
+        f.write(data)
+    os.replace(path + ".tmp", path)
+
+
+def generate_reports(dataset,
+                     executor,
+                     out_dir,
+                     learning=None,
+                     levels=(1, 2, 3),
+                     renderer=None,
+                     on_report=None):
+    """모든 조직 리포트를 out_dir 에 저장한다. 이미 있는 리포트는 건너뛴다.
+
+    on_report(이름, 오류 또는 None) 은 리포트 하나가 끝날 때마다 불린다.
+    (생성 수, 건너뛴 수, [(이름, 오류)]) 를 돌려준다.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    org_index = analytics.org_index(dataset)
+    join = join_datasets(dataset, learning) if learning is not None else None
+
+    futures, skipped = {}, 0
+    for selection in org_index.tree():
+        if sum(value is not None for value in selection) not in levels:
+            continue
+        name = org_name(selection)
+        path = os.path.join(out_dir, _file_stem(name))
+        if os.path.exists(path + ".md"):
+            skipped += 1
+            continue
+        positions = org_index.node(*selection).positions
+        keywords = analytics.org_keywords(dataset, positions, learning)
+        org_learning = join.rows(join.user_codes(positions)) if join else None
+        request = org_report_request(name, dataset.df.iloc[positions],
+                                     org_learning, keywords)
+        futures[executor.submit(**request)] = (name, path)
+
+        # GPT 응답을 기다리는 동안 워드클라우드를 그린다
+        if renderer is not None and not os.path.exists(path + ".png"):
+            png = renderer.render((dataset.key, name), lambda: keywords)
+            if png is not None:
+                _write_atomic(path + ".png", png)
+
+    done, failures = 0, []
+    for future in as_completed(futures):
+        name, path = futures[future]
+        try:
+            _write_atomic(path + ".md", f"# {name}\n\n{future.result()}\n")
+            done += 1
+            error = None
+        except Exception as e:
+            failures.append((name, e))
+            error = e
+        if on_report is not None:
+            on_report(name, error)
+    return done, skipped, failures
+
+
+def _open_dataset(path):
+    stat = os.stat(path)
+    key = f"file:{os.path.abspath(path)}:{stat.st_size}:{stat.st_mtime_ns}"
+    return read_dataset(path, os.path.basename(path), key)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="모든 조직의 HRD 분석 리포트와 워드클라우드를 한 번에 생성합니다.")
+    parser.add_argument("src", help="질문/답변 데이터 (.csv / .xlsx / .parquet / .arrow)")
+    parser.add_argument("-l", "--learning", help="수강 이력 데이터 (선택)")
+    parser.add_argument("-o",
+                        "--output",
+                        default="reports",
+                        help="출력 폴더 (기본: reports)")
+    parser.add_argument("--level",
+                        type=int,
+                        action="append",
+                        choices=sorted(LEVEL_NAMES),
+                        help="생성할 조직 단계 (1=센터, 2=실, 3=팀, 여러 번 지정 가능, 기본: 전체)")
+    parser.add_argument("--workers",
+                        type=int,
+                        default=MAX_WORKERS,
+                        help=f"동시에 보내는 GPT 요청 수 (기본: {MAX_WORKERS})")
+    parser.add_argument("--no-cloud",
+                        action="store_true",
+                        help="워드클라우드 이미지를 만들지 않음")
+    parser.add_argument("--dedup",
+                        action="store_true",
+                        help="반복 질문(완전·유사 중복)은 묶음마다 한 번만 반영")
+    args = parser.parse_args(argv)
+
+    started = time.perf_counter()
+    dataset = _open_dataset(args.src)
+    learning = _open_dataset(args.learning) if args.learning else None
+    print(f"📂 {args.src}: {len(dataset.df):,}행"
+          f" (적재 {time.perf_counter() - started:.1f}초)")
+    if args.dedup:
+        dataset = analytics.deduplicated(dataset)
+        print(f"🧹 반복 질문 제외 후 {len(dataset.df):,}행")
+
+    executor = LLMExecutor(OpenAI(),
+                           cache=ResponseCache(),
+                           max_workers=args.workers)
+    renderer = None if args.no_cloud else WordCloudRenderer()
+    count = [0]
+
+    def on_report(name, error):
+        count[0] += 1
+        status = "✅" if error is None else f"❌ {error}"
+        print(f"[{count[0]}] {name} {status}", flush=True)
+
+    started = time.perf_counter()
+    done, skipped, failures = generate_reports(dataset,
+                                               executor,
+                                               args.output,
+                                               learning=learning,
+                                               levels=tuple(args.level
+                                                            or LEVEL_NAMES),
+                                               renderer=renderer,
+                                               on_report=on_report)
+    minutes = (time.perf_counter() - started) / 60
+    rate = done / minutes if minutes > 0 else 0.0
+    print(f"✅ {done}건 생성, {skipped}건 건너뜀(이미 있음), {len(failures)}건 실패 "
+          f"({minutes:.1f}분, 분당 {rate:.1f}건) → {args.output}")
+    if failures:
+        print("실패한 조직은 같은 명령을 다시 실행하면 이어서 생성합니다.")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
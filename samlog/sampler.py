@@ -0,0 +1,76 @@
+"""GPT 프롬프트용 층화 표본 추출.
+
+질문을 chat_title·조직·월 층으로 나눠 모든 층이 한 번씩 먼저 들어가도록 하고,
+그 뒤로는 층 크기에 비례해 번갈아 뽑는다. 공백·문장부호·대소문자만 다른 질문은
+하나로 보고, 누적 토큰 수가 예산을 넘기 전까지만 담는다.
+"""
+import pandas as pd
+
+DEFAULT_STRATA = ('chat_title', 'group_1', 'month')
+MAX_ITEM_TOKENS = 200
+
+
+def estimate_tokens(texts):
+    """토큰 수 근사치 (Series). 한글은 글자당 1토큰, 그 외는 4글자당 1토큰으로 본다."""
+    hangul = texts.str.count(r'[가-힣]')
+    return hangul + (texts.str.len() - hangul) // 4 + 1
+
+
+def normalize_text(texts):
+    """중복 판정용 키: 소문자화, 문장부호 제거, 공백 정리."""
+    return (texts.str.lower().str.replace(r'[^\w\s]', '', regex=True).str.replace(
+        r'\s+', ' ', regex=True).str.strip())
+
+
+def truncate(texts, max_tokens=MAX_ITEM_TOKENS):
+    """너무 긴 문장은 대략 max_tokens 에 맞춰 자른다 (한글 기준 글자 수)."""
+    return texts.where(texts.str.len() <= max_tokens,
+                       texts.str.slice(0, max_tokens) + "…")
+
+
+def stratified_sample(df,
+                      text_col='question',
+                      strata=DEFAULT_STRATA,
+                      token_budget=2000,
+                      max_items=None,
+                      seed=42):
+    """df 에서 대표 문장을 뽑아 예산 안에 들어가는 목록으로 돌려준다."""
+    if text_col not in df.columns or df.empty:
+        return []
+    frame = pd.DataFrame({'text': df[text_col]}).dropna()
+    frame['text'] = truncate(frame['text'].astype(str).str.strip())
+    frame = frame[frame['text'].str.len() > 0]
+
+    strata_cols = []
+    for col in strata:
+        if col == 'month' and 'regymdt' in df.columns:
+            frame['month'] = df['regymdt'].dt.to_period('M')
+        elif col in df.columns:
+            frame[col] = df[col]
+        else:
+            continue
+        strata_cols.append(col)
+
+    frame = frame.sample(frac=1, random_state=seed)
+    frame = frame.loc[~normalize_text(frame['text']).duplicated()]
+    if frame.empty:
+        return []
+
+    # 층마다 0번째 항목을 먼저(큰 층부터), 이후 rank/층 크기 순으로 번갈아 배치
+    if strata_cols:
+        grouped = frame.groupby(strata_cols, dropna=False, observed=True)
+        frame['stratum_size'] = grouped['text'].transform('size')
+        frame['rank'] = grouped.cumcount()
+    else:
+        frame['stratum_size'] = len(frame)
+        frame['rank'] = range(len(frame))
+    frame['priority'] = frame['rank'] / frame['stratum_size']
+    frame = frame.sort_values(['priority', 'stratum_size'],
+                              ascending=[True, False],
+                              kind='stable')
+
+    within_budget = estimate_tokens(frame['text']).cumsum() <= token_budget
+    samples = frame.loc[within_budget.to_numpy(), 'text']
+    if max_items is not None:
+        samples = samples.head(max_items)
+    return samples.tolist()
@@ -0,0 +1,100 @@
+"""단어 검색용 역색인.
+
+question/answer 열마다 만든 단어-문서 행렬(korean.TermMatrix)로 토큰 → 행 위치를
+찾는다. 부분 문자열 검색은 행 전체가 아니라 토큰 사전(어휘)만 훑어서 일치하는
+토큰들의 posting 을 합친다. 입력은 정규식이 아닌 글자 그대로 다룬다. 같은 행렬에서
+표제어 빈도(워드클라우드, GPT 프롬프트 키워드)도 꺼내 쓴다.
+
+검색어 문법:
+    회의실 예약      두 단어를 모두 포함 (AND)
+    회의실 | 강의실  둘 중 하나라도 포함 (OR, 'OR' 도 가능)
+"""
+import re
+
+import numpy as np
+
+from samlog.korean import TOKEN_SPLIT, TermMatrix, merge_frequencies
+
+SEARCH_COLUMNS = ('question', 'answer')
+
+
+def parse_query(query):
+    """검색어를 OR 로 묶인 AND 토큰 목록들로 나눈다."""
+    groups = re.split(r'\s*(?:\||\bOR\b)\s*', query.strip())
+    parsed = []
+    for group in groups:
+        terms = [term for term in re.split(TOKEN_SPLIT, group) if term]
+        if terms:
+            parsed.append(terms)
+    return parsed
+
+
+class KeywordIndex:
+
+    def __init__(self, df, columns=SEARCH_COLUMNS, chunk_rows=100_000):
+        self.columns = tuple(col for col in columns if col in df.columns)
+        self.n_rows = len(df)
+        self.matrices = {
+            col: TermMatrix(df[col], chunk_rows)
+            for col in self.columns
+        }
+
+    def extend(self, delta):
+        """delta 행을 기존 행 뒤에 붙인 새 색인. delta 만 토큰화해 posting 을 이어 붙인다."""
+        merged = object.__new__(KeywordIndex)
+        merged.columns = self.columns
+        merged.n_rows = self.n_rows + len(delta)
+        merged.matrices = {
+            col: matrix.extend(delta[col])
+            for col, matrix in self.matrices.items()
+        }
+        return merged
+
+    def _matches(self, term, exact):
+        """어느 한 열에라도 term 이 나오는 행 마스크."""
+        mask = np.zeros(self.n_rows, dtype=bool)
+        for matrix in self.matrices.values():
+            mask[matrix.documents(matrix.term_ids(term, exact))] = True
+        return mask
+
+    def search(self, query, exact=False):
+        """검색어와 일치하는 행 위치(정렬된 배열). exact 면 토큰 전체 일치만 찾는다."""
+        matched = np.zeros(self.n_rows, dtype=bool)
+        for terms in parse_query(query):
+            rows = self._matches(terms[0], exact)
+            for term in terms[1:]:
+                if not rows.any():
+                    break
+                rows &= self._matches(term, exact)
+            matched |= rows
+        return np.flatnonzero(matched).astype(np.int32)
+
+    def frequencies(self, positions=None, columns=None, top=None):
+        """positions 행(없으면 전체)의 표제어 빈도. columns 를 주면 그 열만 센다."""
+        return merge_frequencies(*(self.matrices[col].frequencies(positions)
+                                   for col in (columns or self.columns)
+                                   if col in self.matrices),
+                                 top=top)
+
+
+class KeywordIndexView:
+    """부모 색인에서 일부 행(positions, 오름차순)만 보는 색인. 행 위치는 부분 집합 기준이다."""
+
+    def __init__(self, index, positions):
+        self.index = index
+        self.positions = positions
+        self.columns = index.columns
+        self.n_rows = len(positions)
+
+    def search(self, query, exact=False):
+        found = self.index.search(query, exact=exact)
+        at = np.searchsorted(self.positions, found)
+        inside = at < len(self.positions)
+        inside[inside] = self.positions[at[inside]] == found[inside]
+        return at[inside].astype(np.int32)
+
+    def frequencies(self, positions=None, columns=None, top=None):
+        return self.index.frequencies(
+            self.positions if positions is None else self.positions[positions],
+            columns=columns,
+            top=top)
@@ -0,0 +1,163 @@
+"""일일 증분 export 를 누적하는 데이터 저장소.
+
+매일 전체 누적 export 를 다시 올리는 대신, 그날의 증분 파일만 받아 이미 저장된 행과
+행 키(row key)로 중복을 걸러 새 행만 Arrow IPC 세그먼트로 덧붙인다. 저장소 디렉터리
+구성:
+
+    manifest.json             세그먼트 목록, 반영한 파일 키
+    segment-00001.arrow       세그먼트 행 (사전 인코딩, 메모리 매핑으로 읽음)
+    segment-00001.keys.npy    세그먼트 행 키 (uint64)
+
+메모리에 올린 Dataset 은 Dataset.extended 로 이어 붙이므로, 큐브와 역색인 같은 파생
+집계도 새 행만큼만 다시 계산한다.
+"""
+import json
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+
+from samlog import profiling
+from samlog.convert import to_snapshot_table, write_snapshot
+from samlog.loader import (Dataset, arrow_to_frame, compact_frame,
+                           concat_frames, fingerprint, read_arrow, read_frame)
+
+STORE_DIR = os.path.join(".sam_cache", "store")
+
+# 같은 행으로 보는 기준 컬럼 (있는 것만 사용)
+ROW_KEY_COLUMNS = ('user_id', 'regymdt', 'question', 'answer')
+
+
+def _key_column(series):
+    # 해시는 dtype 에 따라 달라진다. 문자열·categorical·날짜는 값이 같으면 해시도 같지만,
+    # 값이 모두 빈 증분 컬럼은 float NaN 으로 읽히므로 객체(None)로 바꿔 빈 문자열 값과 맞춘다
+    if (isinstance(series.dtype, pd.CategoricalDtype)
+            or pd.api.types.is_string_dtype(series)
+            or pd.api.types.is_datetime64_any_dtype(series)):
+        return series
+    return series.astype(object).where(series.notna(), None)
+
+
+def row_keys(df, columns=ROW_KEY_COLUMNS):
+    """행 키 해시 (uint64 배열). 컬럼 dtype 이 증분마다 달라도 같은 행은 같은 키."""
+    columns = [col for col in columns if col in df.columns] or list(df.columns)
+    frame = pd.DataFrame({col: _key_column(df[col]) for col in columns})
+    return pd.util.hash_pandas_object(frame, index=False).to_numpy()
+
+
+def _contains(sorted_keys, keys):
+    """keys 각각이 정렬된 sorted_keys 안에 있는지 (이진 탐색)."""
+    if len(sorted_keys) == 0:
+        return np.zeros(len(keys), dtype=bool)
+    positions = np.minimum(np.searchsorted(sorted_keys, keys),
+                           len(sorted_keys) - 1)
+    return sorted_keys[positions] == keys
+
+
+class AppendStore:
+
+    def __init__(self, path=STORE_DIR, name="SAM 누적 데이터"):
+        os.makedirs(path, exist_ok=True)
+        self.path = path
+        self.name = name
+        self._lock = threading.Lock()
+        self._dataset = None
+
+        manifest_path = os.path.join(path, "manifest.json")
+        if os.path.exists(manifest_path):
+            with open(manifest_path, encoding="utf-8") as f:
+                self._manifest = json.load(f)
+        else:
+            self._manifest = {'segments': [], 'sources': []}
+        keys = [
+            np.load(self._file(segment['name'], ".keys.npy"))
+            for segment in self._manifest['segments']
+        ]
+        self._keys = np.sort(np.concatenate(keys)) if keys else np.empty(
+            0, dtype=np.uint64)
+
+    def __len__(self):
+        return sum(segment['rows'] for segment in self._manifest['segments'])
+
+    @property
+    def segments(self):
+        return list(self._manifest['segments'])
+
+    def _file(self, segment_name, suffix):
+        return os.path.join(self.path, segment_name + suffix)
+
+    def _dataset_key(self):
+        return f"store:{os.path.abspath(self.path)}:{len(self._manifest['segments'])}"
+
+    def _save_manifest(self):
+        # 쓰는 도중 중단되어도 이전 manifest 가 남도록 임시 파일에 쓴 뒤 교체
+        manifest_path = os.path.join(self.path, "manifest.json")
+        with open(manifest_path + ".tmp", "w", encoding="utf-8") as f:
+            json.dump(self._manifest, f, ensure_ascii=False, indent=1)
+        os.replace(manifest_path + ".tmp", manifest_path)
+
+    def dataset(self):
+        """저장된 전체 행의 Dataset. 처음 호출할 때 세그먼트를 읽는다. 비어 있으면 None."""
+        with self._lock:
+            if self._dataset is None and self._manifest['segments']:
+                # 세그먼트마다 저장 당시의 스키마가 다를 수 있으므로(사전 인코딩 컬럼 추가 등)
+                # 각각 작은 표현으로 맞춘 뒤 잇는다
+                df = concat_frames([
+                    compact_frame(
+                        arrow_to_frame(
+                            read_arrow(self._file(segment['name'],
+                                                  ".arrow"))))
+                    for segment in self._manifest['segments']
+                ])
+                self._dataset = Dataset(self._dataset_key(), self.name, df)
+            return self._dataset
+
+    def append(self, df, source=None):
+        """정규화된 증분 행을 저장하고, 실제로 새로 추가된 행 수를 돌려준다.
+
+        source 는 파일 키로, 이미 반영한 파일이면 아무 것도 하지 않는다.
+        """
+        with self._lock, profiling.span('store.append', rows=len(df)):
+            if source is not None and source in self._manifest['sources']:
+                return 0
+            keys = row_keys(df)
+            # 파일 안의 중복은 처음 나온 행만, 저장소에 이미 있는 키는 제외
+            _, first = np.unique(keys, return_index=True)
+            first.sort()
+            known = _contains(self._keys, keys[first])
+            keep = first[~known]
+            delta = df.iloc[keep].reset_index(drop=True)
+
+            if len(delta):
+                segment_name = f"segment-{len(self._manifest['segments']) + 1:05d}"
+                write_snapshot(to_snapshot_table(delta),
+                               self._file(segment_name, ".arrow"))
+                np.save(self._file(segment_name, ".keys.npy"), keys[keep])
+                self._manifest['segments'].append({
+                    'name': segment_name,
+                    'rows': len(delta),
+                    'source': source
+                })
+                added = np.sort(keys[keep])
+                self._keys = np.insert(self._keys,
+                                       np.searchsorted(self._keys, added),
+                                       added)
+            if source is not None:
+                self._manifest['sources'].append(source)
+            self._save_manifest()
+
+            # 이미 메모리에 올린 Dataset 은 새 행만 이어 붙인다
+            if self._dataset is not None and len(delta):
+                self._dataset = self._dataset.extended(self._dataset_key(),
+                                                       delta)
+            return len(delta)
+
+    def append_file(self, uploaded_file):
+        """업로드된 증분 파일을 추가한다. 같은 파일을 다시 올리면 건너뛴다."""
+        data = uploaded_file.getvalue()
+        source = fingerprint(data, uploaded_file.name)
+        if source in self._manifest['sources']:
+            return 0
+        df = compact_frame(read_frame(data, uploaded_file.name))
+        return self.append(df, source)
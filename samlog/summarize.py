@@ -0,0 +1,143 @@
+"""질문 전체를 대상으로 하는 map-reduce 요약.
+
+응답/미응답 질문을 모두 모아 중복을 합치고(반복 횟수 표시), 토큰 예산 단위 묶음으로
+나눠 병렬로 요약한 뒤(map), 부분 요약을 FAN_IN 개씩 합쳐(reduce) 최종 보고서 요청을
+만든다. 최종 요청은 호출하는 쪽에서 스트리밍으로 보낸다.
+
+묶음 구성은 같은 입력이면 항상 같으므로, 실행기에 응답 캐시가 있으면 중간에 끊긴
+실행을 다시 돌렸을 때 이미 끝난 묶음은 API 를 다시 호출하지 않는다.
+"""
+import math
+from concurrent.futures import as_completed
+
+import numpy as np
+import pandas as pd
+
+from samlog.prompts import (answer_analysis_request, chunk_summary_request,
+                            merge_summary_request)
+from samlog.sampler import estimate_tokens, normalize_text, truncate
+
+CHUNK_TOKENS = 6000
+FAN_IN = 8
+
+
+def question_chunks(rows, chunk_tokens=CHUNK_TOKENS):
+    """질문을 묶음(문장 목록들)으로 나눈다.
+
+    표본을 뽑지 않고 (중복을 합친) 모든 질문을 담으며, 묶음마다 chunk_tokens 를 넘지 않는다.
+    묶음 수에는 한도가 없고 reduce 단계가 FAN_IN 개씩 합쳐 최종 요청 크기를 제한한다.
+    """
+    frame = pd.DataFrame({'text': rows['question']}).dropna()
+    frame['text'] = truncate(frame['text'].astype(str).str.strip())
+    frame = frame[frame['text'].str.len() > 0]
+    if frame.empty:
+        return []
+    if 'chat_title' in rows.columns:
+        frame['chat_title'] = rows['chat_title']
+
+    frame['key'] = normalize_text(frame['text'])
+    repeats = frame.groupby('key', sort=False)['text'].transform('size')
+    frame['text'] = frame['text'].where(
+        repeats == 1, frame['text'] + " (×" + repeats.astype(str) + ")")
+    frame = frame[~frame['key'].duplicated()]
+    if 'chat_title' in frame.columns:
+        frame = frame.sort_values('chat_title', kind='stable')
+
+    # 토큰 수가 고르게 나뉘도록 누적 토큰 기준으로 연속 구간을 자른다. 경계에 걸친 문장
+    # 때문에 예산을 넘는 묶음이 있으면 묶음 수를 늘려 다시 자른다
+    tokens = estimate_tokens(frame['text']).to_numpy()
+    total = int(tokens.sum())
+    budget = max(chunk_tokens, int(tokens.max()))
+    n_chunks = max(1, math.ceil(total / budget))
+    while True:
+        chunk_of = np.minimum((np.cumsum(tokens) - tokens) * n_chunks // total,
+                              n_chunks - 1)
+        if np.bincount(chunk_of, weights=tokens).max() <= budget:
+            break
+        n_chunks += 1
+    return [
+        part['text'].tolist()
+        for _, part in frame.groupby(chunk_of, sort=True)
+    ]
+
+
+class MapReduceSummarizer:
+
+    def __init__(self,
+                 executor,
+                 chunk_tokens=CHUNK_TOKENS,
+                 fan_in=FAN_IN):
+        self.executor = executor
+        self.chunk_tokens = chunk_tokens
+        self.fan_in = fan_in
+
+    def _n_calls(self, n_chunks):
+        calls = n_chunks
+        while n_chunks > self.fan_in:
+            n_chunks = math.ceil(n_chunks / self.fan_in)
+            calls += n_chunks
+        return calls
+
+    def _run(self, requests, progress):
+        # 같은 요청은 실행기에서 하나의 Future 로 합쳐지므로 Future 별 위치 목록을 둔다
+        positions = {}
+        for i, request in enumerate(requests):
+            positions.setdefault(self.executor.submit(**request), []).append(i)
+        results = [None] * len(requests)
+        for future in as_completed(positions):
+            for i in positions[future]:
+                results[i] = future.result()
+                progress()
+        return results
+
+    def final_requests(self, jobs, on_progress=None):
+        """{이름: (질문 행, 응답 여부)} → {이름: 최종 보고서 요청}.
+
+        모든 작업의 map/reduce 호출을 단계별로 한꺼번에 보낸다. on_progress(완료, 전체)는
+        호출이 하나 끝날 때마다 불린다.
+        """
+        finals, pending = {}, {}
+        for name, (rows, is_answered) in jobs.items():
+            chunks = question_chunks(rows, self.chunk_tokens)
+            if len(chunks) == 1:
+                # 한 묶음에 다 들어가면 map-reduce 없이 바로 최종 분석
+                finals[name] = answer_analysis_request(
+                    rows, is_answered, token_budget=self.chunk_tokens)
+            elif chunks:
+                pending[name] = (is_answered, [
+                    chunk_summary_request(chunk, is_answered, i, len(chunks),
+                                          len(rows))
+                    for i, chunk in enumerate(chunks, start=1)
+                ])
+
+        total = sum(
+            self._n_calls(len(requests)) for _, requests in pending.values())
+        done = [0]
+
+        def progress():
+            done[0] += 1
+            if on_progress is not None:
+                on_progress(done[0], total)
+
+        while pending:
+            flat = [(name, request) for name, (_, requests) in pending.items()
+                    for request in requests]
+            results = self._run([request for _, request in flat], progress)
+            summaries = {}
+            for (name, _), result in zip(flat, results):
+                summaries.setdefault(name, []).append(result)
+
+            for name, parts in summaries.items():
+                is_answered = pending[name][0]
+                if len(parts) <= self.fan_in:
+                    finals[name] = merge_summary_request(parts,
+                                                         is_answered,
+                                                         final=True)
+                    del pending[name]
+                else:
+                    pending[name] = (is_answered, [
+                        merge_summary_request(parts[i:i + self.fan_in],
+                                              is_answered)
+                        for i in range(0, len(parts), self.fan_in)
+                    ])
+        return finals
@@ -0,0 +1,203 @@
+"""벤치마크·부하 확인용 합성 SAM 데이터 생성기.
+
+앱이 기대하는 컬럼(user_id, user_name, group_1~3, regymdt, question, answer,
+answer_yn, chat_title)을 가진 질문/답변 데이터와 수강 이력(user_id, user_name,
+title)을 만든다. 실제 export 처럼 소수 이용자에게 질문이 몰리고(Zipf), 질문은 주제
+(chat_title)별 어휘와 조사가 붙은 토큰, 드문 낱말이 섞인 문장이다. 문장은 미리 만든
+풀에서 골라 쓰므로 천만 행도 몇 초 안에 만든다. 같은 seed 면 같은 데이터가 나온다.
+
+사용 예:
+    python -m samlog.synthetic 100000 -o sam_100k.arrow
+    python -m samlog.synthetic 1000000 -o sam_1m.csv -l learning_1m.csv
+"""
+import argparse
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from samlog.convert import to_snapshot_table, write_snapshot
+
+CENTERS = ('경영지원센터', '디지털센터', '연구개발센터', '영업센터', '생산센터', '품질센터',
+           '고객센터', '전략센터')
+OFFICES = ('기획실', '운영실', '기술실', '지원실')
+TEAMS = ('1팀', '2팀', '3팀', '4팀')
+
+# 주제(chat_title)별 자주 쓰는 낱말
+TOPICS = {
+    '휴가·근태': ('연차', '휴가', '반차', '근태', '출근', '퇴근', '재택근무', '초과근무'),
+    '급여·복리후생': ('급여', '명세서', '수당', '복지포인트', '건강검진', '경조사', '연말정산'),
+    '교육·학습': ('교육', '과정', '수강', '이러닝', '자격증', '학습', '리더십', '필수교육'),
+    '시설·회의실': ('회의실', '예약', '주차', '출입증', '사무실', '좌석', '택배'),
+    'IT·시스템': ('비밀번호', '메일', '그룹웨어', '노트북', '보안', '프린터', '오류', 'VPN'),
+    '인사·평가': ('평가', '승진', '인사발령', '목표', '면담', '역량', '조직개편'),
+    '구매·정산': ('법인카드', '영수증', '정산', '구매', '출장비', '전표', '예산'),
+    '보안·규정': ('규정', '개인정보', '보안서약', '반출', '승인', '문서', '감사'),
+}
+# (받침 있는 말 뒤, 받침 없는 말 뒤) 조사. 빈 조사가 많을수록 맨 낱말이 자주 나온다.
+PARTICLES = (('', ''), ('', ''), ('', ''), ('을', '를'), ('은', '는'), ('이', '가'),
+             ('에', '에'), ('에서', '에서'), ('으로', '로'), ('의', '의'), ('도', '도'))
+ENDINGS = ('어떻게 하나요', '방법이 궁금합니다', '가능한가요', '어디서 확인하나요', '알려주세요',
+           '문의드립니다', '언제까지인가요', '안 됩니다')
+SYLLABLES = tuple('가나다라마바사아자차카타파하고노도로모보소오조초코토포호구누두루무부수우주추')
+COURSE_SUBJECTS = ('엑셀', '파이썬', '데이터 분석', '보고서 작성', '리더십', '협상', '프로젝트 관리',
+                   '재무 기초', '마케팅', '정보보안', '코칭', '글쓰기', 'SQL', '생성형 AI', '품질경영')
+COURSE_LEVELS = ('입문', '기초', '실무', '심화', '과정')
+SURNAMES = tuple('김이박최정강조윤장임한오서신권황안송류홍')
+GIVEN = ('민준', '서연', '도윤', '지우', '하준', '서윤', '시우', '지민', '주원', '하은', '유준', '수아',
+         '지호', '예은', '현우', '지유')
+
+POOL_SIZE = 50_000
+RARE_WORDS = 20_000
+
+
+def _rare_words(rng, n=RARE_WORDS):
+    # 두세 음절 낱말 (실제 데이터의 긴 꼬리 어휘 흉내)
+    lengths = rng.integers(2, 4, n)
+    syllables = rng.choice(np.array(SYLLABLES), (n, 3))
+    return np.array([''.join(row[:k]) for row, k in zip(syllables, lengths)],
+                    dtype=object)
+
+
+def _has_final_consonant(word):
+    last = ord(word[-1]) - 0xAC00
+    return 0 <= last < 11172 and last % 28 != 0
+
+
+def _sentence_pool(rng, n):
+    """(주제 번호, 질문, 답변) 풀."""
+    topics = list(TOPICS)
+    rare = _rare_words(rng)
+    topic_ids = rng.integers(0, len(topics), n)
+    # 문장마다 쓰는 난수는 한꺼번에 뽑고, 반복문에서는 문자열만 잇는다
+    word_picks = rng.integers(0, 1 << 16, (n, 3))
+    particle_picks = rng.integers(0, len(PARTICLES), (n, 3))
+    n_words = rng.integers(2, 4, n)
+    rare_picks = rng.integers(0, len(rare), (n, 3))
+    n_rare = rng.integers(0, 3, n)
+    endings = rng.integers(0, len(ENDINGS), n)
+    questions, answers = [], []
+    for i, topic_id in enumerate(topic_ids):
+        words = TOPICS[topics[topic_id]]
+        tokens = []
+        for word_pick, particle_pick in zip(word_picks[i, :n_words[i]],
+                                            particle_picks[i, :n_words[i]]):
+            word = words[word_pick % len(words)]
+            tokens.append(word + PARTICLES[particle_pick][
+                0 if _has_final_consonant(word) else 1])
+        tokens[1:1] = rare[rare_picks[i, :n_rare[i]]]
+        questions.append(' '.join(tokens) + ' ' + ENDINGS[endings[i]] + '?')
+        answers.append(f"{words[0]} 관련 문의는 {words[word_picks[i, 2] % len(words)]} "
+                       f"메뉴에서 확인하실 수 있습니다. {rare[rare_picks[i, 2]]} 담당자에게 "
+                       f"문의해 주세요.")
+    return topic_ids, np.array(questions, dtype=object), np.array(answers,
+                                                                  dtype=object)
+
+
+def _user_names(rng, n):
+    surnames = rng.choice(np.array(SURNAMES), n)
+    given = rng.choice(np.array(GIVEN), n)
+    return np.char.add(surnames.astype(str), given.astype(str)).astype(object)
+
+
+def users_frame(n_users, seed=0):
+    """이용자 목록 (user_id, user_name, group_1~3). 팀 크기는 고르지 않다."""
+    rng = np.random.default_rng(seed)
+    teams = [(center, f"{center[:-2]}{office}", f"{center[:-2]}{office} {team}")
+             for center in CENTERS for office in OFFICES for team in TEAMS]
+    team_weights = rng.gamma(2.0, size=len(teams))
+    team_ids = rng.choice(len(teams), n_users, p=team_weights / team_weights.sum())
+    orgs = np.array(teams, dtype=object)[team_ids]
+    return pd.DataFrame({
+        'user_id': np.arange(100_001, 100_001 + n_users),
+        'user_name': _user_names(rng, n_users),
+        'group_1': orgs[:, 0],
+        'group_2': orgs[:, 1],
+        'group_3': orgs[:, 2],
+    })
+
+
+def qa_frame(n_rows, n_users=None, seed=0, start="2024-01-01", days=365):
+    """질문/답변 데이터 n_rows 행 (날짜순). n_users 기본값은 행 25개당 한 명."""
+    rng = np.random.default_rng(seed)
+    n_users = n_users or max(50, n_rows // 25)
+    users = users_frame(n_users, seed)
+
+    # 질문 수는 이용자 순위에 반비례 (소수 이용자가 많이 묻는다)
+    weights = 1.0 / np.arange(1, n_users + 1)**0.8
+    user_rows = rng.choice(n_users, n_rows, p=weights / weights.sum())
+
+    topic_ids, questions, answers = _sentence_pool(rng, min(n_rows, POOL_SIZE))
+    sentence = rng.integers(0, len(questions), n_rows)
+    answered = rng.random(n_rows) < 0.7
+
+    seconds = np.sort(rng.integers(0, days * 86_400, n_rows))
+    df = users.iloc[user_rows].reset_index(drop=True)
+    df['regymdt'] = pd.Timestamp(start) + pd.to_timedelta(seconds, unit='s')
+    df['question'] = questions[sentence]
+    df['answer'] = np.where(answered, answers[sentence], None)
+    df['answer_yn'] = np.where(answered, 'Y', 'N')
+    df['chat_title'] = np.array(list(TOPICS), dtype=object)[topic_ids[sentence]]
+    return df
+
+
+def learning_frame(qa, per_user=12, seed=0):
+    """qa 이용자(와 질문하지 않은 이용자 일부)의 수강 이력. 이용자당 평균 per_user 건."""
+    rng = np.random.default_rng(seed + 1)
+    users = qa.drop_duplicates('user_id')[['user_id', 'user_name']]
+    extra = users_frame(max(1, len(users) // 5), seed + 1)
+    extra['user_id'] += 10_000_000
+    users = pd.concat([users, extra[['user_id', 'user_name']]],
+                      ignore_index=True)
+
+    counts = rng.poisson(per_user, len(users))
+    rows = np.repeat(np.arange(len(users)), counts)
+    courses = np.array([
+        f"{subject} {level}" for subject in COURSE_SUBJECTS
+        for level in COURSE_LEVELS
+    ],
+                       dtype=object)
+    weights = rng.gamma(1.0, size=len(courses))
+    df = users.iloc[rows].reset_index(drop=True)
+    df['title'] = rng.choice(courses, len(rows), p=weights / weights.sum())
+    return df
+
+
+def write_frame(df, path):
+    """확장자에 맞춰 저장한다 (.csv / .xlsx / .arrow / .feather / .parquet)."""
+    suffix = path.rsplit(".", 1)[-1].lower()
+    if suffix == "csv":
+        df.to_csv(path, index=False)
+    elif suffix == "xlsx":
+        df.to_excel(path, index=False)
+    else:
+        write_snapshot(to_snapshot_table(df), path)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="합성 SAM 질문/답변 데이터(와 수강 이력)를 만듭니다.")
+    parser.add_argument("rows", type=int, help="질문/답변 행 수")
+    parser.add_argument("-o",
+                        "--output",
+                        required=True,
+                        help="출력 파일 (.csv / .xlsx / .arrow / .parquet)")
+    parser.add_argument("-l", "--learning", help="수강 이력 출력 파일 (선택)")
+    parser.add_argument("--seed", type=int, default=0, help="난수 시드 (기본: 0)")
+    args = parser.parse_args(argv)
+
+    started = time.perf_counter()
+    df = qa_frame(args.rows, seed=args.seed)
+    write_frame(df, args.output)
+    print(f"✅ {args.output}: {len(df):,}행, 이용자 {df['user_id'].nunique():,}명 "
+          f"({time.perf_counter() - started:.1f}초)")
+    if args.learning:
+        learning = learning_frame(df, seed=args.seed)
+        write_frame(learning, args.learning)
+        print(f"✅ {args.learning}: {len(learning):,}행")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
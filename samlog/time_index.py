@@ -0,0 +1,91 @@
+"""등록 시각(regymdt) 정렬 색인.
+
+행 위치를 등록 시각 오름차순으로 정렬해 두고, 기간 [start, end) 에 드는 행은 정렬된 시각
+배열에서 이진 탐색 두 번으로 찾는다. 기간이 바뀔 때마다 전체 행을 비교(mask)하지 않으며,
+일/주/월 단위 건수도 구간 경계만 이진 탐색해서 센다. 날짜가 없는 행은 색인에 넣지 않는다.
+"""
+import numpy as np
+import pandas as pd
+
+# 화면에서 고르는 집계 단위 → pandas 기간 단위
+FREQUENCIES = {'일': 'D', '주': 'W', '월': 'M'}
+
+
+def _nanoseconds(value):
+    return pd.Timestamp(value).as_unit('ns').value
+
+
+class TimeIndex:
+    """times[i] 는 order[i] 행의 등록 시각 (ns, 오름차순)."""
+
+    def __init__(self, df):
+        self.n_rows = len(df)
+        if 'regymdt' not in df.columns:
+            self.times = np.empty(0, dtype=np.int64)
+            self.order = np.empty(0, dtype=np.int64)
+            return
+        dates = df['regymdt']
+        values = dates.to_numpy(dtype='datetime64[ns]').view(np.int64)
+        valid = np.flatnonzero(dates.notna().to_numpy())
+        self.order = valid[np.argsort(values[valid], kind='stable')]
+        self.times = values[self.order]
+
+    def extend(self, delta):
+        """delta 행을 더한 새 색인. delta 만 정렬해 기존 정렬 배열에 끼워 넣는다.
+
+        전체를 다시 정렬하지 않으며, 같은 시각이면 기존 행 뒤에 온다.
+        """
+        other = TimeIndex(delta)
+        merged = object.__new__(TimeIndex)
+        merged.n_rows = self.n_rows + other.n_rows
+        at = np.searchsorted(self.times, other.times, side='right')
+        merged.times = np.insert(self.times, at, other.times)
+        merged.order = np.insert(self.order, at, other.order + self.n_rows)
+        return merged
+
+    def __len__(self):
+        return len(self.times)
+
+    @property
+    def first(self):
+        return pd.Timestamp(self.times[0]) if len(self.times) else None
+
+    @property
+    def last(self):
+        return pd.Timestamp(self.times[-1]) if len(self.times) else None
+
+    def _bounds(self, start=None, end=None):
+        lo = 0 if start is None else np.searchsorted(self.times,
+                                                     _nanoseconds(start))
+        hi = len(self.times) if end is None else np.searchsorted(
+            self.times, _nanoseconds(end))
+        return lo, max(lo, hi)
+
+    def count(self, start=None, end=None):
+        """기간 [start, end) 의 행 수."""
+        lo, hi = self._bounds(start, end)
+        return int(hi - lo)
+
+    def positions(self, start=None, end=None):
+        """기간 [start, end) 의 행 위치 (행 순서 오름차순)."""
+        lo, hi = self._bounds(start, end)
+        return np.sort(self.order[lo:hi])
+
+    def counts(self, freq='M', start=None, end=None):
+        """기간 [start, end) 의 freq('D'/'W'/'M') 단위 행 수. 빈 구간도 0 으로 채운다.
+
+        인덱스는 구간 시작 시각이다.
+        """
+        lo, hi = self._bounds(start, end)
+        times = self.times[lo:hi]
+        if not len(times):
+            return pd.Series(dtype=np.int64)
+        periods = pd.period_range(
+            pd.Timestamp(times[0]).to_period(freq),
+            pd.Timestamp(times[-1]).to_period(freq),
+            freq=freq)
+        edges = np.append(
+            periods.start_time.as_unit('ns').asi8,
+            (periods[-1] + 1).start_time.as_unit('ns').value)
+        counts = np.diff(np.searchsorted(times, edges))
+        return pd.Series(counts, index=periods.start_time)
@@ -0,0 +1,109 @@
+"""이용자별 프로필 인덱스.
+
+데이터셋마다 한 번, 행을 user_id 순으로 정렬한 위치 배열과 이용자별 구간(offset)을
+만들어 둔다. 이용자 하나를 열 때는 전체 행을 훑지 않고 그 이용자의 구간만 꺼낸다.
+user_id 는 적재 단계(normalize_user_ids)에서 문자열로 통일되어 있다고 본다.
+"""
+import numpy as np
+import pandas as pd
+
+from samlog.loader import normalize_user_ids
+
+MAX_SEARCH_RESULTS = 200
+
+
+class UserIndex:
+
+    def __init__(self, df):
+        ids = df['user_id'] if 'user_id' in df.columns else pd.Series(
+            [], dtype=object)
+        if isinstance(ids.dtype, pd.CategoricalDtype):
+            # categorical 은 범주 순서로 정렬되므로 범주를 글자 순으로 맞춘다
+            ids = ids.cat.reorder_categories(ids.cat.categories.sort_values())
+        codes, uniques = pd.factorize(ids, sort=True)
+        self.user_ids = pd.Index(uniques, dtype=object)
+
+        # user_id 순(같은 이용자 안에서는 원래 행 순서)으로 정렬한 행 위치와 구간
+        valid = codes >= 0
+        self.order = np.flatnonzero(valid)[np.argsort(
+            codes[valid], kind='stable')].astype(np.int32)
+        sorted_codes = codes[self.order]
+        self.codes = codes.astype(np.int32)  # 행 → 이용자 번호 (user_id 없음은 -1)
+        counts = np.bincount(sorted_codes, minlength=len(uniques))
+        self.ptr = np.concatenate(([0], np.cumsum(counts))).astype(np.int64)
+
+        profiles = pd.DataFrame({'n_rows': counts}, index=self.user_ids)
+        if 'user_name' in df.columns:
+            names = pd.Series(df['user_name'].to_numpy()[self.order])
+            profiles['user_name'] = names.groupby(sorted_codes).first().reindex(
+                range(len(uniques))).to_numpy()
+        if 'answer_yn' in df.columns:
+            answer = df['answer_yn'].to_numpy()[self.order]
+            for column, value in (('n_answered', 'Y'), ('n_unanswered', 'N')):
+                profiles[column] = np.bincount(
+                    sorted_codes, weights=answer == value,
+                    minlength=len(uniques)).astype(np.int64)
+        if 'regymdt' in df.columns:
+            last = df['regymdt'].iloc[self.order].groupby(sorted_codes).max()
+            profiles['last_date'] = last.reindex(range(len(uniques))).to_numpy()
+        self.profiles = profiles
+
+        # 선택 상자 표시 문자열 ('ID / 이름'), 검색용 소문자 사본
+        if 'user_name' in profiles.columns:
+            named = profiles['user_name'].notna().to_numpy()
+            display = np.where(
+                named,
+                self.user_ids.to_numpy() + " / " +
+                profiles['user_name'].astype(str).to_numpy(),
+                self.user_ids.to_numpy())
+        else:
+            display = self.user_ids.to_numpy()
+        self.display = pd.Series(display, index=self.user_ids, dtype=object)
+        self._search_keys = self.display.str.lower()
+
+    def __len__(self):
+        return len(self.user_ids)
+
+    def _locate(self, user_id):
+        user_id = normalize_user_ids(pd.Series([user_id])).iloc[0]
+        position = self.user_ids.get_indexer([user_id])[0]
+        return None if position < 0 else position
+
+    def profile(self, user_id):
+        """이용자 요약 (질문 수, 응답/미응답 수, 마지막 질문일 등). 없으면 None."""
+        position = self._locate(user_id)
+        if position is None:
+            return None
+        return self.profiles.iloc[position]
+
+    def positions(self, user_id):
+        """이용자의 행 위치 (원래 행 순서)."""
+        position = self._locate(user_id)
+        if position is None:
+            return self.order[:0]
+        return self.order[self.ptr[position]:self.ptr[position + 1]]
+
+    def rows(self, df, user_id):
+        """df 에서 이용자의 행만 꺼낸다. df 는 인덱스를 만든 바로 그 DataFrame."""
+        return df.iloc[self.positions(user_id)]
+
+    def options(self):
+        """선택 상자에 쓰는 '{ID} / {이름}' 목록 (ID 순)."""
+        return self.display.tolist()
+
+    def search(self, query, limit=MAX_SEARCH_RESULTS):
+        """ID 또는 이름에 query 가 들어간 이용자의 표시 문자열 (앞쪽 일치 우선)."""
+        query = query.strip().lower()
+        if not query:
+            return self.options()[:limit]
+        keys = self._search_keys
+        prefix = keys.str.startswith(query).to_numpy()
+        contains = keys.str.contains(query, regex=False).to_numpy()
+        matches = np.concatenate((np.flatnonzero(prefix),
+                                  np.flatnonzero(contains & ~prefix)))
+        return self.display.iloc[matches[:limit]].tolist()
+
+    @staticmethod
+    def user_id(display):
+        """선택 상자 표시 문자열 → user_id."""
+        return display.split(' / ')[0] if ' / ' in display else display
@@ -0,0 +1,69 @@
+"""반복 질문 묶음을 청크로 쌓아도(extend) 한 번에 만든 것과 같은지 검사한다."""
+import numpy as np
+import pandas as pd
+
+from samlog.dedup import QuestionDedup
+from samlog.synthetic import qa_frame
+
+
+def _questions():
+    # 합성 질문 일부를 살짝 바꾼 유사 중복과 질문이 없는 행을 섞는다
+    df = qa_frame(2_000, seed=3)
+    rng = np.random.default_rng(0)
+    near = df.iloc[rng.choice(len(df), 300, replace=False)].copy()
+    near['question'] = near['question'].str.replace('?',
+                                                    ' 부탁드립니다',
+                                                    regex=False)
+    df = pd.concat([df, near]).sample(frac=1, random_state=1)
+    df = df.reset_index(drop=True)
+    df.loc[df.index[::97], 'question'] = None
+    return df
+
+
+def _same_groups(actual, expected):
+    np.testing.assert_array_equal(actual.exact_labels(),
+                                  expected.exact_labels())
+    np.testing.assert_array_equal(actual.labels(), expected.labels())
+    np.testing.assert_array_equal(actual.keep_mask(), expected.keep_mask())
+    assert actual.stats() == expected.stats()
+
+
+def test_chunked_extend_matches_single_pass():
+    df = _questions()
+    whole = QuestionDedup(df)
+    stats = whole.stats()
+    assert stats['exact_duplicates'] > 0 and stats['near_duplicates'] > 0
+
+    for chunk_rows in (400, 777):
+        chunked = QuestionDedup(df.iloc[:0])
+        for start in range(0, len(df), chunk_rows):
+            chunked = chunked.extend(df.iloc[start:start + chunk_rows])
+        assert chunked.n_rows == len(df)
+        _same_groups(chunked, whole)
+
+
+def test_duplicates_across_chunks_are_grouped():
+    first = pd.DataFrame({
+        'question': ["회의실 예약은 어디서 신청할 수 있는지 알려주세요?", "휴가 신청 방법", None]
+    })
+    second = pd.DataFrame({
+        'question':
+        ["휴가 신청 방법!", "회의실 예약은 어디에서 신청할 수 있는지 알려주세요", "급여 명세서 확인"]
+    })
+    base = QuestionDedup(first)
+    dedup = base.extend(second)
+    # 기존 객체는 그대로다
+    assert base.n_rows == 3 and base.stats()['questions'] == 2
+
+    np.testing.assert_array_equal(dedup.exact_labels(), [0, 1, -1, 1, 2, 3])
+    np.testing.assert_array_equal(dedup.labels(), [0, 1, -1, 1, 0, 3])
+    np.testing.assert_array_equal(dedup.keep_mask(),
+                                  [True, True, True, False, False, True])
+    assert dedup.stats() == {
+        'questions': 5,
+        'texts': 4,
+        'groups': 3,
+        'exact_duplicates': 1,
+        'near_duplicates': 1
+    }
+    _same_groups(dedup, QuestionDedup(pd.concat([first, second])))
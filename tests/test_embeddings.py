@@ -0,0 +1,42 @@
+"""질문 벡터 디스크 캐시가 한도 안에서 재사용·정리되는지 검사한다."""
+import os
+
+import pandas as pd
+
+from samlog import embeddings
+from samlog.embeddings import HashingEncoder, QuestionEmbeddings, _cache_path
+
+
+def _frame(n):
+    return pd.DataFrame({'question': [f"회의실 예약 방법 {i}" for i in range(n)]})
+
+
+def test_vector_files_are_reused_and_pruned(tmp_path, monkeypatch):
+    monkeypatch.setattr(embeddings, 'MAX_CACHED_VECTORS', 3)
+    encoder = HashingEncoder(dim=16)
+    cache_dir = str(tmp_path)
+
+    def build(key, n):
+        built = QuestionEmbeddings.build(_frame(n), key, encoder,
+                                         cache_dir=cache_dir)
+        return built, _cache_path(key, encoder, cache_dir)
+
+    paths = {}
+    for i in range(5):
+        # 파일마다 만든 순서대로 수정 시각을 준다
+        _, paths[i] = build(f"k{i}", 50 + i)
+        os.utime(paths[i], (1000 + i, 1000 + i))
+    assert sorted(os.listdir(cache_dir)) == sorted(
+        os.path.basename(paths[i]) for i in (2, 3, 4))
+
+    # 같은 키는 저장된 파일을 다시 쓰고, 다시 쓴 파일은 최근 것이 된다
+    before = os.path.getmtime(paths[2])
+    again, _ = build("k2", 52)
+    assert os.path.getmtime(paths[2]) > before
+    assert len(again.vectors) == 52
+
+    build("k5", 55)
+    remaining = set(os.listdir(cache_dir))
+    assert os.path.basename(paths[3]) not in remaining
+    assert os.path.basename(paths[2]) in remaining
+    assert len(remaining) == 3
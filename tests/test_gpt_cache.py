@@ -0,0 +1,119 @@
+"""ResponseCache 적중/만료/한도와 LLMExecutor 연동을 가짜 클라이언트로 검사한다."""
+from types import SimpleNamespace
+
+import pytest
+
+from samlog import gpt_cache
+from samlog.gpt_cache import ResponseCache
+from samlog.llm import LLMExecutor, request_key
+
+
+class Clock:
+    """time.time 대신 쓰는 수동 시계."""
+
+    def __init__(self, now=1_000_000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+    def tick(self, seconds=1.0):
+        self.now += seconds
+
+
+class CountingClient:
+    """호출 수를 세고 '<모델>:<마지막 메시지>' 를 응답으로 돌려준다."""
+
+    def __init__(self):
+        self.calls = 0
+        self.chat = SimpleNamespace(completions=SimpleNamespace(
+            create=self.create))
+
+    def create(self, model, messages, temperature, timeout, **kwargs):
+        self.calls += 1
+        message = SimpleNamespace(
+            content=f"{model}:{messages[-1]['content']}")
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)],
+                               usage=None)
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(gpt_cache.time, 'time', clock)
+    return clock
+
+
+def _cache(tmp_path, **kwargs):
+    return ResponseCache(str(tmp_path / "responses.sqlite3"), **kwargs)
+
+
+def test_hits_and_misses_are_counted(tmp_path, clock):
+    cache = _cache(tmp_path)
+    assert cache.get("a") is None
+    cache.put("a", "m", "응답")
+    assert cache.get("a") == "응답"
+    assert cache.get("a") == "응답"
+    stats = cache.stats()
+    assert (stats['hits'], stats['misses'], stats['entries']) == (2, 1, 1)
+    assert stats['bytes'] == len("응답".encode())
+
+
+def test_expired_entries_miss_and_are_removed(tmp_path, clock):
+    cache = _cache(tmp_path, ttl=60)
+    cache.put("a", "m", "응답")
+    clock.tick(59)
+    assert cache.get("a") == "응답"
+    clock.tick(2)
+    assert cache.get("a") is None
+    assert cache.stats()['entries'] == 0
+
+
+def test_entry_limit_evicts_least_recently_used(tmp_path, clock):
+    cache = _cache(tmp_path, max_entries=3)
+    for key in "abc":
+        cache.put(key, "m", key)
+        clock.tick()
+    cache.get("a")
+    clock.tick()
+    cache.put("d", "m", "d")
+    assert cache.stats()['entries'] == 3
+    assert cache.get("b") is None
+    assert [cache.get(key) for key in "acd"] == ["a", "c", "d"]
+
+
+def test_size_limit_evicts_until_under_budget(tmp_path, clock):
+    cache = _cache(tmp_path, max_bytes=25)
+    for key in "abc":
+        cache.put(key, "m", key * 10)
+        clock.tick()
+    stats = cache.stats()
+    assert stats['bytes'] <= 25
+    assert cache.get("c") == "c" * 10
+    assert cache.get("a") is None
+
+
+def test_prompt_or_model_change_misses(tmp_path, clock):
+    client = CountingClient()
+    executor = LLMExecutor(client, cache=_cache(tmp_path))
+    messages = [{'role': 'user', 'content': "요약해 줘"}]
+    assert executor.submit('m1', messages).result(timeout=5) == "m1:요약해 줘"
+    assert executor.submit('m1', messages).result(timeout=5) == "m1:요약해 줘"
+    assert client.calls == 1
+
+    changed = [{'role': 'user', 'content': "자세히 요약해 줘"}]
+    assert executor.submit('m1', changed).result(timeout=5) == "m1:자세히 요약해 줘"
+    assert executor.submit('m2', messages).result(timeout=5) == "m2:요약해 줘"
+    assert executor.submit('m1', messages,
+                           temperature=0.7).result(timeout=5) == "m1:요약해 줘"
+    assert client.calls == 4
+    assert executor.cache.stats()['hits'] == 1
+
+
+def test_request_key_covers_model_temperature_and_messages():
+    messages = [{'role': 'user', 'content': "q"}]
+    key = request_key('m', messages, 0.0)
+    assert key == request_key('m', [{'content': "q", 'role': 'user'}], 0.0)
+    assert key != request_key('m2', messages, 0.0)
+    assert key != request_key('m', messages, 0.5)
+    assert key != request_key('m', [{'role': 'user', 'content': "q2"}], 0.0)
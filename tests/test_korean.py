@@ -0,0 +1,26 @@
+"""표제어 빈도에서 불용어와 묻는 말 어미가 빠지는지 검사한다."""
+import pandas as pd
+
+from samlog.korean import TermMatrix
+
+
+def test_stopwords_are_dropped_before_and_after_lemmatization():
+    texts = pd.Series([
+        "회의실 예약은 어떻게 하나요",
+        "연차 신청은 언제까지인가요",
+        "급여명세서는 어디서 확인하나요",
+        "회의실을 두 개 예약할 수 있나요",
+    ])
+    counts = TermMatrix(texts).frequencies()
+    assert '하나' not in counts.index
+    assert '하나요' not in counts.index
+    assert '언제까지인가요' not in counts.index
+    assert '언제' not in counts.index
+    assert counts['확인'] == 1
+    assert counts['회의실'] == 2
+
+
+def test_search_still_uses_raw_tokens():
+    matrix = TermMatrix(pd.Series(["어디서 확인하나요", "확인 부탁"]))
+    assert sorted(matrix.documents(matrix.term_ids("확인하나요",
+                                                   exact=True))) == [0]
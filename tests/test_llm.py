@@ -0,0 +1,225 @@
+"""LLMExecutor 를 가짜 클라이언트로 검사한다 (실제 API 호출 없음)."""
+import threading
+import time
+from concurrent.futures import Future
+from types import SimpleNamespace
+
+import pytest
+
+from samlog.llm import LLMExecutor
+
+
+class FakeClient:
+    """chat.completions.create 만 흉내 낸다. reply(messages) 결과를 응답 본문으로 돌려준다."""
+
+    def __init__(self, reply=None, gate=None, barrier=None, errors=()):
+        self.reply = reply or (lambda messages: messages[-1]['content'].upper())
+        self.gate = gate
+        self.barrier = barrier
+        self.errors = list(errors)
+        self.calls = 0
+        self._lock = threading.Lock()
+        self.chat = SimpleNamespace(completions=SimpleNamespace(
+            create=self.create))
+
+    def create(self, model, messages, temperature, timeout, **kwargs):
+        with self._lock:
+            self.calls += 1
+            error = self.errors.pop(0) if self.errors else None
+        if self.barrier is not None:
+            self.barrier.wait()
+        if self.gate is not None:
+            self.gate.wait(5)
+        if error is not None:
+            raise error
+        message = SimpleNamespace(content=self.reply(messages))
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)],
+                               usage=None)
+
+
+class ImmediatePool:
+    """submit 하는 즉시 같은 스레드에서 실행해 끝난 Future 를 돌려주는 풀."""
+
+    def submit(self, function, *args):
+        future = Future()
+        future.set_result(function(*args))
+        return future
+
+
+def _messages(text):
+    return [{'role': 'user', 'content': text}]
+
+
+def _wait_until(condition, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.01)
+    return True
+
+
+def test_independent_requests_run_concurrently():
+    # 네 요청이 모두 동시에 create 안에 있어야 barrier 를 통과한다
+    client = FakeClient(barrier=threading.Barrier(4, timeout=5))
+    executor = LLMExecutor(client, max_workers=4)
+    futures = [executor.submit('m', _messages(f"q{i}")) for i in range(4)]
+    assert [f.result(timeout=5) for f in futures] == ['Q0', 'Q1', 'Q2', 'Q3']
+    assert client.calls == 4
+
+
+def test_identical_inflight_requests_are_coalesced():
+    gate = threading.Event()
+    client = FakeClient(gate=gate)
+    executor = LLMExecutor(client)
+    first = executor.submit('m', _messages("같은 질문"))
+    second = executor.submit('m', _messages("같은 질문"))
+    other = executor.submit('m', _messages("다른 질문"))
+    assert first is second
+    assert other is not first
+    gate.set()
+    assert first.result(timeout=5) == second.result(timeout=5) == "같은 질문"
+    assert other.result(timeout=5) == "다른 질문"
+    assert client.calls == 2
+
+
+def test_errors_propagate_to_every_waiter():
+    gate = threading.Event()
+    client = FakeClient(gate=gate, errors=[ValueError("잘못된 요청")])
+    executor = LLMExecutor(client, backoff=0)
+    futures = [executor.submit('m', _messages("q")) for _ in range(2)]
+    gate.set()
+    for future in futures:
+        with pytest.raises(ValueError, match="잘못된 요청"):
+            future.result(timeout=5)
+    # 재시도하지 않는 오류이므로 한 번만 호출
+    assert client.calls == 1
+
+
+def test_retryable_errors_are_retried():
+    client = FakeClient(errors=[TimeoutError(), TimeoutError()])
+    executor = LLMExecutor(client, backoff=0)
+    assert executor.submit('m', _messages("q")).result(timeout=5) == "Q"
+    assert client.calls == 3
+
+
+def _fail_on(text):
+
+    def reply(messages):
+        if messages[-1]['content'] == text:
+            raise ValueError(text)
+        return messages[-1]['content']
+
+    return reply
+
+
+def test_inflight_entries_are_removed_after_completion():
+    client = FakeClient(reply=_fail_on("실패"))
+    executor = LLMExecutor(client, backoff=0)
+    failed = executor.submit('m', _messages("실패"))
+    succeeded = executor.submit('m', _messages("성공"))
+    with pytest.raises(ValueError):
+        failed.result(timeout=5)
+    succeeded.result(timeout=5)
+    assert _wait_until(lambda: not executor._inflight)
+    # 끝난 요청을 다시 보내면 새로 호출한다
+    executor.submit('m', _messages("성공")).result(timeout=5)
+    assert client.calls == 3
+
+
+def test_instant_completion_does_not_deadlock():
+    executor = LLMExecutor(FakeClient())
+    executor._pool = ImmediatePool()
+    results = []
+    worker = threading.Thread(
+        target=lambda: results.append(
+            executor.submit('m', _messages("q")).result()),
+        daemon=True)
+    worker.start()
+    worker.join(5)
+    assert not worker.is_alive()
+    assert results == ["Q"]
+    assert executor._inflight == {}
+
+
+class FakeStreamClient:
+    """stream=True 요청에 tokens 를 한 청크씩 흘려보낸다.
+
+    pause_after 번째 청크 뒤에는 resume 이 설정될 때까지 기다리고, fail_after 번째 청크
+    뒤에는 연결이 끊긴 것처럼 예외를 낸다.
+    """
+
+    def __init__(self, tokens, pause_after=None, fail_after=None):
+        self.tokens = tokens
+        self.pause_after = pause_after
+        self.fail_after = fail_after
+        self.resume = threading.Event()
+        self.sent = 0
+        self.closed = False
+        self.chat = SimpleNamespace(completions=SimpleNamespace(
+            create=self.create))
+
+    def create(self, model, messages, temperature, timeout, stream=False,
+               **kwargs):
+        assert stream
+        return self._chunks()
+
+    def _chunks(self):
+        try:
+            for i, token in enumerate(self.tokens):
+                if i == self.fail_after:
+                    raise ConnectionError("연결 끊김")
+                if i == self.pause_after:
+                    self.resume.wait(5)
+                self.sent += 1
+                delta = SimpleNamespace(content=token)
+                yield SimpleNamespace(choices=[SimpleNamespace(delta=delta)],
+                                      usage=None)
+        finally:
+            self.closed = True
+
+
+@pytest.fixture
+def response_cache(tmp_path):
+    from samlog.gpt_cache import ResponseCache
+    return ResponseCache(str(tmp_path / "responses.sqlite3"))
+
+
+def test_stream_records_time_to_first_token(response_cache):
+    client = FakeStreamClient(["안녕", "하세요"])
+    executor = LLMExecutor(client, cache=response_cache)
+    handle = executor.stream('m', _messages("q"))
+    assert handle.wait(5)
+    assert handle.error is None and not handle.cancelled
+    assert handle.text == "안녕하세요"
+    assert handle.ttft is not None and 0 <= handle.ttft <= handle.latency
+    # 끝까지 받은 응답은 캐시되어 다음 요청은 API 없이 바로 끝난다
+    cached = executor.stream('m', _messages("q"))
+    assert cached.done and cached.text == "안녕하세요"
+    assert response_cache.stats()['entries'] == 1
+
+
+def test_cancel_stops_consuming_and_skips_cache(response_cache):
+    client = FakeStreamClient(["a", "b", "c", "d", "e"], pause_after=1)
+    executor = LLMExecutor(client, cache=response_cache)
+    handle = executor.stream('m', _messages("q"))
+    assert _wait_until(lambda: handle.text == "a")
+    handle.cancel()
+    client.resume.set()
+    assert handle.wait(5)
+    assert handle.cancelled
+    assert handle.text == "a"
+    # 취소 뒤에는 이미 받은 청크 하나 외에 더 읽지 않고 연결을 닫는다
+    assert client.sent == 2
+    assert client.closed
+    assert response_cache.stats()['entries'] == 0
+
+
+def test_partial_stream_is_not_cached(response_cache):
+    client = FakeStreamClient(["a", "b", "c"], fail_after=2)
+    executor = LLMExecutor(client, cache=response_cache)
+    handle = executor.stream('m', _messages("q"))
+    assert handle.wait(5)
+    assert isinstance(handle.error, ConnectionError)
+    assert handle.text == "ab"
+    assert response_cache.stats()['entries'] == 0
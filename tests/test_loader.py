@@ -0,0 +1,66 @@
+"""청크 적재 결과가 한 번에 읽은 것과 같은지 검사한다."""
+import io
+
+import pandas as pd
+
+from samlog import loader
+from samlog.synthetic import qa_frame
+
+
+def _csv(df):
+    buffer = io.BytesIO()
+    df.to_csv(buffer, index=False)
+    return buffer.getvalue()
+
+
+def _frame():
+    df = qa_frame(3_000)
+    # 앞쪽 배치는 답변이 모두 비어 있고, 정수 컬럼은 배치마다 작은 정수형이 달라진다
+    df.loc[df.index[:1_500], 'answer'] = None
+    df['views'] = range(len(df))
+    return df
+
+
+def test_chunked_load_matches_single_pass():
+    df = _frame()
+    data = _csv(df)
+
+    # 500행 배치마다 청크 하나
+    chunks = list(
+        loader.iter_chunks(data, "qa.csv", memory_budget=1, batch_rows=500))
+    assert len(chunks) == 6
+    assert chunks[0]['answer'].dtype != chunks[-1]['answer'].dtype
+    dataset = loader.read_dataset(data,
+                                  "qa.csv",
+                                  "k",
+                                  memory_budget=1,
+                                  batch_rows=500)
+    expected = loader.compact_frame(pd.read_csv(io.BytesIO(data)))
+
+    assert dataset.df['answer'].dtype == loader.STRING_DTYPE
+    assert dataset.df['views'].tolist() == list(range(len(df)))
+    pd.testing.assert_frame_equal(dataset.df,
+                                  expected,
+                                  check_categorical=False)
+    for col in expected.select_dtypes('category'):
+        assert isinstance(dataset.df[col].dtype, pd.CategoricalDtype)
+
+
+def test_spilled_upload_matches_in_memory_load(tmp_path):
+    data = _csv(_frame())
+    # 업로드 버퍼(memoryview)를 그대로 읽고, 청크는 파일로 내려 매핑한다
+    upload = io.BytesIO(data)
+    spilled = loader.read_dataset(upload.getbuffer(),
+                                  "qa.csv",
+                                  "k",
+                                  memory_budget=1,
+                                  batch_rows=500,
+                                  spill_dir=str(tmp_path))
+    in_memory = loader.read_dataset(data,
+                                    "qa.csv",
+                                    "k",
+                                    memory_budget=1,
+                                    batch_rows=500)
+    pd.testing.assert_frame_equal(spilled.df, in_memory.df)
+    # 청크 파일은 병합 뒤 지운다
+    assert list(tmp_path.iterdir()) == []
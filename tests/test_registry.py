@@ -0,0 +1,98 @@
+"""공유 데이터셋 저장소의 참조 수·정리·스냅샷 재사용을 검사한다."""
+import gc
+
+import pandas as pd
+
+from samlog.loader import (Dataset, DatasetHolder, DatasetRegistry,
+                           compact_frame)
+from samlog.synthetic import qa_frame
+
+
+def _dataset(key, rows=100):
+    return Dataset(key, f"{key}.csv", compact_frame(qa_frame(rows, seed=1)))
+
+
+def test_holders_count_references_and_release(tmp_path):
+    registry = DatasetRegistry(snapshot_dir=None)
+    dataset = _dataset("a")
+    first, second = DatasetHolder(registry), DatasetHolder(registry)
+    first.hold('qa', dataset)
+    second.hold('qa', dataset)
+    # 부분 데이터셋을 잡으면 원본을 잡는다
+    second.hold('window', dataset.subset("a:window", [0, 1, 2]))
+    assert registry.refcount("a") == 3
+    assert registry.stats() == {
+        'entries': 1,
+        'bytes': dataset.nbytes,
+        'held': 1,
+        'sessions': 2
+    }
+
+    # 같은 자리에 다른 데이터셋을 잡으면 이전 것은 놓는다
+    other = _dataset("b")
+    first.hold('qa', other)
+    assert (registry.refcount("a"), registry.refcount("b")) == (2, 1)
+    first.hold('qa', None)
+    assert registry.refcount("b") == 0
+
+    registry.release(second.id)
+    assert registry.refcount("a") == 0
+    # 세션 상태와 함께 holder 가 사라져도 놓는다
+    third = DatasetHolder(registry)
+    third.hold('qa', dataset)
+    assert registry.refcount("a") == 1
+    del third
+    gc.collect()
+    assert registry.refcount("a") == 0
+
+
+def test_eviction_keeps_held_datasets():
+    registry = DatasetRegistry(max_entries=2, snapshot_dir=None)
+    holder = DatasetHolder(registry)
+    held = _dataset("held")
+    holder.hold('qa', held)
+    for key in ("x", "y", "z"):
+        registry.put(_dataset(key))
+    # 잡은 것과 가장 최근 것만 남는다
+    assert set(registry._entries) == {"held", "z"}
+
+    # 메모리 한도: 잡은 세션이 없는 것부터 오래된 순으로 버린다
+    size = held.nbytes
+    registry = DatasetRegistry(max_bytes=int(size * 2.5), snapshot_dir=None)
+    holder = DatasetHolder(registry)
+    holder.hold('qa', held)
+    for key in ("x", "y", "z"):
+        registry.put(_dataset(key))
+    assert list(registry._entries) == ["held", "z"]
+    assert registry.get("x") is None
+    holder.hold('qa', None)
+    registry.put(_dataset("w"))
+    assert list(registry._entries) == ["z", "w"]
+
+
+def test_snapshot_is_reopened_without_parsing(tmp_path):
+    parsed = []
+
+    def parse():
+        parsed.append(1)
+        return _dataset("k", rows=500)
+
+    registry = DatasetRegistry(snapshot_dir=str(tmp_path))
+    dataset = registry.open("k", "k.csv", parse)
+    assert parsed == [1]
+    assert (tmp_path / "k.arrow").exists()
+    # 매핑한 프레임의 크기로 다시 잰다
+    assert dataset.nbytes == int(dataset.df.memory_usage(deep=True).sum())
+    assert registry.open("k", "k.csv", parse) is dataset
+
+    # 새 프로세스(새 저장소)는 스냅샷을 매핑만 한다
+    reopened = DatasetRegistry(snapshot_dir=str(tmp_path)).open(
+        "k", "k.csv", parse)
+    assert parsed == [1]
+    assert reopened is not dataset
+    assert reopened.nbytes == dataset.nbytes
+    pd.testing.assert_frame_equal(reopened.df, dataset.df)
+    pd.testing.assert_frame_equal(reopened.df,
+                                  compact_frame(qa_frame(500, seed=1)),
+                                  check_dtype=False,
+                                  check_categorical=False)
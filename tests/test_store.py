@@ -0,0 +1,127 @@
+"""누적 저장소의 증분 추가가 전체를 새로 읽은 것과 같은 결과를 내는지 검사한다."""
+import io
+
+import numpy as np
+import pandas as pd
+
+from samlog import analytics
+from samlog.loader import Dataset, compact_frame
+from samlog.store import ROW_KEY_COLUMNS, AppendStore, row_keys
+from samlog.synthetic import qa_frame
+
+
+class Upload:
+    """st.file_uploader 가 돌려주는 파일처럼 name 과 getvalue() 만 가진다."""
+
+    def __init__(self, name, df):
+        self.name = name
+        buffer = io.BytesIO()
+        df.to_csv(buffer, index=False)
+        self._data = buffer.getvalue()
+
+    def getvalue(self):
+        return self._data
+
+
+def _deltas():
+    # 날마다 겹치는 구간이 있는 세 증분 (앞 증분의 마지막 200행을 다시 포함)
+    df = qa_frame(3_000).sort_values('regymdt', kind='stable')
+    df = df.reset_index(drop=True)
+    return df, [df.iloc[0:1_200], df.iloc[1_000:2_200], df.iloc[2_000:3_000]]
+
+
+def _rebuilt(df):
+    unique = df.drop_duplicates(subset=list(ROW_KEY_COLUMNS))
+    return Dataset("full", "full", compact_frame(unique.reset_index(drop=True)))
+
+
+def _same_analytics(actual, expected):
+    assert analytics.overview(actual) == analytics.overview(expected)
+    assert analytics.cube(actual).totals() == analytics.cube(expected).totals()
+    for level in ('group_1', 'group_3'):
+        pd.testing.assert_frame_equal(
+            analytics.org_stats(actual, level).reset_index(drop=True),
+            analytics.org_stats(expected, level).reset_index(drop=True),
+            check_dtype=False,
+            check_categorical=False)
+    for keyword in ("회의실", "휴가", "정산"):
+        np.testing.assert_array_equal(
+            analytics.keyword_positions(actual, keyword),
+            analytics.keyword_positions(expected, keyword))
+    pd.testing.assert_frame_equal(
+        analytics.question_trend(actual, 'W'),
+        analytics.question_trend(expected, 'W'))
+
+
+def test_appended_deltas_match_full_rebuild(tmp_path):
+    df, deltas = _deltas()
+    store = AppendStore(str(tmp_path))
+    store.append_file(Upload("day1.csv", deltas[0]))
+    # 파생 집계를 먼저 만들어 두면 다음 증분은 extend 로 더해진다
+    first = store.dataset()
+    analytics.overview(first)
+    analytics.keyword_positions(first, "회의실")
+    for i, delta in enumerate(deltas[1:], start=2):
+        store.append_file(Upload(f"day{i}.csv", delta))
+    dataset = store.dataset()
+
+    assert dataset is not first
+    # 큐브와 역색인은 새로 만들지 않고 extend 로 넘겨받았다
+    assert {'cube', 'keyword_index'} <= set(dataset._derived)
+    assert len(dataset.df) == len(store) == len(df)
+    _same_analytics(dataset, _rebuilt(df))
+
+
+def test_reuploads_and_overlapping_rows_are_skipped(tmp_path):
+    df, deltas = _deltas()
+    store = AppendStore(str(tmp_path))
+    assert store.append_file(Upload("day1.csv", deltas[0])) == 1_200
+    # 같은 파일을 다시 올리면 파일 키로 바로 건너뛴다
+    assert store.append_file(Upload("day1.csv", deltas[0])) == 0
+    # 이름만 다른 같은 내용도 행 키로 걸러진다
+    assert store.append_file(Upload("copy.csv", deltas[0])) == 0
+    # 겹치는 200행은 빼고 새 행만
+    assert store.append_file(Upload("day2.csv", deltas[1])) == 1_000
+    assert len(store) == 2_200
+    assert len(store.segments) == 2
+
+
+def test_reopened_store_loads_same_rows(tmp_path):
+    df, deltas = _deltas()
+    store = AppendStore(str(tmp_path))
+    store.dataset()
+    for i, delta in enumerate(deltas, start=1):
+        store.append_file(Upload(f"day{i}.csv", delta))
+    in_memory = store.dataset()
+
+    reopened = AppendStore(str(tmp_path))
+    assert len(reopened) == len(store)
+    assert reopened.segments == store.segments
+    dataset = reopened.dataset()
+    pd.testing.assert_frame_equal(dataset.df,
+                                  in_memory.df,
+                                  check_dtype=False,
+                                  check_categorical=False)
+    _same_analytics(dataset, in_memory)
+    # 다시 연 저장소도 이미 가진 행은 받지 않는다
+    assert reopened.append_file(Upload("again.csv", deltas[1])) == 0
+
+
+def test_row_keys_ignore_per_delta_dtypes():
+    rows = pd.DataFrame({
+        'user_id': ["1", "2"],
+        'regymdt': ["2024-01-01 09:00", "2024-01-02 10:00"],
+        'question': ["회의실 예약", "휴가 신청"],
+        'answer': [np.nan, np.nan]
+    })
+    filled = rows.copy()
+    filled['answer'] = [None, "이렇게 하세요"]
+    empty_delta = compact_frame(rows.copy())
+    filled_delta = compact_frame(filled.copy())
+    assert empty_delta['answer'].dtype != filled_delta['answer'].dtype
+    assert row_keys(empty_delta)[0] == row_keys(filled_delta)[0]
+    assert row_keys(empty_delta)[1] != row_keys(filled_delta)[1]
+    # categorical 로 바뀐 컬럼도 같은 키
+    categorical = filled_delta.astype({'question': 'category'})
+    np.testing.assert_array_equal(row_keys(categorical),
+                                  row_keys(filled_delta))
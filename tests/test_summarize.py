@@ -0,0 +1,53 @@
+"""map-reduce 요약이 표본 없이 모든 질문을 담는지 가짜 실행기로 검사한다."""
+from concurrent.futures import Future
+
+import pandas as pd
+
+from samlog.sampler import estimate_tokens, normalize_text
+from samlog.summarize import MapReduceSummarizer, question_chunks
+from samlog.synthetic import qa_frame
+
+
+class RecordingExecutor:
+    """요청을 기록하고 바로 끝난 Future 를 돌려준다."""
+
+    def __init__(self):
+        self.requests = []
+
+    def submit(self, model, messages, temperature=0.0):
+        self.requests.append(messages)
+        future = Future()
+        future.set_result(f"요약 {len(self.requests)}")
+        return future
+
+
+def _unique_questions(rows):
+    return normalize_text(rows['question'].dropna().astype(str).str.strip()).nunique()
+
+
+def test_chunks_cover_every_question_within_budget():
+    rows = qa_frame(20_000)
+    chunks = question_chunks(rows, chunk_tokens=1000)
+    assert len(chunks) > 48
+    assert sum(len(chunk) for chunk in chunks) == _unique_questions(rows)
+    for chunk in chunks:
+        assert estimate_tokens(pd.Series(chunk)).sum() <= 1000
+
+
+def test_reduce_merges_all_chunk_summaries():
+    rows = qa_frame(5_000)
+    executor = RecordingExecutor()
+    summarizer = MapReduceSummarizer(executor, chunk_tokens=500, fan_in=4)
+    progress = []
+    finals = summarizer.final_requests({'answered': (rows, True)},
+                                       lambda done, total: progress.append(
+                                           (done, total)))
+    n_chunks = len(question_chunks(rows, 500))
+    mapped = executor.requests[:n_chunks]
+    covered = sum(len(m[-1]['content'].split("\n")) for m in mapped)
+    assert covered == _unique_questions(rows)
+    assert len(executor.requests) == summarizer._n_calls(n_chunks)
+    assert progress[-1] == (len(executor.requests), len(executor.requests))
+    # 최종 요청에는 FAN_IN 개 이하의 요약만 들어간다
+    assert set(finals) == {'answered'}
+    assert finals['answered']['messages'][-1]['content'].count("[부분 요약") <= 4
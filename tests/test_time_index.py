@@ -0,0 +1,40 @@
+"""등록 시각 색인의 증분 병합과 기간 뷰를 검사한다."""
+import numpy as np
+import pandas as pd
+
+from samlog import analytics
+from samlog.loader import Dataset
+from samlog.time_index import TimeIndex
+
+
+def _frame(days, seed):
+    rng = np.random.default_rng(seed)
+    dates = pd.Timestamp("2024-01-01") + pd.to_timedelta(
+        rng.integers(0, days, 500), unit='D')
+    df = pd.DataFrame({'regymdt': dates, 'question': "q"})
+    df.loc[rng.choice(500, 40, replace=False), 'regymdt'] = pd.NaT
+    return df
+
+
+def test_extend_matches_full_rebuild():
+    base, delta = _frame(30, 0), _frame(60, 1)
+    merged = TimeIndex(base).extend(delta)
+    rebuilt = TimeIndex(pd.concat([base, delta], ignore_index=True))
+    np.testing.assert_array_equal(merged.times, rebuilt.times)
+    np.testing.assert_array_equal(merged.order, rebuilt.order)
+    assert merged.n_rows == rebuilt.n_rows == 1000
+
+
+def test_full_range_window_skips_undated_rows():
+    df = _frame(30, 2)
+    dataset = Dataset("k", "qa.csv", df)
+    first, last = analytics.date_bounds(dataset)
+    full = analytics.windowed(dataset, first, last + pd.Timedelta(days=1))
+    assert len(full.df) == df['regymdt'].notna().sum()
+    assert full.df['regymdt'].notna().all()
+    # 날짜 있는 행을 모두 덮는 기간은 모두 같은 뷰를 쓴다
+    assert analytics.windowed(dataset, first - pd.Timedelta(days=5),
+                              None) is full
+
+    dated = Dataset("d", "qa.csv", df.dropna().reset_index(drop=True))
+    assert analytics.windowed(dated, first, None) is dated